@@ -2,13 +2,34 @@ from app.agent.models import AgentResponse
 from app.config import backend_logger
 from app.mssql.dependencies import get_db
 from app.mssql.models import Table
+from app.vectorstore.models import MetadataFilter
+from app.vectorstore.profiles import coerce_payload_value, get_payload_fields
 from app.vectorstore.service import get_vectorstore, search
 from langchain_core.documents import Document
 from langchain_core.tools import tool
+from qdrant_client.models import PayloadSchemaType
+
+
+def _filterable_fields() -> str:
+    # Columns copied into the metadata, datetimes can't be matched by equality
+    tables = []
+    for table in Table:
+        keys = [
+            field.key
+            for field in get_payload_fields(table.value)
+            if field.column and field.field_schema != PayloadSchemaType.DATETIME
+        ]
+        if keys:
+            tables.append(f"{table.value}: {', '.join(keys)}")
+    return "; ".join(tables)
 
 
 @tool
-def vector_search(query: str, table_name: str) -> list[Document]:
+def vector_search(
+    query: str,
+    table_name: str,
+    filters: dict[str, str | int | bool] | None = None,
+) -> list[Document]:
     """
     Perform a vector similarity search against a set of documents.
     The query should contain the semantic meaning of original query.
@@ -16,6 +37,7 @@ def vector_search(query: str, table_name: str) -> list[Document]:
     You should use get_table_names tool to get the table names if uou are not sure about the table name.
     This tool will convert the query to vector.
     This tool dont need to know the table schema.
+    Use filters to only return documents whose metadata equals the given values, e.g. {"category": "Beverages"}.
     """
     backend_logger.info("Executing 'vector_search' tool")
 
@@ -23,10 +45,29 @@ def vector_search(query: str, table_name: str) -> list[Document]:
     if not qdrant.collection_exists(table_name):
         return f"Table {table_name} does not exist.\nAvailable tables: {qdrant.get_collections()}"
 
-    documents: list[Document] = search(query, table_name)
+    metadata_filters = None
+    if filters:
+        fields = {field.key: field for field in get_payload_fields(table_name)}
+        unknown = [key for key in filters if key not in fields]
+        if unknown:
+            return (
+                f"Cannot filter {table_name} on {', '.join(unknown)}.\n"
+                f"Filterable fields: {', '.join(fields)}"
+            )
+        try:
+            metadata_filters = [
+                MetadataFilter(key=key, match=coerce_payload_value(fields[key], value))
+                for key, value in filters.items()
+            ]
+        except ValueError as e:
+            return f"Invalid filter: {e}"
+    documents: list[Document] = search(query, table_name, filters=metadata_filters)
     return documents
 
 
+vector_search.description += f"\nFilterable fields: {_filterable_fields()}."
+
+
 @tool
 def get_table_names() -> list[str]:
     """
@@ -1,6 +1,7 @@
 from app.chat.models import ChatResponse
 from app.chat.service import handle_chat_request_image
 from app.config import backend_logger
+from app.exceptions.errors import InvalidImageError
 from app.llm.models import RAGResponse, SQLRAGResponse
 from app.llm.ollama import get_stream_ollama
 from app.rag_system.pipelines import sql_rag_pipeline, vector_rag_pipeline
@@ -84,7 +85,8 @@ async def image_query(
             - tools_used (list, optional): Computer vision tools and models used
 
     Raises:
-        HTTPException: 500 status code if image processing, analysis, or query processing fails
+        HTTPException: 400 status code if the file is not a supported image,
+            500 status code if image processing, analysis, or query processing fails
     """
     backend_logger.info(
         f"Image query requested with file={file.filename}, user query={user_query}"
@@ -94,6 +96,8 @@ async def image_query(
             user_query=user_query, image=file
         )
         return result
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
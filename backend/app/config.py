@@ -18,11 +18,103 @@ OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", default="http://localhost:11434")
 OLLAMA_CHAT_MODEL = os.getenv("QWEN_MODEL", default="")
 WEIGHTS_DIR = os.getenv("WEIGHTS_DIR", default="weights")
 
+# Ollama embedding configuration
+NOMIC_MODEL = os.getenv("NOMIC_MODEL", default="nomic-embed-text")
+NOMIC_BATCH_SIZE: int = int(os.getenv("NOMIC_BATCH_SIZE", default=64))
+NOMIC_MAX_CONCURRENCY: int = int(os.getenv("NOMIC_MAX_CONCURRENCY", default=4))
+NOMIC_MAX_RETRIES: int = int(os.getenv("NOMIC_MAX_RETRIES", default=3))
+
 # Qdrant configuration
 QDRANT_URL = os.getenv("QDRANT_URL", default="")
 QDRANT_VECTOR_SIZE: int = int(os.getenv("QDRANT_VECTOR_SIZE", default=0))
+QDRANT_PREFER_GRPC: bool = (
+    os.getenv("QDRANT_PREFER_GRPC", default="false").lower() == "true"
+)
+QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", default=6334))
+QDRANT_METADATA_TTL_SECONDS: float = float(
+    os.getenv("QDRANT_METADATA_TTL_SECONDS", default=30)
+)
+QDRANT_INFO_TTL_SECONDS: float = float(os.getenv("QDRANT_INFO_TTL_SECONDS", default=5))
+QDRANT_SCROLL_PAGE_SIZE: int = int(os.getenv("QDRANT_SCROLL_PAGE_SIZE", default=1000))
+QDRANT_MAX_CONNECTIONS: int = int(os.getenv("QDRANT_MAX_CONNECTIONS", default=32))
+QDRANT_MAX_KEEPALIVE: int = int(os.getenv("QDRANT_MAX_KEEPALIVE", default=16))
+QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", default=30))
+QDRANT_UPLOAD_BATCH_SIZE: int = int(os.getenv("QDRANT_UPLOAD_BATCH_SIZE", default=64))
+QDRANT_UPLOAD_WORKERS: int = int(os.getenv("QDRANT_UPLOAD_WORKERS", default=4))
+QDRANT_UPLOAD_MAX_RETRIES: int = int(os.getenv("QDRANT_UPLOAD_MAX_RETRIES", default=3))
+
+# Search result cache, 0 entries disables it. Writes through this process
+# invalidate immediately, the TTL bounds staleness from writes made elsewhere,
+# including the other workers of a multi-worker server, so keep it short
+SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", default=1024))
+SEARCH_CACHE_TTL_SECONDS: float = float(
+    os.getenv("SEARCH_CACHE_TTL_SECONDS", default=10)
+)
+
+# "qdrant" or "local", the in-process NumPy store used for tests and benchmarks
+VECTORSTORE_BACKEND = os.getenv("VECTORSTORE_BACKEND", default="qdrant")
+LOCAL_VECTORSTORE_DIR = os.getenv("LOCAL_VECTORSTORE_DIR", default="vectorstore")
+LOCAL_VECTORSTORE_IVF_MIN_POINTS: int = int(
+    os.getenv("LOCAL_VECTORSTORE_IVF_MIN_POINTS", default=50000)
+)
+LOCAL_VECTORSTORE_IVF_NPROBE: int = int(
+    os.getenv("LOCAL_VECTORSTORE_IVF_NPROBE", default=8)
+)
+
+# Vector RAG retrieval: "fanout" searches every table collection concurrently,
+# "route" first asks the LLM which single collection to search
+VECTOR_RAG_RETRIEVAL = os.getenv("VECTOR_RAG_RETRIEVAL", default="fanout")
+VECTOR_RAG_K: int = int(os.getenv("VECTOR_RAG_K", default=4))
+VECTOR_RAG_PER_COLLECTION: int = int(os.getenv("VECTOR_RAG_PER_COLLECTION", default=2))
+# Fan-out documents scoring below this cosine similarity are dropped
+VECTOR_RAG_MIN_SCORE: float = float(os.getenv("VECTOR_RAG_MIN_SCORE", default=0.0))
 
-EMBEDDING_MODEL_PATH = "weights/ViT-B-32.pt"
+# Hybrid search fuses the CLIP vector with the sparse lexical index using RRF,
+# taking HYBRID_PREFETCH_LIMIT candidates from each
+VECTOR_SEARCH_HYBRID = (
+    os.getenv("VECTOR_SEARCH_HYBRID", default="true").lower() == "true"
+)
+HYBRID_PREFETCH_LIMIT: int = int(os.getenv("HYBRID_PREFETCH_LIMIT", default=20))
+
+# Collection snapshots, restored with SNAPSHOT_UPLOAD_PARALLEL upload workers
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", default="snapshots")
+SNAPSHOT_UPLOAD_BATCH_SIZE: int = int(
+    os.getenv("SNAPSHOT_UPLOAD_BATCH_SIZE", default=256)
+)
+SNAPSHOT_UPLOAD_PARALLEL: int = int(os.getenv("SNAPSHOT_UPLOAD_PARALLEL", default=4))
+
+EMBEDDING_MODEL_PATH = os.path.join(WEIGHTS_DIR, "ViT-B-32.pt")
+
+# Embedding cache configuration, an empty path disables the on-disk tier
+EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", default=10000))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", default="")
+EMBEDDING_CACHE_DISK_SIZE: int = int(
+    os.getenv("EMBEDDING_CACHE_DISK_SIZE", default=1000000)
+)
+
+# CLIP inference configuration
+# Inference backend: "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+CLIP_BACKEND = os.getenv("CLIP_BACKEND", default="torch")
+CLIP_BATCH_SIZE: int = int(os.getenv("CLIP_BATCH_SIZE", default=64))
+CLIP_PREPROCESS_WORKERS: int = int(
+    os.getenv("CLIP_PREPROCESS_WORKERS", default=min(4, os.cpu_count() or 1))
+)
+# Concurrent single-item requests are coalesced into batches of up to
+# CLIP_BATCH_MAX_SIZE, waiting at most CLIP_BATCH_MAX_WAIT_MS for more to arrive
+CLIP_BATCH_MAX_SIZE: int = int(os.getenv("CLIP_BATCH_MAX_SIZE", default=32))
+CLIP_BATCH_MAX_WAIT_MS: float = float(os.getenv("CLIP_BATCH_MAX_WAIT_MS", default=5))
+# Model inference runs on a dedicated pool, 0 keeps torch's default thread counts
+CLIP_INFERENCE_WORKERS: int = int(os.getenv("CLIP_INFERENCE_WORKERS", default=1))
+CLIP_TORCH_THREADS: int = int(os.getenv("CLIP_TORCH_THREADS", default=0))
+CLIP_TORCH_INTEROP_THREADS: int = int(
+    os.getenv("CLIP_TORCH_INTEROP_THREADS", default=0)
+)
+# Images larger than this after draft decoding are rejected
+IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", default=40_000_000))
+# Memory-map the cached weights instead of reading them into fresh tensors
+CLIP_MMAP_WEIGHTS = os.getenv("CLIP_MMAP_WEIGHTS", default="true").lower() == "true"
+# Load and warm the model in a background thread at startup
+CLIP_WARMUP = os.getenv("CLIP_WARMUP", default="true").lower() == "true"
 
 
 MSSQL_HOST = os.getenv("MSSQL_HOST", default="localhost")
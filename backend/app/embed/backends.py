@@ -0,0 +1,190 @@
+import os
+from abc import ABC, abstractmethod
+
+import torch
+from app.config import WEIGHTS_DIR, backend_logger
+
+
+class InferenceBackend(ABC):
+    """Runs the CLIP text and image towers, returning unnormalized float32 CPU tensors."""
+
+    name: str
+
+    @abstractmethod
+    def encode_text(self, tokens: torch.Tensor) -> torch.Tensor:
+        pass
+
+    @abstractmethod
+    def encode_image(self, pixels: torch.Tensor) -> torch.Tensor:
+        pass
+
+
+class TorchBackend(InferenceBackend):
+    """Eager PyTorch inference, fp32 on CPU or the model's device."""
+
+    name = "torch"
+
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        self.model = model
+        self.device = device
+
+    def encode_text(self, tokens: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.model.encode_text(tokens.to(self.device)).float().cpu()
+
+    def encode_image(self, pixels: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.model.encode_image(pixels.to(self.device)).float().cpu()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch with the Linear layers dynamically quantized to int8 (CPU only)."""
+
+    name = "int8"
+
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        if device.type != "cpu":
+            raise ValueError("The int8 CLIP backend only runs on CPU")
+        quantized = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        # open_clip reads the compute dtype from the MLP weights, which quantized
+        # Linear layers no longer expose, unless this attribute is set
+        for module in quantized.modules():
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+                module.int8_original_dtype = torch.float32
+        super().__init__(quantized, device)
+
+
+class _TextTower(torch.nn.Module):
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, tokens: torch.Tensor) -> torch.Tensor:
+        return self.model.encode_text(tokens)
+
+
+class _ImageTower(torch.nn.Module):
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixels: torch.Tensor) -> torch.Tensor:
+        return self.model.encode_image(pixels)
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime inference on models exported from the PyTorch weights.
+
+    The text and image towers are exported once to `export_dir` and re-exported
+    whenever the PyTorch weights file is newer than the export.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        weights_path: str,
+        export_dir: str = os.path.join(WEIGHTS_DIR, "onnx"),
+    ):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise RuntimeError(
+                "The onnx CLIP backend requires onnxruntime: uv add onnxruntime"
+            ) from e
+
+        os.makedirs(export_dir, exist_ok=True)
+        text_path = os.path.join(export_dir, "ViT-B-32-text.onnx")
+        image_path = os.path.join(export_dir, "ViT-B-32-image.onnx")
+        context_length = model.context_length
+        image_size = model.visual.image_size
+
+        if self._is_stale(text_path, weights_path):
+            self._export(
+                _TextTower(model),
+                torch.zeros((1, context_length), dtype=torch.long),
+                "tokens",
+                text_path,
+            )
+        if self._is_stale(image_path, weights_path):
+            self._export(
+                _ImageTower(model),
+                torch.zeros((1, 3, *image_size), dtype=torch.float32),
+                "pixels",
+                image_path,
+            )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        providers = ["CPUExecutionProvider"]
+        self.text_session = onnxruntime.InferenceSession(
+            text_path, options, providers=providers
+        )
+        self.image_session = onnxruntime.InferenceSession(
+            image_path, options, providers=providers
+        )
+
+    @staticmethod
+    def _is_stale(export_path: str, weights_path: str) -> bool:
+        if not os.path.isfile(export_path):
+            return True
+        return os.path.isfile(weights_path) and os.path.getmtime(
+            weights_path
+        ) > os.path.getmtime(export_path)
+
+    @staticmethod
+    def _export(
+        module: torch.nn.Module, example: torch.Tensor, input_name: str, path: str
+    ):
+        backend_logger.info(f"Exporting CLIP tower to {path}")
+        tmp_path = f"{path}.tmp"
+        # The fused attention fast path used in eval mode has no ONNX symbolic
+        fastpath_enabled = torch.backends.mha.get_fastpath_enabled()
+        torch.backends.mha.set_fastpath_enabled(False)
+        try:
+            torch.onnx.export(
+                module.cpu().eval(),
+                (example,),
+                tmp_path,
+                input_names=[input_name],
+                output_names=["embedding"],
+                dynamic_axes={input_name: {0: "batch"}, "embedding": {0: "batch"}},
+                opset_version=17,
+                dynamo=False,
+            )
+        finally:
+            torch.backends.mha.set_fastpath_enabled(fastpath_enabled)
+        os.replace(tmp_path, path)
+
+    def encode_text(self, tokens: torch.Tensor) -> torch.Tensor:
+        (embedding,) = self.text_session.run(
+            None, {"tokens": tokens.cpu().numpy().astype("int64")}
+        )
+        return torch.from_numpy(embedding).float()
+
+    def encode_image(self, pixels: torch.Tensor) -> torch.Tensor:
+        (embedding,) = self.image_session.run(
+            None, {"pixels": pixels.cpu().numpy().astype("float32")}
+        )
+        return torch.from_numpy(embedding).float()
+
+
+CLIP_BACKENDS = ["torch", "int8", "onnx"]
+
+
+def create_backend(
+    name: str, model: torch.nn.Module, device: torch.device, weights_path: str
+) -> InferenceBackend:
+    if name == "torch":
+        return TorchBackend(model, device)
+    if name == "int8":
+        return QuantizedTorchBackend(model, device)
+    if name == "onnx":
+        return OnnxBackend(model, weights_path)
+    raise ValueError(f"Unknown CLIP backend '{name}', expected one of {CLIP_BACKENDS}")
@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+from functools import lru_cache
+
+from app.config import CLIP_BATCH_MAX_SIZE, CLIP_BATCH_MAX_WAIT_MS, backend_logger
+from app.embed.cache import get_cached_clip_embedder
+from app.embed.clipembedder import get_clip_embedder
+from app.embed.executor import get_inference_executor
+from PIL import Image
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent single-item embedding requests into batched forward passes.
+
+    Requests are collected for up to `max_wait_ms` after the first one arrives,
+    or until `max_batch_size` items are queued. The batch then runs off the event
+    loop on the inference executor and every caller's future is resolved with
+    its own row.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[list], list[list[float]]],
+        max_batch_size: int = CLIP_BATCH_MAX_SIZE,
+        max_wait_ms: float = CLIP_BATCH_MAX_WAIT_MS,
+        name: str = "embedding",
+    ):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(self, item) -> list[float]:
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop):
+        # The queue and worker belong to one event loop, recreate them if the loop changed
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(), name=f"{self.name}-batcher")
+
+    async def _collect(self) -> list[tuple[any, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Closed while collecting, the requests taken so far get no result
+            for _, future in batch:
+                future.cancel()
+            raise
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that were cancelled while waiting don't need an embedding
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            backend_logger.trace(f"Running {self.name} batch of {len(items)}")
+            try:
+                results = await get_inference_executor().run(self.encode_batch, items)
+            except asyncio.CancelledError:
+                # Closed while the batch was running
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def aclose(self):
+        """Stop the worker, requests still queued or running are cancelled."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._worker = None
+
+
+def _encode_texts(texts: list[str]) -> list[list[float]]:
+    return get_cached_clip_embedder().embed_documents(texts)
+
+
+def _encode_images(images: list[Image.Image]) -> list[list[float]]:
+    return get_clip_embedder().encode_images(images).tolist()
+
+
+@lru_cache(maxsize=1)
+def get_text_batcher() -> EmbeddingBatcher:
+    return EmbeddingBatcher(_encode_texts, name="text")
+
+
+@lru_cache(maxsize=1)
+def get_image_batcher() -> EmbeddingBatcher:
+    return EmbeddingBatcher(_encode_images, name="image")
@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+import numpy as np
+from app.embed.backends import CLIP_BACKENDS
+from app.embed.batcher import EmbeddingBatcher
+from app.embed.clipembedder import CLIPEmbedder, get_clip_embedder
+from app.embed.utils import decode_image
+from PIL import Image
+
+
+def _sample_texts(n: int) -> list[str]:
+    return [
+        f"Product {i}: Chef Anton's Gumbo Mix, 36 boxes per unit, "
+        f"unit price {i % 97}.50, {i % 13} units in stock, category Condiments"
+        for i in range(n)
+    ]
+
+
+def _sample_images(n: int, size: tuple[int, int] = (640, 480)) -> list[Image.Image]:
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+        for _ in range(n)
+    ]
+
+
+def benchmark_text_batching(
+    embedder: CLIPEmbedder, n: int, batch_sizes: list[int]
+) -> None:
+    """Compare the per-string encoding loop against batched encode_texts."""
+    texts = _sample_texts(n)
+
+    # Warm up so the first measurement does not pay for lazy initialization
+    embedder.encode_texts(texts[:8])
+
+    start = time.perf_counter()
+    for text in texts:
+        embedder._encode_text(text)
+    loop_seconds = time.perf_counter() - start
+    print(
+        f"{'per-string loop':<20} {loop_seconds:8.3f}s {n / loop_seconds:10.1f} texts/s"
+    )
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        embedder.encode_texts(texts, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        print(
+            f"{f'batch_size={batch_size}':<20} {seconds:8.3f}s "
+            f"{n / seconds:10.1f} texts/s  x{loop_seconds / seconds:.2f}"
+        )
+
+
+async def _run_concurrent(embed, texts: list[str]) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+
+    async def one(text: str):
+        start = time.perf_counter()
+        await embed(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return time.perf_counter() - start, latencies
+
+
+def benchmark_micro_batching(
+    embedder: CLIPEmbedder, n: int, max_batch_size: int, max_wait_ms: float
+) -> None:
+    """Fire n concurrent single-text requests with and without the batching queue."""
+    texts = _sample_texts(n)
+    embedder.encode_texts(texts[:8])
+
+    async def unbatched(text: str):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, embedder._encode_text, text)
+
+    batcher = EmbeddingBatcher(
+        lambda items: embedder.encode_texts(items).tolist(),
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+    )
+
+    for name, embed in [("per-request", unbatched), ("micro-batched", batcher.submit)]:
+        seconds, latencies = asyncio.run(_run_concurrent(embed, texts))
+        p50 = statistics.median(latencies) * 1000
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+        print(
+            f"{name:<15} {n / seconds:10.1f} req/s  p50 {p50:8.1f}ms  p95 {p95:8.1f}ms"
+        )
+
+
+def _sample_jpeg(width: int, height: int) -> bytes:
+    # A smooth gradient with mild noise compresses like a photo, unlike pure noise
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels += rng.normal(0, 8, pixels.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(
+        buffer, "JPEG", quality=90
+    )
+    return buffer.getvalue()
+
+
+def benchmark_decode(embedder: CLIPEmbedder, megapixels: list[float], repeat: int):
+    """Compare full-resolution decode against draft/reduce decoding, per megapixel."""
+    print(f"{'size':>12} {'full ms/MP':>11} {'draft ms/MP':>12} {'speedup':>8}")
+    for mp in megapixels:
+        width = int((mp * 1_000_000 * 4 / 3) ** 0.5)
+        height = width * 3 // 4
+        data = _sample_jpeg(width, height)
+        actual_mp = width * height / 1_000_000
+
+        def full():
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            return embedder.preprocess(image)
+
+        def draft():
+            return embedder.preprocess(
+                decode_image(data, target_size=embedder.image_size)
+            )
+
+        timings = {}
+        for name, fn in [("full", full), ("draft", draft)]:
+            fn()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            timings[name] = (time.perf_counter() - start) / repeat * 1000 / actual_mp
+
+        print(
+            f"{f'{width}x{height}':>12} {timings['full']:11.2f} "
+            f"{timings['draft']:12.2f} x{timings['full'] / timings['draft']:7.2f}"
+        )
+
+
+def benchmark_backends(backends: list[str], n: int) -> None:
+    """Compare each inference backend's speed and cosine agreement with fp32 PyTorch."""
+    texts = _sample_texts(n)
+    images = _sample_images(max(n // 4, 1))
+
+    reference = CLIPEmbedder(backend="torch")
+    reference_texts = reference.encode_texts(texts)
+    reference_images = reference.encode_images(images)
+
+    print(
+        f"{'backend':<8} {'load':>7} {'texts/s':>9} {'images/s':>9} "
+        f"{'text cos mean/min':>19} {'image cos mean/min':>19}"
+    )
+    for name in backends:
+        embedder = reference if name == "torch" else CLIPEmbedder(backend=name)
+        embedder.warmup()
+
+        start = time.perf_counter()
+        text_embeddings = embedder.encode_texts(texts)
+        text_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        image_embeddings = embedder.encode_images(images)
+        image_seconds = time.perf_counter() - start
+
+        # Rows are normalized, so the row-wise dot product is the cosine similarity
+        text_cos = (text_embeddings * reference_texts).sum(dim=-1)
+        image_cos = (image_embeddings * reference_images).sum(dim=-1)
+        print(
+            f"{name:<8} {embedder.load_seconds:6.2f}s "
+            f"{len(texts) / text_seconds:9.1f} {len(images) / image_seconds:9.1f} "
+            f"{text_cos.mean():10.5f}/{text_cos.min():.5f} "
+            f"{image_cos.mean():10.5f}/{image_cos.min():.5f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP embedding benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    text_parser = subparsers.add_parser("text", help="Batched text encoding")
+    text_parser.add_argument("-n", type=int, default=512)
+    text_parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[8, 32, 64, 128]
+    )
+
+    batching_parser = subparsers.add_parser(
+        "batching", help="Concurrent requests through the micro-batching queue"
+    )
+    batching_parser.add_argument("-n", type=int, default=256)
+    batching_parser.add_argument("--max-batch-size", type=int, default=32)
+    batching_parser.add_argument("--max-wait-ms", type=float, default=5)
+
+    backends_parser = subparsers.add_parser(
+        "backends", help="Accuracy and throughput of each inference backend"
+    )
+    backends_parser.add_argument("-n", type=int, default=256)
+    backends_parser.add_argument(
+        "--backends", nargs="+", choices=CLIP_BACKENDS, default=CLIP_BACKENDS
+    )
+
+    decode_parser = subparsers.add_parser(
+        "decode", help="Image decode + preprocess time per megapixel"
+    )
+    decode_parser.add_argument(
+        "--megapixels", type=float, nargs="+", default=[0.3, 2, 8, 24]
+    )
+    decode_parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.benchmark == "text":
+        benchmark_text_batching(get_clip_embedder(), args.n, args.batch_sizes)
+    elif args.benchmark == "batching":
+        benchmark_micro_batching(
+            get_clip_embedder(), args.n, args.max_batch_size, args.max_wait_ms
+        )
+    elif args.benchmark == "decode":
+        benchmark_decode(get_clip_embedder(), args.megapixels, args.repeat)
+    elif args.benchmark == "backends":
+        benchmark_backends(args.backends, args.n)
+
+
+# uv run python -m app.embed.benchmark text -n 512
+if __name__ == "__main__":
+    main()
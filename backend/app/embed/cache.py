@@ -0,0 +1,211 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import override
+
+import numpy as np
+from app.config import (
+    EMBEDDING_CACHE_DISK_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_SIZE,
+    backend_logger,
+)
+from app.embed.clipembedder import get_clip_embedder
+from langchain_core.embeddings.embeddings import Embeddings
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Entries are keyed by sha256(model id + text). Lookups go to an in-memory LRU
+    first, then to an optional sqlite file that survives restarts. Both tiers
+    evict least recently used entries once they exceed their size.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_entries: int = EMBEDDING_CACHE_SIZE,
+        path: str | None = EMBEDDING_CACHE_PATH or None,
+        max_disk_entries: int = EMBEDDING_CACHE_DISK_SIZE,
+    ):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._disk_count = 0
+        if path:
+            self._open_disk(path)
+
+    def _open_disk(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)"
+        )
+        self._db.commit()
+        self._disk_count = self._db.execute(
+            "SELECT COUNT(*) FROM embeddings"
+        ).fetchone()[0]
+        backend_logger.info(
+            f"Embedding cache opened at {path} with {self._disk_count} entries"
+        )
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        """Look up texts, returns None for every text that is not cached."""
+        keys = [self.key(text) for text in texts]
+        results: list[np.ndarray | None] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self._db is not None:
+                for key, vector in self._read_disk(list(missing)):
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        results[i] = vector
+                        self.disk_hits += 1
+
+            self.misses += sum(len(indices) for indices in missing.values())
+
+        return [vector.tolist() if vector is not None else None for vector in results]
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]):
+        entries = [
+            (self.key(text), np.asarray(vector, dtype=np.float32))
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            for key, vector in entries:
+                self._remember(key, vector)
+            if self._db is not None:
+                self._write_disk(entries)
+
+    def stats(self) -> dict[str, any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model_id": self.model_id,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_count,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: list[str]) -> list[tuple[str, np.ndarray]]:
+        found: list[tuple[str, np.ndarray]] = []
+        # Stay well under sqlite's bound parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            found.extend(
+                (key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows
+            )
+        if found:
+            now = time.time()
+            self._db.executemany(
+                "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                [(now, key) for key, _ in found],
+            )
+            self._db.commit()
+        return found
+
+    def _write_disk(self, entries: list[tuple[str, np.ndarray]]):
+        now = time.time()
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)",
+            [(key, vector.tobytes(), now) for key, vector in entries],
+        )
+        self._disk_count += self._db.total_changes - before
+
+        if self._disk_count > self.max_disk_entries:
+            # Evict a little more than needed so we don't evict on every write
+            excess = self._disk_count - self.max_disk_entries
+            excess += self.max_disk_entries // 10
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            self._disk_count = self._db.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+        self._db.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from an EmbeddingCache."""
+
+    def __init__(self, embedder: Embeddings, cache: EmbeddingCache):
+        self.embedder = embedder
+        self.cache = cache
+
+    @override
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    @override
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        embeddings = self.cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        computed = self.embedder.embed_documents(unique_texts)
+        self.cache.put_many(unique_texts, computed)
+
+        by_text = dict(zip(unique_texts, computed))
+        for i in missing:
+            embeddings[i] = by_text[texts[i]]
+        return embeddings
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    return EmbeddingCache(model_id=get_clip_embedder().model_id)
+
+
+@lru_cache(maxsize=1)
+def get_cached_clip_embedder() -> CachedEmbeddings:
+    return CachedEmbeddings(get_clip_embedder(), get_embedding_cache())
@@ -1,46 +1,112 @@
 import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from typing import override
 
 # see: https://github.com/mlfoundations/open_clip
 import open_clip
 import torch
-from app.config import EMBEDDING_MODEL_PATH, WEIGHTS_DIR, backend_logger
+from app.config import (
+    CLIP_BACKEND,
+    CLIP_BATCH_SIZE,
+    CLIP_MMAP_WEIGHTS,
+    CLIP_PREPROCESS_WORKERS,
+    EMBEDDING_MODEL_PATH,
+    backend_logger,
+)
+from app.embed.backends import create_backend
+from app.embed.utils import decode_image
 from langchain_core.embeddings.embeddings import Embeddings
 from PIL import Image
 from PIL.ImageFile import ImageFile
 
 
 class CLIPEmbedder(Embeddings):
-    def __init__(self):
+    def __init__(self, backend: str = CLIP_BACKEND):
         """
         Initialize the CLIPEmbedder by loading the CLIP model, preprocessing pipeline, and tokenizer.
+
+        Args:
+            backend (str): Inference backend, one of "torch" (fp32), "int8" or "onnx".
         """
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self._save_model(WEIGHTS_DIR)
+        # The quantized and ONNX backends are CPU-only
+        use_cuda = backend == "torch" and torch.cuda.is_available()
+        self.device = torch.device("cuda" if use_cuda else "cpu")
+        # Backends produce slightly different vectors, keep their cache entries apart
+        self.model_id = "ViT-B-32/openai"
+        if backend != "torch":
+            self.model_id += f"+{backend}"
+
+        start = time.perf_counter()
         self.model, self.preprocess, self.tokenizer = self._load_model(
             EMBEDDING_MODEL_PATH
         )
+        self.backend = create_backend(
+            backend, self.model, self.device, EMBEDDING_MODEL_PATH
+        )
+        self.load_seconds = time.perf_counter() - start
+        self.warmup_seconds: float | None = None
+        backend_logger.info(
+            f"CLIP model loaded with {backend} backend in {self.load_seconds:.2f}s"
+        )
+
+        self.embedding_dim: int = self.model.visual.output_dim
+        self.image_size: int = min(self.model.visual.image_size)
+        self._preprocess_pool = ThreadPoolExecutor(
+            max_workers=CLIP_PREPROCESS_WORKERS, thread_name_prefix="clip-preprocess"
+        )
 
     @override
     def embed_query(self, text: str) -> list[float]:
         return self._encode_text(text)
 
     @override
-    def embed_documents(self, texts) -> list[list[float]]:
-        return [self._encode_text(text) for text in texts]
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.encode_texts(texts).tolist()
 
-    def _save_model(self, path: str):
-        os.makedirs(path, exist_ok=True)
-        model, _, _ = open_clip.create_model_and_transforms(
-            "ViT-B-32", pretrained="openai", force_quick_gelu=True
-        )
-        torch.save(model.state_dict(), f"{path}/ViT-B-32.pt")
+    def warmup(self) -> float:
+        """Run one text and one image forward pass so the first request does not pay for it."""
+        start = time.perf_counter()
+        self.encode_texts(["warmup"])
+        self.encode_image(Image.new("RGB", (224, 224)))
+        self.warmup_seconds = time.perf_counter() - start
+        backend_logger.info(f"CLIP model warmed up in {self.warmup_seconds:.2f}s")
+        return self.warmup_seconds
+
+    def _save_model(self, model: torch.nn.Module, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Write to a temporary file first so an interrupted save never leaves
+        # a truncated file that looks like valid cached weights
+        tmp_path = f"{path}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+        backend_logger.info(f"CLIP weights saved to {path}")
+
+    def _load_cached_weights(self, path: str) -> dict[str, torch.Tensor] | None:
+        """Load the cached state dict, or return None if it is missing or unreadable."""
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return None
+        try:
+            return torch.load(
+                path,
+                map_location=self.device,
+                mmap=CLIP_MMAP_WEIGHTS,
+                weights_only=True,
+            )
+        except Exception as e:
+            backend_logger.warning(f"Ignoring invalid cached CLIP weights {path}: {e}")
+            return None
 
     def _load_model(self, path: str):
         """
         Load the CLIP model, preprocessing transforms, and tokenizer.
 
+        Cached weights at `path` are used when they are valid. Otherwise the
+        pretrained weights are downloaded once and saved to `path`.
+
         Args:
             path (str): Path to the model weights.
 
@@ -48,10 +114,19 @@ class CLIPEmbedder(Embeddings):
             tuple: model, preprocessing function, tokenizer
         """
         try:
+            state_dict = self._load_cached_weights(path)
             model, _, preprocess = open_clip.create_model_and_transforms(
-                model_name="ViT-B-32", pretrained=None, force_quick_gelu=True
+                model_name="ViT-B-32",
+                pretrained=None if state_dict is not None else "openai",
+                force_quick_gelu=True,
             )
-            model.load_state_dict(torch.load(path, map_location=self.device))
+            if state_dict is None:
+                self._save_model(model, path)
+            else:
+                # Assigning keeps the parameters backed by the mmap'd file
+                # instead of copying them into freshly allocated tensors
+                assign = CLIP_MMAP_WEIGHTS and self.device.type == "cpu"
+                model.load_state_dict(state_dict, assign=assign)
             model.to(self.device)
             model.eval()
             tokenizer = open_clip.get_tokenizer("ViT-B-32")
@@ -59,25 +134,175 @@ class CLIPEmbedder(Embeddings):
         except Exception as e:
             raise RuntimeError(f"Failed to load CLIP model from {path}: {e}")
 
+    def decode_image(self, data: bytes) -> Image.Image:
+        """Decode image bytes at the smallest resolution the preprocess transform needs."""
+        return decode_image(data, target_size=self.image_size)
+
     def encode_image_path(self, image_path: str) -> list[float]:
         image = Image.open(image_path)
         return self.encode_image(image)
 
     def encode_image(self, image: ImageFile) -> list[float]:
-        image = self.preprocess(image).unsqueeze(0)
-        with torch.no_grad():
-            embedding = self.model.encode_image(image)
-            embedding /= embedding.norm(dim=-1, keepdim=True)
-        return embedding.squeeze(0).cpu().tolist()
+        pixels = self.preprocess(image).unsqueeze(0)
+        return self._encode_pixels(pixels).squeeze(0).tolist()
+
+    def encode_images(
+        self, images: list[Image.Image], batch_size: int | None = None
+    ) -> torch.Tensor:
+        """
+        Encode a list of PIL images into one normalized embedding matrix.
+
+        Args:
+            images (list[Image.Image]): Decoded images.
+            batch_size (int | None): Max images per forward pass. Defaults to CLIP_BATCH_SIZE.
+
+        Returns:
+            torch.Tensor: Float32 tensor of shape (len(images), embedding_dim) on CPU.
+        """
+        embeddings, _ = self._encode_image_batches(images, self.preprocess, batch_size)
+        return embeddings
+
+    def encode_image_bytes(
+        self, blobs: list[bytes], batch_size: int | None = None
+    ) -> tuple[torch.Tensor, list[int]]:
+        """
+        Decode and encode raw image bytes in batches.
+
+        Blobs that fail to decode are skipped instead of failing the whole batch.
+
+        Args:
+            blobs (list[bytes]): Encoded image files (JPEG, PNG, BMP, ...).
+            batch_size (int | None): Max images per forward pass. Defaults to CLIP_BATCH_SIZE.
+
+        Returns:
+            tuple: embedding matrix, indices of the blobs it contains (in order)
+        """
+        return self._encode_image_batches(
+            blobs, lambda data: self.preprocess(self.decode_image(data)), batch_size
+        )
+
+    def _encode_image_batches(
+        self,
+        items: list,
+        transform: Callable[[any], torch.Tensor],
+        batch_size: int | None = None,
+    ) -> tuple[torch.Tensor, list[int]]:
+        """
+        Run `transform` on the preprocessing pool and encode the results batch by batch.
+
+        The next batch is decoded and preprocessed by the worker pool while the
+        current one runs through the model, so the forward pass is not starved.
+        """
+        batch_size = batch_size or CLIP_BATCH_SIZE
+        starts = range(0, len(items), batch_size)
+
+        def submit(start: int):
+            return [
+                self._preprocess_pool.submit(transform, item)
+                for item in items[start : start + batch_size]
+            ]
+
+        chunks: list[torch.Tensor] = []
+        indices: list[int] = []
+        pending = submit(0) if items else []
+        for start in starts:
+            pixels: list[torch.Tensor] = []
+            for offset, future in enumerate(pending):
+                try:
+                    pixels.append(future.result())
+                    indices.append(start + offset)
+                except Exception as e:
+                    backend_logger.warning(
+                        f"Failed to preprocess image {start + offset}: {e}"
+                    )
+
+            if start + batch_size < len(items):
+                pending = submit(start + batch_size)
+
+            if pixels:
+                chunks.append(self._encode_pixels(torch.stack(pixels)))
+
+        if not chunks:
+            return torch.empty((0, self.embedding_dim), dtype=torch.float32), indices
+        return torch.cat(chunks), indices
+
+    def _encode_pixels(self, pixels: torch.Tensor) -> torch.Tensor:
+        embedding = self.backend.encode_image(pixels)
+        embedding /= embedding.norm(dim=-1, keepdim=True)
+        return embedding
 
     def _encode_text(self, text: str) -> list[float]:
         tokens = self.tokenizer([text])
-        with torch.no_grad():
-            embedding = self.model.encode_text(tokens.to(self.device))
+        embedding = self.backend.encode_text(tokens)
+        embedding /= embedding.norm(dim=-1, keepdim=True)
+        return embedding.squeeze(0).tolist()
+
+    def encode_texts(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> torch.Tensor:
+        """
+        Encode a list of texts into one normalized embedding matrix.
+
+        The whole list is tokenized at once and fed to the model in chunks of
+        at most `batch_size` rows, instead of one forward pass per string.
+
+        Args:
+            texts (list[str]): Texts to encode.
+            batch_size (int | None): Max rows per forward pass. Defaults to CLIP_BATCH_SIZE.
+
+        Returns:
+            torch.Tensor: Contiguous float32 tensor of shape (len(texts), embedding_dim) on CPU.
+        """
+        if not texts:
+            return torch.empty((0, self.embedding_dim), dtype=torch.float32)
+
+        batch_size = batch_size or CLIP_BATCH_SIZE
+        tokens = self.tokenizer(list(texts))
+        embeddings = torch.empty((len(tokens), self.embedding_dim), dtype=torch.float32)
+        for start in range(0, len(tokens), batch_size):
+            embedding = self.backend.encode_text(tokens[start : start + batch_size])
             embedding /= embedding.norm(dim=-1, keepdim=True)
-        return embedding.squeeze(0).cpu().tolist()
+            embeddings[start : start + len(embedding)] = embedding
+        return embeddings
+
+
+_clip_embedder_lock = threading.Lock()
 
 
 @lru_cache(maxsize=1)
-def get_clip_embedder() -> CLIPEmbedder:
+def _create_clip_embedder() -> CLIPEmbedder:
     return CLIPEmbedder()
+
+
+def get_clip_embedder() -> CLIPEmbedder:
+    # Once the model is loaded every embedding call returns it without the lock
+    if _create_clip_embedder.cache_info().currsize:
+        return _create_clip_embedder()
+    # The lock is held for the whole load on purpose: a request arriving while
+    # the warmup thread loads the model waits for it instead of loading a
+    # second copy
+    with _clip_embedder_lock:
+        return _create_clip_embedder()
+
+
+def start_clip_warmup() -> threading.Thread:
+    """Load and warm the CLIP model in a background thread."""
+    thread = threading.Thread(
+        target=lambda: get_clip_embedder().warmup(), name="clip-warmup", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def get_clip_embedder_status() -> dict[str, any]:
+    """Report whether the model is loaded and how long loading and warmup took."""
+    if _create_clip_embedder.cache_info().currsize == 0:
+        return {"loaded": False, "load_seconds": None, "warmup_seconds": None}
+    embedder = _create_clip_embedder()
+    return {
+        "loaded": True,
+        "backend": embedder.backend.name,
+        "device": str(embedder.device),
+        "load_seconds": embedder.load_seconds,
+        "warmup_seconds": embedder.warmup_seconds,
+    }
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import torch
+from app.config import (
+    CLIP_INFERENCE_WORKERS,
+    CLIP_TORCH_INTEROP_THREADS,
+    CLIP_TORCH_THREADS,
+    backend_logger,
+)
+
+
+class InferenceExecutor:
+    """
+    Thread pool dedicated to model inference.
+
+    Async handlers await `run` instead of calling the model directly, so a forward
+    pass never blocks the event loop and inference never competes with the
+    default executor used for I/O. Torch's intra-op and inter-op thread counts
+    are set when the executor is created.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = CLIP_INFERENCE_WORKERS,
+        torch_threads: int = CLIP_TORCH_THREADS,
+        torch_interop_threads: int = CLIP_TORCH_INTEROP_THREADS,
+    ):
+        if torch_threads > 0:
+            torch.set_num_threads(torch_threads)
+        if torch_interop_threads > 0:
+            try:
+                torch.set_num_interop_threads(torch_interop_threads)
+            except RuntimeError as e:
+                # Only allowed before torch has started any inter-op work
+                backend_logger.warning(f"Could not set torch inter-op threads: {e}")
+
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="clip-inference"
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        backend_logger.info(
+            f"Inference executor started with {max_workers} workers, "
+            f"{torch.get_num_threads()} torch threads"
+        )
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` on the inference pool and await its result."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_seconds += started - submitted
+            try:
+                result = fn(*args)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.run_seconds += time.perf_counter() - started
+            return result
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool, calls that have not started yet are cancelled."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "torch_threads": torch.get_num_threads(),
+                "torch_interop_threads": torch.get_num_interop_threads(),
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_seconds": self.wait_seconds / self.completed
+                if self.completed
+                else 0.0,
+                "avg_run_seconds": self.run_seconds / self.completed
+                if self.completed
+                else 0.0,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_inference_executor() -> InferenceExecutor:
+    return InferenceExecutor()
@@ -0,0 +1,13 @@
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class EmbeddingFormat(str, Enum):
+    json = "json"
+    f32 = "f32"
+    npy = "npy"
+
+
+class EmbedTextsRequest(BaseModel):
+    texts: list[str] = Field(..., description="Texts to embed", min_length=1)
@@ -1,27 +1,180 @@
 # llm_server/embeddings/nomic_embedder.py
 
+import asyncio
+import time
+from functools import lru_cache
+from typing import override
+
+import httpx
 import requests
+from app.config import (
+    NOMIC_BATCH_SIZE,
+    NOMIC_MAX_CONCURRENCY,
+    NOMIC_MAX_RETRIES,
+    NOMIC_MODEL,
+    OLLAMA_BASE_URL,
+    backend_logger,
+)
+from app.exceptions.errors import EmbeddingServiceError
+from langchain_core.embeddings.embeddings import Embeddings
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
 
+class NomicEmbedder(Embeddings):
+    """
+    Text embedder backed by Ollama's `/api/embed` endpoint.
 
-class NomicEmbedder:
-    def __init__(self, model="nomic-embed-text", base_url="http://localhost:11434"):
+    Texts are sent in chunks of `batch_size` per request over pooled keep-alive
+    connections. Failed requests are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        model: str = NOMIC_MODEL,
+        base_url: str = OLLAMA_BASE_URL,
+        batch_size: int = NOMIC_BATCH_SIZE,
+        max_concurrency: int = NOMIC_MAX_CONCURRENCY,
+        max_retries: int = NOMIC_MAX_RETRIES,
+        backoff_seconds: float = 0.5,
+        timeout: float = 60.0,
+    ):
         self.model = model
         self.url = f"{base_url}/api/embed"
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._async_client: httpx.AsyncClient | None = None
+
+    @override
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    @override
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        embeddings: list[list[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed_batch(texts[start : start + self.batch_size]))
+        return embeddings
+
+    @override
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    @override
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        batches = await asyncio.gather(
+            *(
+                embed_batch(texts[start : start + self.batch_size])
+                for start in range(0, len(texts), self.batch_size)
+            )
+        )
+        return [embedding for batch in batches for embedding in batch]
 
     def embed_text(self, text: str) -> list[float]:
-        payload = {"model": self.model, "input": text}
-        try:
-            response = requests.post(self.url, json=payload)
-            response.raise_for_status()
-            embedding = response.json().get("embeddings", [])[0]
-            return embedding
-        except Exception as e:
-            print(f"Failed to generate embedding: {e}")
-            return []
+        return self.embed_query(text)
 
     def embed_image(self, image_path: str) -> list[float]:
         raise NotImplementedError("OllamaEmbedder does not support image embeddings.")
 
+    async def aclose(self):
+        self.session.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _payload(self, texts: list[str]) -> dict[str, any]:
+        return {"model": self.model, "input": texts}
+
+    def _parse(self, texts: list[str], body: dict[str, any]) -> list[list[float]]:
+        embeddings = body.get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise EmbeddingServiceError(
+                f"Expected {len(texts)} embeddings from {self.url}, got {len(embeddings)}"
+            )
+        return embeddings
+
+    def _should_retry(self, attempt: int, status_code: int | None) -> bool:
+        retryable = status_code is None or status_code in RETRYABLE_STATUS_CODES
+        return retryable and attempt < self.max_retries
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(
+                    self.url, json=self._payload(texts), timeout=self.timeout
+                )
+                response.raise_for_status()
+                return self._parse(texts, response.json())
+            except requests.RequestException as e:
+                status_code = e.response.status_code if e.response is not None else None
+                if not self._should_retry(attempt, status_code):
+                    raise EmbeddingServiceError(
+                        f"Failed to generate embeddings: {e}"
+                    ) from e
+                delay = self.backoff_seconds * 2**attempt
+                backend_logger.warning(
+                    f"Embedding request failed, retrying in {delay}s: {e}"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        client = self._get_async_client()
+        attempt = 0
+        while True:
+            try:
+                response = await client.post(self.url, json=self._payload(texts))
+                response.raise_for_status()
+                return self._parse(texts, response.json())
+            except httpx.HTTPError as e:
+                status_code = (
+                    e.response.status_code
+                    if isinstance(e, httpx.HTTPStatusError)
+                    else None
+                )
+                if not self._should_retry(attempt, status_code):
+                    raise EmbeddingServiceError(
+                        f"Failed to generate embeddings: {e}"
+                    ) from e
+                delay = self.backoff_seconds * 2**attempt
+                backend_logger.warning(
+                    f"Embedding request failed, retrying in {delay}s: {e}"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._async_client
+
+
+@lru_cache(maxsize=1)
+def get_nomic_embedder() -> NomicEmbedder:
+    return NomicEmbedder()
+
 
 if __name__ == "__main__":
     print(len(NomicEmbedder().embed_text("Hi")))
@@ -1,11 +1,24 @@
-from app.embed.service import get_text_embeddings, get_image_uploadfile_embeddings
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+import io
+
+import numpy as np
+from app.embed.models import EmbeddingFormat, EmbedTextsRequest
+from app.embed.service import (
+    aget_text_embeddings,
+    get_embedding_cache_stats,
+    get_image_uploadfile_embeddings,
+    get_inference_executor_stats,
+    get_texts_embedding_matrix,
+    get_uploadfiles_embedding_matrix,
+)
+from app.exceptions.errors import InvalidImageError
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse, Response
 
 router = APIRouter()
 
 
 @router.post("/embed-text", summary="Generate embeddings for text")
-def embed_image_text(
+async def embed_image_text(
     text: str = Form(..., description="Text to embed"),
 ) -> list[float]:
     """
@@ -22,7 +35,7 @@ def embed_image_text(
         EmbedderResponse containing embeddings and similarity score
     """
     try:
-        return get_text_embeddings(text)
+        return await aget_text_embeddings(text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -44,10 +57,126 @@ async def embed_image(
     Returns:
         List of 512 float values representing the image embedding
     """
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="Invalid image type")
-
     try:
         return await get_image_uploadfile_embeddings(file)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _embedding_response(embeddings: np.ndarray, format: EmbeddingFormat) -> Response:
+    """Serialize an embedding matrix as JSON, raw little-endian float32 or .npy."""
+    embeddings = embeddings.astype("<f4", copy=False)
+    headers = {
+        "X-Embedding-Shape": ",".join(str(dim) for dim in embeddings.shape),
+        "X-Embedding-Dtype": "float32",
+    }
+    if format == EmbeddingFormat.f32:
+        return Response(
+            content=embeddings.tobytes(),
+            media_type="application/octet-stream",
+            headers=headers,
+        )
+    if format == EmbeddingFormat.npy:
+        buffer = io.BytesIO()
+        np.save(buffer, embeddings, allow_pickle=False)
+        return Response(
+            content=buffer.getvalue(),
+            media_type="application/x-npy",
+            headers=headers,
+        )
+    return JSONResponse(content=embeddings.tolist(), headers=headers)
+
+
+@router.post(
+    "/embed-texts",
+    summary="Generate embeddings for many texts",
+    responses={
+        200: {"content": {"application/octet-stream": {}, "application/x-npy": {}}}
+    },
+)
+async def embed_texts(
+    request: EmbedTextsRequest,
+    format: EmbeddingFormat = Query(
+        EmbeddingFormat.json, description="Response encoding: json, f32 or npy"
+    ),
+) -> Response:
+    """
+    Generate CLIP embeddings for a list of texts in one request.
+
+    The texts are embedded in batches and returned as a (len(texts), 512) matrix,
+    row i being the embedding of texts[i]. The shape is also sent in the
+    `X-Embedding-Shape` header.
+
+    Args:
+        request: Texts to embed
+        format: `json` (list of lists), `f32` (raw little-endian float32 buffer)
+            or `npy` (NumPy .npy stream)
+
+    Returns:
+        The embedding matrix in the requested format
+    """
+    try:
+        embeddings = await get_texts_embedding_matrix(request.texts)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _embedding_response(embeddings, format)
+
+
+@router.post(
+    "/embed-images",
+    summary="Generate embeddings for many images",
+    responses={
+        200: {"content": {"application/octet-stream": {}, "application/x-npy": {}}}
+    },
+)
+async def embed_images(
+    files: list[UploadFile] = File(..., description="Image files to embed"),
+    format: EmbeddingFormat = Query(
+        EmbeddingFormat.json, description="Response encoding: json, f32 or npy"
+    ),
+) -> Response:
+    """
+    Generate CLIP embeddings for many uploaded images in one multipart request.
+
+    Row i of the returned (len(files), 512) matrix is the embedding of files[i].
+
+    Args:
+        files: Image files (JPEG, PNG, etc.)
+        format: `json` (list of lists), `f32` (raw little-endian float32 buffer)
+            or `npy` (NumPy .npy stream)
+
+    Returns:
+        The embedding matrix in the requested format
+    """
+    try:
+        embeddings = await get_uploadfiles_embedding_matrix(files)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return _embedding_response(embeddings, format)
+
+
+@router.get("/cache-stats", summary="Get embedding cache statistics")
+def cache_stats() -> dict:
+    """
+    Report the size and hit/miss counters of the text embedding cache.
+
+    Returns:
+        dict: Entries held in memory and on disk, hits, misses and hit rate
+    """
+    return get_embedding_cache_stats()
+
+
+@router.get("/executor-stats", summary="Get inference executor statistics")
+def executor_stats() -> dict:
+    """
+    Report the queue depth and timings of the model inference executor.
+
+    Returns:
+        dict: Worker and torch thread counts, queued/running/completed jobs
+            and average queue wait and run times in seconds
+    """
+    return get_inference_executor_stats()
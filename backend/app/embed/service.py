@@ -1,20 +1,107 @@
-import io
+import asyncio
 
+import numpy as np
+from app.embed.batcher import get_image_batcher, get_text_batcher
+from app.embed.cache import get_cached_clip_embedder, get_embedding_cache
 from app.embed.clipembedder import get_clip_embedder
+from app.embed.executor import get_inference_executor
+from app.embed.nomic_embedder import get_nomic_embedder
+from app.exceptions.errors import InvalidImageError
 from fastapi import UploadFile
-from PIL import Image
 from PIL.ImageFile import ImageFile
 
 
 def get_text_embeddings(text: str) -> list[float]:
-    return get_clip_embedder().embed_query(text)
+    return get_cached_clip_embedder().embed_query(text)
+
+
+async def aget_text_embeddings(text: str) -> list[float]:
+    return await get_text_batcher().submit(text)
+
+
+def get_texts_embeddings(texts: list[str]) -> list[list[float]]:
+    return get_cached_clip_embedder().embed_documents(texts)
+
+
+async def aget_texts_embeddings(texts: list[str]) -> list[list[float]]:
+    return await get_inference_executor().run(get_texts_embeddings, texts)
+
+
+def get_embedding_cache_stats() -> dict[str, any]:
+    return get_embedding_cache().stats()
+
+
+def get_inference_executor_stats() -> dict[str, any]:
+    return get_inference_executor().stats()
+
+
+async def close_embedders():
+    """
+    Stop the embedding batchers and the inference executor and close the Nomic
+    embedder's connections, called when the app shuts down.
+    """
+    for get_batcher in (get_text_batcher, get_image_batcher):
+        if get_batcher.cache_info().currsize:
+            await get_batcher().aclose()
+    if get_inference_executor.cache_info().currsize:
+        # Waits for the forward passes already running
+        await asyncio.to_thread(get_inference_executor().shutdown)
+    if get_nomic_embedder.cache_info().currsize:
+        await get_nomic_embedder().aclose()
+    get_text_batcher.cache_clear()
+    get_image_batcher.cache_clear()
+    get_inference_executor.cache_clear()
+    get_nomic_embedder.cache_clear()
 
 
 def get_image_file_embeddings(image: ImageFile) -> list[float]:
     return get_clip_embedder().encode_image(image)
 
 
+def get_image_bytes_embeddings(
+    blobs: list[bytes],
+) -> tuple[list[list[float]], list[int]]:
+    """Embed encoded images in batches. Returns the embeddings and the indices of the blobs that decoded."""
+    embeddings, indices = get_clip_embedder().encode_image_bytes(blobs)
+    return embeddings.tolist(), indices
+
+
+async def aget_image_bytes_embeddings(
+    blobs: list[bytes],
+) -> tuple[list[list[float]], list[int]]:
+    return await get_inference_executor().run(get_image_bytes_embeddings, blobs)
+
+
 async def get_image_uploadfile_embeddings(file: UploadFile) -> list[float]:
+    """
+    Embed an uploaded image file.
+
+    Raises:
+        InvalidImageError: if the file is not a supported image or is too large
+    """
     contents = await file.read()
-    image: ImageFile = Image.open(io.BytesIO(contents)).convert("RGB")
-    return get_clip_embedder().encode_image(image)
+    # Decoding is CPU work too, but it should not queue behind model inference
+    image = await asyncio.to_thread(lambda: get_clip_embedder().decode_image(contents))
+    return await get_image_batcher().submit(image)
+
+
+async def get_texts_embedding_matrix(texts: list[str]) -> np.ndarray:
+    return np.asarray(await aget_texts_embeddings(texts), dtype=np.float32)
+
+
+async def get_uploadfiles_embedding_matrix(files: list[UploadFile]) -> np.ndarray:
+    """
+    Embed uploaded image files as one (len(files), dim) float32 matrix.
+
+    Raises:
+        InvalidImageError: if any of the files cannot be decoded
+    """
+    blobs = [await file.read() for file in files]
+    embeddings, indices = await get_inference_executor().run(
+        lambda: get_clip_embedder().encode_image_bytes(blobs)
+    )
+    if len(indices) != len(files):
+        failed = sorted(set(range(len(files))) - set(indices))
+        names = ", ".join(files[i].filename or str(i) for i in failed)
+        raise InvalidImageError(f"Could not decode {names}")
+    return embeddings.numpy()
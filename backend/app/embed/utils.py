@@ -0,0 +1,71 @@
+import io
+
+from app.config import IMAGE_MAX_PIXELS
+from app.exceptions.errors import InvalidImageError
+from PIL import Image
+
+# Leading bytes of the image formats we accept, checked instead of the
+# client-supplied content type
+IMAGE_SIGNATURES: list[tuple[bytes, str]] = [
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+]
+
+
+def sniff_image_format(data: bytes) -> str | None:
+    """Return the PIL format name of an encoded image from its magic bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, format in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return format
+    return None
+
+
+def decode_image(
+    data: bytes, target_size: int = 224, max_pixels: int = IMAGE_MAX_PIXELS
+) -> Image.Image:
+    """
+    Decode raw image bytes into an RGB image no larger than needed.
+
+    CLIP resizes the shorter side to `target_size` anyway, so JPEGs are decoded
+    directly at the smallest DCT scale (1/2, 1/4 or 1/8) that keeps both sides
+    at least `target_size`, and other formats are box-reduced by an integer
+    factor right after decoding.
+
+    Raises:
+        InvalidImageError: if the bytes are not a supported image format, are
+            corrupt or truncated, or the image is still larger than `max_pixels`
+            after draft decoding
+    """
+    format = sniff_image_format(data)
+    if format is None:
+        raise InvalidImageError("Unrecognized image format")
+
+    try:
+        # Opening only reads the header, nothing is decoded yet
+        image = Image.open(io.BytesIO(data), formats=[format])
+        if format == "JPEG":
+            image.draft("RGB", (target_size, target_size))
+
+        width, height = image.size
+        if width * height > max_pixels:
+            raise InvalidImageError(
+                f"Image of {width}x{height} pixels exceeds the limit of {max_pixels}"
+            )
+
+        image = image.convert("RGB")
+        factor = min(image.size) // target_size
+        if factor >= 2:
+            image = image.reduce(factor)
+        return image
+    except Image.DecompressionBombError as e:
+        raise InvalidImageError(f"Image is too large: {e}") from e
+    except OSError as e:
+        # Covers UnidentifiedImageError and truncated or corrupt image data
+        raise InvalidImageError(f"Could not decode {format} image: {e}") from e
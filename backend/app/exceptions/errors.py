@@ -10,3 +10,15 @@ class CollectionNotFoundError(AppError):
     def __init__(self, collection_name: str):
         self.collection_name = collection_name
         super().__init__(f"Collection '{collection_name}' does not exist")
+
+
+class InvalidImageError(AppError):
+    """Raised when image bytes are not a supported format, are corrupt or too large."""
+
+    pass
+
+
+class EmbeddingServiceError(AppError):
+    """Raised when a remote embedding service keeps failing after retries."""
+
+    pass
@@ -1,3 +1,4 @@
+from app.embed.clipembedder import get_clip_embedder_status
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
@@ -28,4 +29,19 @@ async def ping():
     return JSONResponse(content={"status": "ok", "message": "pong 🏓"})
 
 
+@router.get(
+    "/embedder",
+    summary="Embedding Model Status",
+    description="Report whether the CLIP model is loaded and how long loading and warmup took",
+)
+async def embedder_status():
+    """
+    Report the CLIP embedding model status without triggering a model load.
+
+    Returns:
+        dict: Load state, device, and load/warmup timings in seconds
+    """
+    return get_clip_embedder_status()
+
+
 # TODO: Add health check for ollama, qdrant and mssql
@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
+from app.config import CLIP_WARMUP
+from app.embed.clipembedder import start_clip_warmup
+from app.embed.service import close_embedders
+from app.vectorstore.service import close_qdrant_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CLIP_WARMUP:
+        # Warm in the background so the app serves health checks right away
+        start_clip_warmup()
+    yield
+    await close_embedders()
+    await close_qdrant_clients()
+
 
 app = FastAPI(
     title="RAG Agent",
     description="🚀 Advanced Retrieval-Augmented Generation (RAG) API Platform",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,6 +20,13 @@ class Table(str, Enum):
     def values(cls) -> list[str]:
         return [table.value for table in cls]
 
+    @property
+    def default_limit(self) -> int | None:
+        """Rows read when no limit is given, None when the whole table is read."""
+        if self == Table.order_details or self == Table.orders:
+            return 50
+        return None
+
     def sql(self, limit: int | None = None) -> str:
         limit_str = f"TOP {limit}" if limit else ""
         if self == Table.products:
@@ -66,7 +73,7 @@ class Table(str, Enum):
                 FROM [{self.value}]
             """
         elif self == Table.order_details or self == Table.orders:
-            limit_str = f"TOP {limit}" if limit else "TOP 50"
+            limit_str = f"TOP {limit if limit else self.default_limit}"
             return f"SELECT {limit_str} * FROM [{self.value}]"
         else:
             return f"SELECT {limit_str} * FROM [{self.value}]"
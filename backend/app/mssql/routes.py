@@ -84,6 +84,9 @@ async def ai_sync(
     limit: int | None = Query(
         None, description="Limit the number of rows to synchronize"
     ),
+    force: bool = Query(
+        False, description="Regenerate every row, not only new or changed ones"
+    ),
     db: SQLDatabase = Depends(get_db),
 ) -> SyncResponse:
     """
@@ -111,7 +114,7 @@ async def ai_sync(
     tables_synced, tables_failed = [], []
     for table in tables:
         try:
-            ids = await sync_table_ai(db, table, limit)
+            ids = await sync_table_ai(db, table, limit, force)
             if ids:
                 tables_synced.append(table.value)
             else:
@@ -135,6 +138,9 @@ async def ai_sync_all(
     limit: int | None = Query(
         None, description="Limit the number of rows to synchronize"
     ),
+    force: bool = Query(
+        False, description="Regenerate every row, not only new or changed ones"
+    ),
     db: SQLDatabase = Depends(get_db),
 ) -> SyncResponse:
     """
@@ -156,7 +162,7 @@ async def ai_sync_all(
     tables_synced, tables_failed = [], []
     for table in Table:
         try:
-            ids = await sync_table_ai(db, table, limit)
+            ids = await sync_table_ai(db, table, limit, force)
             if ids:
                 tables_synced.append(table.value)
             else:
@@ -1,19 +1,26 @@
-import io
 import os
+from collections.abc import AsyncIterator
 from datetime import datetime
 
 import pymssql
-from app.config import backend_logger
-from app.embed.service import get_image_file_embeddings, get_text_embeddings
+from app.config import CLIP_BATCH_SIZE, VECTOR_SEARCH_HYBRID, backend_logger
+from app.embed.service import aget_image_bytes_embeddings, aget_texts_embeddings
 from app.llm.ollama import get_ollama
 from app.llm.prompts import get_document_prompt
 from app.mssql.models import ImageTable, LLMDocumentResponse, Table
-from app.mssql.utils import delete_file, extract_sql_results, remove_sample_rows
+from app.mssql.utils import (
+    delete_file,
+    extract_row_fields,
+    extract_sql_results,
+    hash_row,
+    remove_sample_rows,
+    row_point_ids,
+)
+from app.vectorstore.models import UploadRecord
+from app.vectorstore.profiles import PayloadField, get_payload_fields
 from app.vectorstore.service import get_vectorstore
 from app.vectorstore.utils import generate_uuid
 from langchain_community.utilities import SQLDatabase
-from PIL import Image
-from PIL.ImageFile import ImageFile
 
 
 def fetch_table_names(db: SQLDatabase) -> list[str]:
@@ -24,9 +31,46 @@ def fetch_table_info(db: SQLDatabase, table_names: list[str]) -> str:
     return db.get_table_info(table_names)
 
 
+def row_metadata(row: str, fields: list[PayloadField]) -> dict[str, any]:
+    """Copy the filterable columns of a row into point metadata under their keys."""
+    values = extract_row_fields(row, [field.column for field in fields if field.column])
+    return {
+        field.key: values[field.column]
+        for field in fields
+        if field.column and field.column in values
+    }
+
+
 async def sync_table_ai(
-    db: SQLDatabase, table: Table, limit: int | None = None
+    db: SQLDatabase, table: Table, limit: int | None = None, force: bool = False
 ) -> list[str]:
+    """
+    Sync a table into its collection, only regenerating rows that changed.
+
+    Every point stores a fingerprint of its source row in `metadata.row_hash`.
+    The fingerprints already in Qdrant are fetched in one scroll, and rows whose
+    fingerprint is present are skipped, so document generation and embedding
+    only run for new or changed rows. On a full sync (no `limit`, and a table
+    read without a default row cap) the row points whose row no longer exists
+    are deleted. Image points of the same table are never touched, and nothing
+    is deleted when a row's document failed to generate, since its old point
+    cannot be told apart from a stale one. When hybrid search is enabled, a
+    collection created before the sparse lexical index is migrated to it first.
+
+    Documents are embedded and uploaded in batches while later rows are still
+    being generated, so memory does not grow with the size of the table.
+
+    Args:
+        db (SQLDatabase): Source database.
+        table (Table): Table to sync.
+        limit (int | None): Only sync the first rows, stale points are then kept.
+            Tables with a `default_limit` are always synced this way.
+        force (bool): Regenerate every row, e.g. after changing the document prompt.
+
+    Returns:
+        list[str]: IDs of the points that represent the table's rows, unchanged
+            or uploaded.
+    """
     table_info = remove_sample_rows(fetch_table_info(db, [table.value]))
     table_name = table.value
 
@@ -39,42 +83,112 @@ async def sync_table_ai(
         raise Exception(f"No rows found for table {table_name}")
     backend_logger.debug(f"Retrieved {len(parsed_rows)} rows from table {table_name}")
 
-    document_ids: list[str] = []
-    contents: list[str] = []
-    ids: list[str] = []
-    metadata: list[dict[str, any]] = []
-    embeddings: list[list[float]] = []
-
-    for count, row in enumerate(parsed_rows):
-        id, text = await generate_text_and_id(table_name, row, table_info)
-
-        if not id or not text:
-            backend_logger.warning("Document generation failed, skipping row")
-            continue
-
-        document_id = f"{table_name}_{id}"
-        document_ids.append(document_id)
-        contents.append(text)
-        embeddings.append(get_text_embeddings(text))
-        metadata.append({"source": document_id, "created_at": str(datetime.now())})
-        ids.append(generate_uuid(document_id))
+    vectorstore = get_vectorstore()
+    if (
+        VECTOR_SEARCH_HYBRID
+        and vectorstore.supports_sparse_vectors
+        and await vectorstore.acollection_exists(table_name)
+        and not await vectorstore.ahas_sparse_vectors(table_name)
+    ):
+        # Existing points are copied into a collection with the sparse index
+        await vectorstore.amigrate_sparse_vectors(table_name)
+    existing = await vectorstore.aget_metadata_values(
+        table_name, ["row_hash", "source"]
+    )
+    # Only points written by this sync are candidates for deletion, the table's
+    # image points share the collection
+    owned_ids = row_point_ids(table_name, existing)
+    point_ids_by_hash = (
+        {}
+        if force
+        else {
+            values["row_hash"]: point_id
+            for point_id, values in existing.items()
+            if values["row_hash"]
+        }
+    )
 
-        if (count + 1) % 5 == 0 or count + 1 == len(parsed_rows):
-            backend_logger.info(
-                f"Processed {count + 1}/{len(parsed_rows)} rows in {table_name}"
+    payload_fields = get_payload_fields(table_name)
+    unchanged_ids: list[str] = []
+    failed_rows = 0
+
+    async def embed(pending: list[UploadRecord]) -> list[UploadRecord]:
+        embeddings = await aget_texts_embeddings(
+            [record.page_content for record in pending]
+        )
+        for record, embedding in zip(pending, embeddings):
+            record.vector = embedding
+        return pending
+
+    async def records() -> AsyncIterator[UploadRecord]:
+        # Documents are embedded and handed to the upload a batch at a time, so
+        # only a few batches are held in memory and uploads overlap generation
+        nonlocal failed_rows
+        pending: list[UploadRecord] = []
+        for count, row in enumerate(parsed_rows):
+            row_hash = hash_row(row)
+            if row_hash in point_ids_by_hash:
+                unchanged_ids.append(point_ids_by_hash[row_hash])
+                continue
+
+            id, text = await generate_text_and_id(table_name, row, table_info)
+
+            if not id or not text:
+                backend_logger.warning("Document generation failed, skipping row")
+                failed_rows += 1
+                continue
+
+            document_id = f"{table_name}_{id}"
+            pending.append(
+                UploadRecord(
+                    id=generate_uuid(document_id),
+                    vector=[],
+                    page_content=text,
+                    metadata={
+                        "source": document_id,
+                        "created_at": datetime.now().isoformat(),
+                        "row_hash": row_hash,
+                        **row_metadata(row, payload_fields),
+                    },
+                )
             )
-
-    vectorstore = get_vectorstore()
-    added_ids = vectorstore.upload_collection(
-        collection_name=table_name,
-        vectors=embeddings,
-        page_contents=contents,
-        metadata=metadata,
-        ids=ids,
+            if len(pending) == CLIP_BATCH_SIZE:
+                for record in await embed(pending):
+                    yield record
+                pending = []
+
+            if (count + 1) % 5 == 0 or count + 1 == len(parsed_rows):
+                backend_logger.info(
+                    f"Processed {count + 1}/{len(parsed_rows)} rows in {table_name}"
+                )
+        if pending:
+            for record in await embed(pending):
+                yield record
+
+    added_ids = await vectorstore.aupload_stream(table_name, records())
+    backend_logger.info(
+        f"{len(added_ids)} new or changed rows, {len(unchanged_ids)} unchanged in {table_name}"
     )
+    if added_ids:
+        # Collections created before their fields were declared get the indexes here
+        await vectorstore.acreate_payload_indexes(table_name)
+
+    # A limited sync only sees some rows, so it cannot tell which ones were deleted.
+    # Changed rows usually keep their point ID, which was just overwritten
+    if limit is None and table.default_limit is None:
+        stale_ids = owned_ids - set(unchanged_ids) - set(added_ids)
+        if stale_ids and failed_rows:
+            backend_logger.warning(
+                f"Keeping {len(stale_ids)} possibly stale points in {table_name}, "
+                f"{failed_rows} rows failed to generate"
+            )
+        elif stale_ids:
+            await vectorstore.adelete_points(table_name, list(stale_ids))
+            backend_logger.info(
+                f"Deleted {len(stale_ids)} stale points from {table_name}"
+            )
 
-    backend_logger.trace(f"Document ids: {document_ids}")
-    return added_ids
+    return unchanged_ids + added_ids
 
 
 def extract_images(
@@ -110,20 +224,20 @@ async def sync_table_images(
     cursor = db_connection.cursor()
     cursor.execute(image_table.sql_image())
 
-    image_embeddings: list[list[float]] = []
-
+    image_ids: list[int] = []
+    blobs: list[bytes] = []
     for id, image in cursor.fetchall():
+        image_ids.append(id)
         # Strip OLE header (first 78 bytes) if needed
-        image_data = image[78:]
+        blobs.append(image[78:])
 
-        try:
-            image_file: ImageFile = Image.open(io.BytesIO(image_data))
-            image_file.load()  # Load the image to make sure it's not lazy-loaded
-            image_embeddings.append(get_image_file_embeddings(image_file))
-
-        except Exception as e:
-            backend_logger.warning(f"Failed to process image ID {id}: {e}")
+    # Decoding and preprocessing run on a worker pool, the model sees whole batches
+    image_embeddings, decoded = await aget_image_bytes_embeddings(blobs)
+    for index in sorted(set(range(len(blobs))) - set(decoded)):
+        backend_logger.warning(f"Failed to process image ID {image_ids[index]}")
     backend_logger.success(f"{len(image_embeddings)} images processed")
+    # Rows come back in the same order as the images, keyed by their position
+    embeddings_by_row = dict(zip(decoded, image_embeddings))
 
     full_table = Table(image_table.value)
 
@@ -138,11 +252,16 @@ async def sync_table_images(
         raise Exception(f"No rows found for table {table_name}")
     backend_logger.debug(f"Retrieved {len(parsed_rows)} rows from table {table_name}")
 
+    payload_fields = get_payload_fields(table_name)
     document_ids: list[str] = []
+    vectors: list[list[float]] = []
     contents: list[str] = []
     ids: list[str] = []
     metadata: list[dict[str, any]] = []
     for count, row in enumerate(parsed_rows):
+        if count not in embeddings_by_row:
+            backend_logger.warning("Image failed to decode, skipping row")
+            continue
         id, text = await generate_text_and_id(table_name, row, table_info)
 
         if not id or not text:
@@ -151,8 +270,15 @@ async def sync_table_images(
 
         document_id = f"{table_name}_image_{id}"
         document_ids.append(document_id)
+        vectors.append(embeddings_by_row[count])
         contents.append(text)
-        metadata.append({"source": document_id, "created_at": str(datetime.now())})
+        metadata.append(
+            {
+                "source": document_id,
+                "created_at": datetime.now().isoformat(),
+                **row_metadata(row, payload_fields),
+            }
+        )
         ids.append(generate_uuid(document_id))
 
         if (count + 1) % 5 == 0 or count + 1 == len(parsed_rows):
@@ -161,13 +287,15 @@ async def sync_table_images(
             )
 
     vectorstore = get_vectorstore()
-    added_ids = vectorstore.upload_collection(
+    added_ids = await vectorstore.aupload_collection(
         collection_name=table_name,
-        vectors=image_embeddings,
+        vectors=vectors,
         page_contents=contents,
         metadata=metadata,
         ids=ids,
     )
+    # Collections created before their fields were declared get the indexes here
+    await vectorstore.acreate_payload_indexes(table_name)
     backend_logger.trace(f"Document ids: {document_ids}")
 
     return added_ids
@@ -1,5 +1,7 @@
+import hashlib
 import os
 import re
+from datetime import datetime
 
 
 def delete_file(path: str, prefix: str = "", suffix: str = ""):
@@ -19,3 +21,58 @@ def extract_sql_results(result_string: str) -> list[str]:
     Extracts all SQL result strings from a given string.
     """
     return re.findall(r"\{.*?\}", result_string)
+
+
+def hash_row(row: str) -> str:
+    """Fingerprint of a raw row string, changes whenever any column value does."""
+    return hashlib.sha256(row.encode("utf-8")).hexdigest()
+
+
+def row_point_ids(table_name: str, metadata: dict[str, dict[str, any]]) -> set[str]:
+    """
+    IDs of the points `sync_table_ai` wrote for a table's rows, given each
+    point's `row_hash` and `source` metadata.
+
+    These carry a `row_hash`, image points of the same table are left out even
+    if they have one.
+    """
+    return {
+        point_id
+        for point_id, values in metadata.items()
+        if values.get("row_hash") is not None
+        and not str(values.get("source") or "").startswith(f"{table_name}_image_")
+    }
+
+
+# One value of a row's repr: a quoted string, Decimal, datetime, number or literal
+_ROW_VALUE = (
+    r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|Decimal\('([^']*)'\)"""
+    r"|datetime\.(?:datetime|date)\(([^)]*)\)|(-?\d+(?:\.\d+)?)|(True|False|None)"
+)
+
+
+def extract_row_fields(row: str, columns: list[str]) -> dict[str, any]:
+    """
+    Read the given columns out of a row string returned by `extract_sql_results`.
+
+    Strings, numbers, booleans, Decimals and datetimes are converted to plain
+    Python values (datetimes as ISO strings). Missing columns and NULLs are left out.
+    """
+    fields: dict[str, any] = {}
+    for column in columns:
+        match = re.search(rf"'{re.escape(column)}': (?:{_ROW_VALUE})", row)
+        if not match:
+            continue
+        single, double, decimal, date, number, literal = match.groups()
+        if single is not None or double is not None:
+            fields[column] = single if single is not None else double
+        elif decimal is not None:
+            fields[column] = float(decimal)
+        elif date is not None:
+            parts = [int(part) for part in date.split(",")]
+            fields[column] = datetime(*parts).isoformat()
+        elif number is not None:
+            fields[column] = float(number) if "." in number else int(number)
+        elif literal != "None":
+            fields[column] = literal == "True"
+    return fields
@@ -1,5 +1,5 @@
 from app.chat.rag_llm import generate_final_response, get_relevant_tables
-from app.config import backend_logger
+from app.config import VECTOR_RAG_RETRIEVAL, backend_logger
 from app.llm.models import RAGResponse, SQLRAGResponse
 from app.llm.rag_services import (
     decide_collection,
@@ -9,15 +9,19 @@ from app.llm.rag_services import (
 from app.mssql.dependencies import get_SQLDatabase
 from app.mssql.models import Table
 from app.utils import documents_to_string
-from app.vectorstore.service import search
+from app.vectorstore.service import asearch, asearch_fanout
 
 
 async def vector_rag_pipeline(query: str) -> RAGResponse:
-    backend_logger.info("Deciding which collection to search...")
-    collection = decide_collection(query, Table.values())
+    if VECTOR_RAG_RETRIEVAL == "route":
+        backend_logger.info("Deciding which collection to search...")
+        collection = decide_collection(query, Table.values())
 
-    backend_logger.info(f"Searching collection: {collection}...")
-    documents = search(query, collection)
+        backend_logger.info(f"Searching collection: {collection}...")
+        documents = await asearch(query, collection)
+    else:
+        backend_logger.info("Searching all collections...")
+        documents = await asearch_fanout(query, Table.values())
     documents_string = documents_to_string(documents)
 
     backend_logger.info("Generating the answer...")
@@ -0,0 +1,320 @@
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, Callable, Iterable, Iterator
+
+from app.config import QDRANT_UPLOAD_BATCH_SIZE, QDRANT_UPLOAD_WORKERS
+from app.vectorstore.models import UploadRecord
+from app.vectorstore.utils import abatched
+from qdrant_client.models import Filter, PointStruct, Record, ScoredPoint
+
+
+class VectorStore(ABC):
+    """
+    Interface shared by the vector store backends.
+
+    Points and results use qdrant-client's models regardless of backend. The
+    async methods default to running the sync ones on a worker thread, backends
+    with native async I/O override them.
+
+    Backends without a sparse lexical index answer hybrid searches with the
+    dense vector alone.
+    """
+
+    supports_sparse_vectors: bool = False
+
+    @abstractmethod
+    def create_collection(self, collection_name: str, vector_size: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_collections(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def get_collection_info(
+        self, exact: bool = False
+    ) -> list[dict[str, dict[str, any]]]:
+        """Statistics per collection, with exact point counts if `exact`."""
+        pass
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def upload_collection(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        page_contents: list[str],
+        metadata: list[dict[str, any]] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        pass
+
+    @abstractmethod
+    def upsert(
+        self,
+        collection_name: str,
+        vector: list[float],
+        page_content: str,
+        metadata: dict[str, any] | None = None,
+        id: str | None = None,
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        collection_name: str,
+        vector: list[float],
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        pass
+
+    @abstractmethod
+    def search_batch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None = None,
+    ) -> list[list[ScoredPoint]]:
+        """Run several searches at once, hybrid ones when the query `texts` are given."""
+        pass
+
+    @abstractmethod
+    def delete_collection(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete_points(self, collection_name: str, ids: list[str]):
+        pass
+
+    @abstractmethod
+    def iter_points(
+        self,
+        collection_name: str,
+        with_payload: bool | list[str] = True,
+        page_size: int = 1000,
+        limit: int | None = None,
+    ) -> Iterator[Record]:
+        pass
+
+    @abstractmethod
+    def get_metadata_values(
+        self, collection_name: str, keys: list[str]
+    ) -> dict[str, dict[str, any]]:
+        """Map every point ID to the values of `keys` in its metadata, None where missing."""
+        pass
+
+    def upload_stream(
+        self,
+        collection_name: str,
+        records: Iterable[UploadRecord],
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        workers: int = QDRANT_UPLOAD_WORKERS,
+        progress: Callable[[int], None] | None = None,
+    ) -> list[str]:
+        """
+        Upload points from an iterator, holding only about one batch in memory.
+
+        The collection is created from the first record's vector size. Backends
+        may upload batches on several `workers`. `progress` is called with the
+        number of points uploaded so far.
+
+        Returns:
+            list[str]: IDs of the uploaded points.
+        """
+        ids: list[str] = []
+        for batch in itertools.batched(records, batch_size):
+            ids.extend(
+                self.upload_collection(
+                    collection_name,
+                    [record.vector for record in batch],
+                    [record.page_content for record in batch],
+                    [record.metadata for record in batch],
+                    [record.id for record in batch],
+                )
+            )
+            if progress:
+                progress(len(ids))
+        return ids
+
+    def create_payload_indexes(self, collection_name: str):
+        """Index the collection's declared metadata fields, if the backend has indexes."""
+
+    def has_sparse_vectors(self, collection_name: str) -> bool:
+        """Whether the collection has the sparse lexical index for hybrid search."""
+        return False
+
+    def search_hybrid(
+        self,
+        collection_name: str,
+        vector: list[float],
+        text: str,
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        """Fuse dense and lexical retrieval of `text` with reciprocal rank fusion."""
+        return self.search(collection_name, vector, limit, query_filter)
+
+    async def aget_collection_info(
+        self, exact: bool = False
+    ) -> list[dict[str, dict[str, any]]]:
+        return await asyncio.to_thread(self.get_collection_info, exact)
+
+    async def acollection_exists(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(self.collection_exists, collection_name)
+
+    async def acreate_collection(self, collection_name: str, vector_size: int) -> bool:
+        return await asyncio.to_thread(
+            self.create_collection, collection_name, vector_size
+        )
+
+    async def aupload_collection(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        page_contents: list[str],
+        metadata: list[dict[str, any]] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        return await asyncio.to_thread(
+            self.upload_collection,
+            collection_name,
+            vectors,
+            page_contents,
+            metadata,
+            ids,
+        )
+
+    async def aupload_stream(
+        self,
+        collection_name: str,
+        records: Iterable[UploadRecord] | AsyncIterable[UploadRecord],
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        workers: int = QDRANT_UPLOAD_WORKERS,
+        progress: Callable[[int], None] | None = None,
+    ) -> list[str]:
+        """Async `upload_stream`, also accepting async iterators."""
+        ids: list[str] = []
+        async for batch in abatched(records, batch_size):
+            ids.extend(
+                await self.aupload_collection(
+                    collection_name,
+                    [record.vector for record in batch],
+                    [record.page_content for record in batch],
+                    [record.metadata for record in batch],
+                    [record.id for record in batch],
+                )
+            )
+            if progress:
+                progress(len(ids))
+        return ids
+
+    async def aupsert(
+        self,
+        collection_name: str,
+        vector: list[float],
+        page_content: str,
+        metadata: dict[str, any] | None = None,
+        id: str | None = None,
+    ) -> str:
+        return await asyncio.to_thread(
+            self.upsert, collection_name, vector, page_content, metadata, id
+        )
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vector: list[float],
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        return await asyncio.to_thread(
+            self.search, collection_name, vector, limit, query_filter
+        )
+
+    async def asearch_hybrid(
+        self,
+        collection_name: str,
+        vector: list[float],
+        text: str,
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        return await asyncio.to_thread(
+            self.search_hybrid, collection_name, vector, text, limit, query_filter
+        )
+
+    async def asearch_batch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None = None,
+    ) -> list[list[ScoredPoint]]:
+        return await asyncio.to_thread(
+            self.search_batch, collection_name, vectors, limits, query_filters, texts
+        )
+
+    async def amigrate_sparse_vectors(self, collection_name: str) -> int:
+        """Add the sparse lexical index to an existing collection, if the backend has one."""
+        return 0
+
+    async def ahas_sparse_vectors(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(self.has_sparse_vectors, collection_name)
+
+    async def adelete_collection(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(self.delete_collection, collection_name)
+
+    async def adelete_points(self, collection_name: str, ids: list[str]):
+        await asyncio.to_thread(self.delete_points, collection_name, ids)
+
+    async def aget_metadata_values(
+        self, collection_name: str, keys: list[str]
+    ) -> dict[str, dict[str, any]]:
+        return await asyncio.to_thread(self.get_metadata_values, collection_name, keys)
+
+    async def acreate_payload_indexes(self, collection_name: str):
+        await asyncio.to_thread(self.create_payload_indexes, collection_name)
+
+    async def aclose(self):
+        pass
+
+    @staticmethod
+    def _build_payloads(
+        page_contents: list[str], metadata: list[dict[str, any]] | None
+    ) -> list[dict[str, any]]:
+        if metadata is None:
+            metadata = [{} for _ in range(len(page_contents))]
+        return [
+            {
+                "id": m.get("source") if m else None,
+                "page_content": page_content,
+                "metadata": m,
+            }
+            for page_content, m in zip(page_contents, metadata)
+        ]
+
+    @staticmethod
+    def _build_point(
+        vector: list[float],
+        page_content: str,
+        metadata: dict[str, any] | None,
+        id: str,
+    ) -> PointStruct:
+        return PointStruct(
+            id=id,
+            vector=vector,
+            payload={
+                "id": metadata.get("source") if metadata else id,
+                "page_content": page_content,
+                "metadata": metadata if metadata else {},
+            },
+        )
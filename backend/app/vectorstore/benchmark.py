@@ -0,0 +1,298 @@
+import argparse
+import json
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from app.config import QDRANT_GRPC_PORT, QDRANT_URL
+from app.vectorstore.local_vectorstore import LocalVectorStore
+from app.vectorstore.profiles import INDEX_PROFILES
+from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
+from qdrant_client import models
+from qdrant_client.conversions.conversion import RestToGrpc
+from qdrant_client.models import PointStruct
+
+
+def _sample_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _clustered_vectors(
+    n: int, dim: int, clusters: int = 64, seed: int = 0
+) -> np.ndarray:
+    # Real embeddings are clustered, which uniform noise is not. Recall on pure
+    # noise badly understates what quantization achieves in practice
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, clusters, n)]
+    vectors += 0.4 * rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _sample_payloads(n: int) -> list[str]:
+    return [
+        f"Product {i}: Chef Anton's Gumbo Mix, 36 boxes per unit, unit price {i % 97}.50"
+        for i in range(n)
+    ]
+
+
+def _wire_bytes(vectors: np.ndarray, page_contents: list[str]) -> tuple[int, int]:
+    """Encoded size of the points as a REST JSON body and as gRPC messages."""
+    points = [
+        PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector.tolist(),
+            payload=MyQdrantVectorStore._build_payloads([content], None)[0],
+        )
+        for vector, content in zip(vectors, page_contents)
+    ]
+    rest = len(
+        json.dumps({"points": [point.model_dump() for point in points]}).encode()
+    )
+    grpc = sum(RestToGrpc.convert_point_struct(point).ByteSize() for point in points)
+    return rest, grpc
+
+
+def benchmark_transports(
+    url: str, grpc_port: int, n: int, dim: int, queries: int, limit: int
+) -> None:
+    """Compare REST and gRPC for upload_collection and search throughput."""
+    vectors = _sample_vectors(n, dim)
+    page_contents = _sample_payloads(n)
+    query_vectors = _sample_vectors(queries, dim, seed=1).tolist()
+
+    sample = min(n, 256)
+    rest_bytes, grpc_bytes = _wire_bytes(vectors[:sample], page_contents[:sample])
+    print(
+        f"Encoded size per point: REST {rest_bytes / sample:.0f} B, "
+        f"gRPC {grpc_bytes / sample:.0f} B (x{rest_bytes / grpc_bytes:.2f})"
+    )
+
+    print(
+        f"{'transport':<10} {'upload':>9} {'vectors/s':>11} "
+        f"{'search':>9} {'queries/s':>10} {'p50 ms':>8}"
+    )
+    for transport, prefer_grpc in [("rest", False), ("grpc", True)]:
+        store = MyQdrantVectorStore(
+            url=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port
+        )
+        collection_name = f"benchmark-{transport}"
+        if store.collection_exists(collection_name):
+            store.delete_collection(collection_name)
+
+        try:
+            start = time.perf_counter()
+            store.upload_collection(
+                collection_name=collection_name,
+                vectors=vectors.tolist(),
+                page_contents=page_contents,
+            )
+            # Uploads return before indexing, wait until every point is visible
+            while store.client.count(collection_name).count < n:
+                time.sleep(0.01)
+            upload_seconds = time.perf_counter() - start
+
+            store.search(collection_name, query_vectors[0], limit=limit)
+            latencies = []
+            start = time.perf_counter()
+            for vector in query_vectors:
+                query_start = time.perf_counter()
+                store.search(collection_name, vector, limit=limit)
+                latencies.append(time.perf_counter() - query_start)
+            search_seconds = time.perf_counter() - start
+
+            print(
+                f"{transport:<10} {upload_seconds:8.2f}s {n / upload_seconds:11.1f} "
+                f"{search_seconds:8.2f}s {queries / search_seconds:10.1f} "
+                f"{np.median(latencies) * 1000:8.2f}"
+            )
+        finally:
+            store.delete_collection(collection_name)
+            store.client.close()
+
+
+def _wait_for_index(store: MyQdrantVectorStore, collection_name: str, n: int):
+    while True:
+        info = store.client.get_collection(collection_name)
+        if (
+            info.points_count >= n
+            and info.status == models.CollectionStatus.GREEN
+            and (info.indexed_vectors_count or 0) >= n
+        ):
+            return
+        time.sleep(0.1)
+
+
+def benchmark_profiles(
+    url: str, profiles: list[str], n: int, dim: int, queries: int, k: int
+) -> None:
+    """Recall@k against exact search, latency and estimated memory per index profile."""
+    vectors = _clustered_vectors(n, dim)
+    # Queries are perturbed copies of stored points, like real near-duplicate lookups
+    rng = np.random.default_rng(1)
+    query_vectors = vectors[rng.integers(0, n, queries)]
+    query_vectors = query_vectors + 0.2 * rng.standard_normal(
+        query_vectors.shape, dtype=np.float32
+    )
+    query_vectors = (
+        query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    ).tolist()
+    page_contents = _sample_payloads(n)
+    exact = models.SearchParams(exact=True)
+
+    print(
+        f"{'profile':<14} {'build':>8} {'recall@' + str(k):>10} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'est RAM MB':>11} {'est disk MB':>12}"
+    )
+    for name in profiles:
+        profile = INDEX_PROFILES[name]
+        store = MyQdrantVectorStore(url=url)
+        collection_name = f"benchmark-profile-{name}"
+        if store.collection_exists(collection_name):
+            store.delete_collection(collection_name)
+
+        try:
+            start = time.perf_counter()
+            store.create_collection(collection_name, dim, profile=profile)
+            store.upload_collection(
+                collection_name=collection_name,
+                vectors=vectors.tolist(),
+                page_contents=page_contents,
+                ids=list(range(n)),
+            )
+            _wait_for_index(store, collection_name, n)
+            build_seconds = time.perf_counter() - start
+
+            hits = 0
+            latencies = []
+            search_params = profile.search_params()
+            for vector in query_vectors:
+                truth = store.client.query_points(
+                    collection_name, query=vector, limit=k, search_params=exact
+                ).points
+                query_start = time.perf_counter()
+                found = store.client.query_points(
+                    collection_name, query=vector, limit=k, search_params=search_params
+                ).points
+                latencies.append(time.perf_counter() - query_start)
+                hits += len({p.id for p in truth} & {p.id for p in found})
+
+            memory = profile.estimate_memory(n, dim)
+            print(
+                f"{name:<14} {build_seconds:7.1f}s {hits / (queries * k):10.4f} "
+                f"{np.percentile(latencies, 50) * 1000:8.2f} "
+                f"{np.percentile(latencies, 95) * 1000:8.2f} "
+                f"{memory['ram_bytes'] / 2**20:11.1f} "
+                f"{memory['disk_bytes'] / 2**20:12.1f}"
+            )
+        finally:
+            store.delete_collection(collection_name)
+            store.client.close()
+
+
+def benchmark_local(n: int, dim: int, queries: int, k: int, nprobes: list[int]) -> None:
+    """Recall@k and latency of the local store's IVF search against its exact search."""
+    vectors = _clustered_vectors(n, dim)
+    rng = np.random.default_rng(1)
+    query_vectors = vectors[rng.integers(0, n, queries)]
+    query_vectors = query_vectors + 0.2 * rng.standard_normal(
+        query_vectors.shape, dtype=np.float32
+    )
+
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path, ivf_min_points=0)
+        start = time.perf_counter()
+        store.upload_collection(
+            collection_name="benchmark-local",
+            vectors=vectors,
+            page_contents=_sample_payloads(n),
+            ids=list(range(n)),
+        )
+        print(f"Upload: {time.perf_counter() - start:.2f}s for {n} vectors")
+
+        def run(store: LocalVectorStore) -> tuple[list[set], list[float]]:
+            found, latencies = [], []
+            for vector in query_vectors:
+                query_start = time.perf_counter()
+                points = store.search("benchmark-local", vector, limit=k)
+                latencies.append(time.perf_counter() - query_start)
+                found.append({p.id for p in points})
+            return found, latencies
+
+        truth, latencies = run(store)
+        print(f"{'search':<10} {'recall@' + str(k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        print(
+            f"{'exact':<10} {1.0:10.4f} {np.percentile(latencies, 50) * 1000:8.2f} "
+            f"{np.percentile(latencies, 95) * 1000:8.2f}"
+        )
+        for nprobe in nprobes:
+            ivf_store = LocalVectorStore(path, ivf_min_points=1, nprobe=nprobe)
+            # Build the IVF cells before timing
+            ivf_store.search("benchmark-local", query_vectors[0], limit=k)
+            found, latencies = run(ivf_store)
+            hits = sum(len(a & b) for a, b in zip(truth, found))
+            print(
+                f"{'ivf/' + str(nprobe):<10} {hits / (queries * k):10.4f} "
+                f"{np.percentile(latencies, 50) * 1000:8.2f} "
+                f"{np.percentile(latencies, 95) * 1000:8.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant benchmarks")
+    parser.add_argument("--url", default=QDRANT_URL)
+    parser.add_argument("--dim", type=int, default=512)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    transport_parser = subparsers.add_parser(
+        "transport", help="REST against gRPC upload and search throughput"
+    )
+    transport_parser.add_argument("--grpc-port", type=int, default=QDRANT_GRPC_PORT)
+    transport_parser.add_argument(
+        "-n", type=int, default=20000, help="Vectors to upload"
+    )
+    transport_parser.add_argument("--queries", type=int, default=500)
+    transport_parser.add_argument("--limit", type=int, default=5)
+
+    profiles_parser = subparsers.add_parser(
+        "profiles", help="Recall, latency and memory of each index profile"
+    )
+    profiles_parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(INDEX_PROFILES),
+        default=list(INDEX_PROFILES),
+    )
+    profiles_parser.add_argument(
+        "-n", type=int, default=50000, help="Vectors to upload"
+    )
+    profiles_parser.add_argument("--queries", type=int, default=200)
+    profiles_parser.add_argument("-k", type=int, default=10)
+
+    local_parser = subparsers.add_parser(
+        "local", help="IVF recall and latency of the local store against exact search"
+    )
+    local_parser.add_argument("-n", type=int, default=100000, help="Vectors to store")
+    local_parser.add_argument("--queries", type=int, default=200)
+    local_parser.add_argument("-k", type=int, default=10)
+    local_parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16])
+
+    args = parser.parse_args()
+    if args.benchmark == "transport":
+        benchmark_transports(
+            args.url, args.grpc_port, args.n, args.dim, args.queries, args.limit
+        )
+    elif args.benchmark == "profiles":
+        benchmark_profiles(
+            args.url, args.profiles, args.n, args.dim, args.queries, args.k
+        )
+    elif args.benchmark == "local":
+        benchmark_local(args.n, args.dim, args.queries, args.k, args.nprobe)
+
+
+# uv run python -m app.vectorstore.benchmark profiles -n 50000
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from functools import lru_cache
+
+import grpc
+from app.config import (
+    QDRANT_METADATA_TTL_SECONDS,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL_SECONDS,
+    backend_logger,
+)
+from app.vectorstore.models import CollectionMetadata
+from app.vectorstore.utils import dense_vector_params
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import CollectionInfo
+
+# What a missing collection raises from get_collection over REST, gRPC and the
+# local in-memory client respectively
+_NOT_FOUND_ERRORS = (UnexpectedResponse, grpc.RpcError, ValueError)
+
+
+class CollectionMetadataCache:
+    """
+    Per-collection existence, vector size, distance and point count with a TTL.
+
+    One `get_collection` call answers both "does it exist" and "what does it
+    look like", and repeated lookups within `ttl_seconds` don't reach Qdrant at
+    all. Entries must be invalidated whenever a collection is created or deleted
+    through this process. Changes made elsewhere are picked up when the TTL expires.
+    """
+
+    def __init__(self, ttl_seconds: float = QDRANT_METADATA_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, tuple[float, CollectionMetadata]] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, collection_name: str) -> CollectionMetadata | None:
+        with self._lock:
+            entry = self._entries.get(collection_name)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, collection_name: str, metadata: CollectionMetadata):
+        with self._lock:
+            self._entries[collection_name] = (time.monotonic(), metadata)
+
+    @staticmethod
+    def _from_info(info: CollectionInfo) -> CollectionMetadata:
+        vectors = dense_vector_params(info)
+        return CollectionMetadata(
+            exists=True,
+            vector_size=vectors.size if vectors else None,
+            distance=vectors.distance.value if vectors else None,
+            points_count=info.points_count,
+            sparse_vectors=list(info.config.params.sparse_vectors or {}),
+        )
+
+    def get(self, client: QdrantClient, collection_name: str) -> CollectionMetadata:
+        metadata = self._lookup(collection_name)
+        if metadata is not None:
+            return metadata
+
+        try:
+            metadata = self._from_info(client.get_collection(collection_name))
+        except _NOT_FOUND_ERRORS:
+            # Only pay for the second round trip when get_collection failed
+            if client.collection_exists(collection_name):
+                raise
+            metadata = CollectionMetadata(exists=False)
+        self._store(collection_name, metadata)
+        return metadata
+
+    async def aget(
+        self, client: AsyncQdrantClient, collection_name: str
+    ) -> CollectionMetadata:
+        metadata = self._lookup(collection_name)
+        if metadata is not None:
+            return metadata
+
+        try:
+            metadata = self._from_info(await client.get_collection(collection_name))
+        except _NOT_FOUND_ERRORS:
+            if await client.collection_exists(collection_name):
+                raise
+            metadata = CollectionMetadata(exists=False)
+        self._store(collection_name, metadata)
+        return metadata
+
+    def invalidate(self, collection_name: str | None = None):
+        """Forget one collection, or every collection when no name is given."""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(collection_name, None)
+        backend_logger.trace(f"Collection metadata invalidated: {collection_name}")
+
+    def stats(self) -> dict[str, any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_collection_cache() -> CollectionMetadataCache:
+    return CollectionMetadataCache()
+
+
+class SearchResultCache:
+    """
+    LRU cache of search results, versioned per collection.
+
+    Every collection has a generation counter that the vector stores bump on
+    each write (upload, upsert, point or collection deletion). The generation is
+    part of every key, so after a write the old entries can no longer be looked
+    up and simply age out of the LRU. Generations live in this process only:
+    writes made by other processes, including the other workers of a
+    multi-worker server, are only picked up once `ttl_seconds` has passed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CACHE_SIZE,
+        ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._generations: dict[str, int] = {}
+        self._entries: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self, collection_name: str) -> int:
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def bump(self, collection_name: str):
+        """Make every cached result of the collection stale."""
+        with self._lock:
+            self._generations[collection_name] = (
+                self._generations.get(collection_name, 0) + 1
+            )
+        backend_logger.trace(f"Search cache generation bumped: {collection_name}")
+
+    def _key(self, collection_name: str, key: Hashable) -> tuple:
+        return (collection_name, self._generations.get(collection_name, 0), key)
+
+    def get(self, collection_name: str, key: Hashable) -> list | None:
+        """Cached results for `key`, or None. `key` covers query, k and filters."""
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(self._key(collection_name, key))
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(self._key(collection_name, key))
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            return None
+
+    def put(self, collection_name: str, key: Hashable, results: list, generation: int):
+        """
+        Store results computed at `generation`, read before the search started.
+        Results that raced with a write are dropped rather than cached as current.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self._generations.get(collection_name, 0):
+                return
+            full_key = self._key(collection_name, key)
+            self._entries[full_key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "generations": dict(self._generations),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> SearchResultCache:
+    return SearchResultCache()
@@ -0,0 +1,640 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+
+import numpy as np
+from app.config import (
+    LOCAL_VECTORSTORE_DIR,
+    LOCAL_VECTORSTORE_IVF_MIN_POINTS,
+    LOCAL_VECTORSTORE_IVF_NPROBE,
+    backend_logger,
+)
+from app.exceptions.errors import CollectionNotFoundError
+from app.vectorstore.base import VectorStore
+from app.vectorstore.cache import SearchResultCache
+from app.vectorstore.models import CollectionMetadata
+from qdrant_client import models
+from qdrant_client.models import Filter, Record, ScoredPoint
+
+
+def _get_path(payload: dict[str, any], key: str) -> any:
+    value = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _in_range(value: any, range: models.Range | models.DatetimeRange) -> bool:
+    if value is None:
+        return False
+    try:
+        if isinstance(range, models.DatetimeRange):
+            value = _as_utc(value)
+            bounds = [
+                None if b is None else _as_utc(b)
+                for b in (range.gt, range.gte, range.lt, range.lte)
+            ]
+        else:
+            bounds = [range.gt, range.gte, range.lt, range.lte]
+    except (TypeError, ValueError):
+        return False
+    gt, gte, lt, lte = bounds
+    return (
+        (gt is None or value > gt)
+        and (gte is None or value >= gte)
+        and (lt is None or value < lt)
+        and (lte is None or value <= lte)
+    )
+
+
+def _condition_matches(payload: dict[str, any], condition) -> bool:
+    if isinstance(condition, models.Filter):
+        return matches_filter(payload, condition)
+    if not isinstance(condition, models.FieldCondition):
+        raise ValueError(
+            f"Unsupported filter condition for the local vector store: {condition}"
+        )
+
+    value = _get_path(payload, condition.key)
+    if condition.match is not None:
+        if isinstance(condition.match, models.MatchValue):
+            return value == condition.match.value
+        if isinstance(condition.match, models.MatchAny):
+            return value in condition.match.any
+        raise ValueError(
+            f"Unsupported match for the local vector store: {condition.match}"
+        )
+    if condition.range is not None:
+        return _in_range(value, condition.range)
+    raise ValueError(
+        f"Unsupported filter condition for the local vector store: {condition}"
+    )
+
+
+def _as_list(conditions) -> list:
+    if conditions is None:
+        return []
+    return conditions if isinstance(conditions, list) else [conditions]
+
+
+def matches_filter(payload: dict[str, any], query_filter: Filter) -> bool:
+    """Evaluate a Qdrant filter of field matches and ranges against one payload."""
+    must = _as_list(query_filter.must)
+    should = _as_list(query_filter.should)
+    must_not = _as_list(query_filter.must_not)
+    return (
+        all(_condition_matches(payload, c) for c in must)
+        and (not should or any(_condition_matches(payload, c) for c in should))
+        and not any(_condition_matches(payload, c) for c in must_not)
+    )
+
+
+class IvfIndex:
+    """
+    Coarse inverted-file partitioning of unit vectors.
+
+    Spherical k-means splits the vectors into `nlist` cells. A query only scores
+    the vectors in its `nprobe` closest cells, trading a little recall for
+    scanning roughly `nprobe / nlist` of the collection.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        rows: np.ndarray,
+        nlist: int,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        sample = vectors[
+            rng.choice(len(vectors), min(len(vectors), nlist * 64), replace=False)
+        ]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cell in range(nlist):
+                members = sample[assignment == cell]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[cell] = centroid / max(np.linalg.norm(centroid), 1e-12)
+        self.centroids = centroids
+        self.lists: list[set[int]] = [set() for _ in range(nlist)]
+        # Cell of every indexed row, so rewritten rows move instead of repeating
+        self.cells: dict[int, int] = {}
+        self.add(rows, vectors)
+
+    @property
+    def size(self) -> int:
+        return len(self.cells)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        """Assign rows to their closest cell, moving rows that are already indexed."""
+        self.remove(rows)
+        for row, cell in zip(rows, np.argmax(vectors @ self.centroids.T, axis=1)):
+            self.lists[cell].add(int(row))
+            self.cells[int(row)] = int(cell)
+
+    def remove(self, rows: np.ndarray | list[int]):
+        for row in rows:
+            cell = self.cells.pop(int(row), None)
+            if cell is not None:
+                self.lists[cell].discard(int(row))
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.centroids))
+        cells = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.unique(
+            np.fromiter(
+                (row for cell in cells for row in self.lists[cell]), dtype=np.int64
+            )
+        )
+
+
+class LocalCollection:
+    """
+    One collection on disk: unit-normalized float32 vectors in a memory-mapped
+    matrix (`vectors.f32`), and IDs and payloads in a sqlite side store
+    (`points.sqlite`) keyed by matrix row. Deleted rows are zeroed and masked
+    out, their space is not reused. Writing an existing ID overwrites its row.
+    """
+
+    def __init__(self, path: str, vector_size: int | None = None):
+        self.path = path
+        self.lock = threading.RLock()
+        meta_path = os.path.join(path, "meta.json")
+        if vector_size is not None:
+            os.makedirs(path, exist_ok=True)
+            with open(meta_path, "w") as f:
+                json.dump({"vector_size": vector_size, "distance": "Cosine"}, f)
+        with open(meta_path) as f:
+            self.vector_size: int = json.load(f)["vector_size"]
+
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        if not os.path.exists(self.vectors_path):
+            open(self.vectors_path, "wb").close()
+
+        self.db = sqlite3.connect(
+            os.path.join(path, "points.sqlite"), check_same_thread=False
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, payload TEXT NOT NULL)"
+        )
+        self.db.commit()
+
+        self.ids: list[str | None] = []
+        self.payloads: list[dict[str, any] | None] = []
+        self.rows: dict[str, int] = {}
+        for row, id, payload in self.db.execute(
+            "SELECT row, id, payload FROM points ORDER BY row"
+        ):
+            self._ensure_length(row + 1)
+            self.ids[row] = id
+            self.payloads[row] = json.loads(payload)
+            self.rows[id] = row
+        self.count = len(self.ids)
+
+        self.vectors = self._map(max(self.count, self._capacity()))
+        self.alive = np.zeros(len(self.vectors), dtype=bool)
+        self.alive[: self.count] = [id is not None for id in self.ids]
+        self.ivf: IvfIndex | None = None
+
+    def _ensure_length(self, length: int):
+        while len(self.ids) < length:
+            self.ids.append(None)
+            self.payloads.append(None)
+
+    def _capacity(self) -> int:
+        return os.path.getsize(self.vectors_path) // (self.vector_size * 4)
+
+    def _map(self, capacity: int) -> np.ndarray:
+        if os.path.getsize(self.vectors_path) < capacity * self.vector_size * 4:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(capacity * self.vector_size * 4)
+        if capacity == 0:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        return np.memmap(
+            self.vectors_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.vector_size),
+        )
+
+    def _grow(self, needed: int):
+        if needed <= len(self.vectors):
+            return
+        capacity = max(needed, len(self.vectors) * 2, 1024)
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = self._map(capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+
+    def write(
+        self, ids: list[str], vectors: np.ndarray, payloads: list[dict[str, any]]
+    ):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        with self.lock:
+            rows = []
+            for id in ids:
+                row = self.rows.get(id)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self._ensure_length(self.count)
+                    self.rows[id] = row
+                rows.append(row)
+            self._grow(self.count)
+
+            rows = np.asarray(rows, dtype=np.int64)
+            self.vectors[rows] = vectors
+            self.vectors.flush()
+            self.alive[rows] = True
+            for row, id, payload in zip(rows, ids, payloads):
+                self.ids[row] = id
+                self.payloads[row] = payload
+            self.db.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)",
+                [
+                    (int(row), id, json.dumps(payload, default=str))
+                    for row, id, payload in zip(rows, ids, payloads)
+                ],
+            )
+            self.db.commit()
+            if self.ivf is not None:
+                self.ivf.add(rows, vectors)
+
+    def delete(self, ids: list[str]):
+        with self.lock:
+            rows = [self.rows.pop(id) for id in ids if id in self.rows]
+            for row in rows:
+                self.ids[row] = None
+                self.payloads[row] = None
+            if rows:
+                self.vectors[rows] = 0
+                self.vectors.flush()
+                self.alive[rows] = False
+                if self.ivf is not None:
+                    self.ivf.remove(rows)
+            self.db.executemany(
+                "DELETE FROM points WHERE id = ?", [(id,) for id in ids]
+            )
+            self.db.commit()
+
+    def points_count(self) -> int:
+        return len(self.rows)
+
+    def points(self) -> list[tuple[str, dict[str, any]]]:
+        """IDs and payloads of the live points, copied consistently."""
+        with self.lock:
+            return [
+                (id, payload)
+                for id, payload in zip(self.ids, self.payloads)
+                if id is not None
+            ]
+
+    def _filter_mask(self, query_filter: Filter, count: int) -> np.ndarray:
+        return np.fromiter(
+            (
+                payload is not None and matches_filter(payload, query_filter)
+                for payload in self.payloads[:count]
+            ),
+            dtype=bool,
+            count=count,
+        )
+
+    def _ivf(self, min_points: int) -> IvfIndex | None:
+        # Built lazily once the collection is large enough, and rebuilt from
+        # scratch when it has doubled since, so the cells follow the data
+        alive_count = self.points_count()
+        if min_points <= 0 or alive_count < min_points:
+            return None
+        if self.ivf is None or alive_count > 2 * self.ivf.size:
+            rows = np.flatnonzero(self.alive[: self.count])
+            nlist = max(int(np.sqrt(len(rows))), 1)
+            backend_logger.info(
+                f"Building IVF index with {nlist} cells over {len(rows)} vectors"
+            )
+            self.ivf = IvfIndex(np.asarray(self.vectors[rows]), rows, nlist)
+        return self.ivf
+
+    def search(
+        self,
+        queries: np.ndarray,
+        limits: list[int],
+        query_filters: list[Filter | None],
+        ivf_min_points: int = LOCAL_VECTORSTORE_IVF_MIN_POINTS,
+        nprobe: int = LOCAL_VECTORSTORE_IVF_NPROBE,
+    ) -> list[list[ScoredPoint]]:
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+        )
+        # The whole search holds the lock: writes change the IVF cells, the
+        # alive mask and the rows' IDs and payloads in place
+        with self.lock:
+            return self._search(queries, limits, query_filters, ivf_min_points, nprobe)
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        limits: list[int],
+        query_filters: list[Filter | None],
+        ivf_min_points: int,
+        nprobe: int,
+    ) -> list[list[ScoredPoint]]:
+        count = self.count
+        matrix = self.vectors[:count]
+        alive = self.alive[:count]
+        ivf = self._ivf(ivf_min_points)
+
+        masks: dict[str, np.ndarray] = {}
+        results = []
+        # Without an IVF index every query scores every row, in one matrix product
+        exact_scores = matrix @ queries.T if ivf is None else None
+        for index, (query, limit, query_filter) in enumerate(
+            zip(queries, limits, query_filters)
+        ):
+            mask = alive
+            if query_filter is not None:
+                key = query_filter.model_dump_json()
+                if key not in masks:
+                    masks[key] = alive & self._filter_mask(query_filter, count)
+                mask = masks[key]
+
+            if ivf is None:
+                candidates = np.flatnonzero(mask)
+                scores = exact_scores[candidates, index]
+            else:
+                candidates = ivf.candidates(query, nprobe)
+                candidates = candidates[mask[candidates]]
+                scores = matrix[candidates] @ query
+
+            k = min(limit, len(candidates))
+            if k == 0:
+                results.append([])
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results.append(
+                [
+                    ScoredPoint(
+                        id=self.ids[candidates[i]],
+                        version=0,
+                        score=float(scores[i]),
+                        payload=self.payloads[candidates[i]],
+                    )
+                    for i in top
+                ]
+            )
+        return results
+
+    def close(self):
+        with self.lock:
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            self.db.close()
+
+
+def _select_payload(
+    payload: dict[str, any], with_payload: bool | list[str]
+) -> dict[str, any] | None:
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    selected: dict[str, any] = {}
+    for key in with_payload:
+        value = _get_path(payload, key)
+        if value is None:
+            continue
+        *parents, leaf = key.split(".")
+        target = selected
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return selected
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store for tests, benchmarks and small deployments.
+
+    Each collection is a directory under `path`, see `LocalCollection`. Search is
+    exact cosine similarity with `argpartition` top-k, switching to IVF cells
+    once a collection reaches `ivf_min_points` points (0 disables IVF). Exact
+    search also serves as the ground truth for recall benchmarks.
+    """
+
+    def __init__(
+        self,
+        path: str = LOCAL_VECTORSTORE_DIR,
+        ivf_min_points: int = LOCAL_VECTORSTORE_IVF_MIN_POINTS,
+        nprobe: int = LOCAL_VECTORSTORE_IVF_NPROBE,
+        search_cache: SearchResultCache | None = None,
+    ):
+        self.path = path
+        self.search_cache = search_cache if search_cache else SearchResultCache()
+        self.ivf_min_points = ivf_min_points
+        self.nprobe = nprobe
+        self._collections: dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _collection_path(self, collection_name: str) -> str:
+        return os.path.join(self.path, collection_name)
+
+    def _get(self, collection_name: str) -> LocalCollection:
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                if not self.collection_exists(collection_name):
+                    raise CollectionNotFoundError(collection_name)
+                collection = LocalCollection(self._collection_path(collection_name))
+                self._collections[collection_name] = collection
+            return collection
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.isfile(
+            os.path.join(self._collection_path(collection_name), "meta.json")
+        )
+
+    def get_collection_metadata(self, collection_name: str) -> CollectionMetadata:
+        if not self.collection_exists(collection_name):
+            return CollectionMetadata(exists=False)
+        collection = self._get(collection_name)
+        return CollectionMetadata(
+            exists=True,
+            vector_size=collection.vector_size,
+            distance="Cosine",
+            points_count=collection.points_count(),
+        )
+
+    def create_collection(
+        self, collection_name: str, vector_size: int, profile=None
+    ) -> bool:
+        """Create the collection if needed. Index profiles only apply to Qdrant."""
+        with self._lock:
+            if not self.collection_exists(collection_name):
+                self._collections[collection_name] = LocalCollection(
+                    self._collection_path(collection_name), vector_size
+                )
+        return True
+
+    def get_collections(self) -> list[str]:
+        return sorted(
+            name for name in os.listdir(self.path) if self.collection_exists(name)
+        )
+
+    def get_collection_info(
+        self, exact: bool = False
+    ) -> list[dict[str, dict[str, any]]]:
+        """Counts are always exact here. Memory is the mapped vector matrix."""
+        info = []
+        for name in self.get_collections():
+            collection = self._get(name)
+            disk = os.path.getsize(collection.vectors_path) + os.path.getsize(
+                os.path.join(collection.path, "points.sqlite")
+            )
+            info.append(
+                {
+                    name: {
+                        "points": collection.points_count(),
+                        "exact": True,
+                        "status": "green",
+                        "segments": 1,
+                        "indexed_vectors": collection.ivf.size if collection.ivf else 0,
+                        "estimated_ram_bytes": collection.count
+                        * collection.vector_size
+                        * 4,
+                        "estimated_disk_bytes": disk,
+                    }
+                }
+            )
+        return info
+
+    def upload_collection(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        page_contents: list[str],
+        metadata: list[dict[str, any]] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        backend_logger.info(
+            f"Uploading collection {collection_name} with {len(vectors)} vectors"
+        )
+        payloads = self._build_payloads(page_contents, metadata)
+        ids = (
+            [str(id) for id in ids]
+            if ids
+            else [str(uuid.uuid4()) for _ in range(len(vectors))]
+        )
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.create_collection(collection_name, vectors.shape[1])
+        self._get(collection_name).write(ids, vectors, payloads)
+        self.search_cache.bump(collection_name)
+        return ids
+
+    def upsert(
+        self,
+        collection_name: str,
+        vector: list[float],
+        page_content: str,
+        metadata: dict[str, any] | None = None,
+        id: str | None = None,
+    ) -> str:
+        id = str(id) if id else str(uuid.uuid4())
+        point = self._build_point(vector, page_content, metadata, id)
+        self.create_collection(collection_name, len(vector))
+        self._get(collection_name).write(
+            [id], np.asarray([vector], dtype=np.float32), [point.payload]
+        )
+        self.search_cache.bump(collection_name)
+        return id
+
+    def search(
+        self,
+        collection_name: str,
+        vector: list[float],
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        return self.search_batch(collection_name, [vector], [limit], [query_filter])[0]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None = None,
+    ) -> list[list[ScoredPoint]]:
+        # No lexical index here, hybrid searches use the dense vectors only
+        return self._get(collection_name).search(
+            np.asarray(vectors, dtype=np.float32),
+            limits,
+            query_filters,
+            ivf_min_points=self.ivf_min_points,
+            nprobe=self.nprobe,
+        )
+
+    def delete_collection(self, collection_name: str) -> bool:
+        collection = self._get(collection_name)
+        with self._lock:
+            collection.close()
+            self._collections.pop(collection_name, None)
+            shutil.rmtree(self._collection_path(collection_name))
+        self.search_cache.bump(collection_name)
+        return True
+
+    def delete_points(self, collection_name: str, ids: list[str]):
+        self._get(collection_name).delete([str(id) for id in ids])
+        self.search_cache.bump(collection_name)
+
+    def iter_points(
+        self,
+        collection_name: str,
+        with_payload: bool | list[str] = True,
+        page_size: int = 1000,
+        limit: int | None = None,
+    ) -> Iterator[Record]:
+        collection = self._get(collection_name)
+        produced = 0
+        for id, payload in collection.points():
+            if limit is not None and produced >= limit:
+                return
+            produced += 1
+            yield Record(id=id, payload=_select_payload(payload, with_payload))
+
+    def get_metadata_values(
+        self, collection_name: str, keys: list[str]
+    ) -> dict[str, dict[str, any]]:
+        if not self.collection_exists(collection_name):
+            return {}
+        collection = self._get(collection_name)
+        return {
+            id: {key: payload.get("metadata", {}).get(key) for key in keys}
+            for id, payload in collection.points()
+        }
+
+    async def aclose(self):
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections.clear()
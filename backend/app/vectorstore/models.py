@@ -1,6 +1,7 @@
 from enum import Enum
+from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CollectionName(str, Enum):
@@ -18,3 +19,49 @@ class FailedTable(BaseModel):
 class SyncResponse(BaseModel):
     success: list[str]
     failed: list[FailedTable]
+
+
+class CollectionMetadata(BaseModel):
+    exists: bool
+    vector_size: int | None = None
+    distance: str | None = None
+    points_count: int | None = None
+    sparse_vectors: list[str] = []
+
+
+class UploadRecord(BaseModel):
+    """One point for a streamed upload. Deterministic IDs make retries idempotent."""
+
+    id: str
+    vector: list[float]
+    page_content: str
+    metadata: dict[str, Any] = Field(default_factory=dict)
+
+
+class MetadataFilter(BaseModel):
+    """
+    A condition on one metadata field. `match` tests equality, or membership when
+    given a list. `gte`/`lte` bound numbers or ISO datetimes. Set one or the other.
+    """
+
+    key: str = Field(..., description="Metadata key, e.g. category or order_date")
+    match: str | int | bool | list[str] | list[int] | None = Field(
+        None, description="Value to match, or any of a list of values"
+    )
+    gte: float | str | None = Field(None, description="Lower bound, inclusive")
+    lte: float | str | None = Field(None, description="Upper bound, inclusive")
+
+
+class SearchQuery(BaseModel):
+    query: str = Field(..., description="Text to search for")
+    collection: str = Field(..., description="Collection to search in")
+    k: int = Field(4, ge=1, le=100, description="Number of documents to return")
+    filters: list[MetadataFilter] = Field(
+        default_factory=list, description="Conditions every document must meet"
+    )
+
+
+class SearchBatchRequest(BaseModel):
+    queries: list[SearchQuery] = Field(
+        ..., description="Searches to run together", min_length=1
+    )
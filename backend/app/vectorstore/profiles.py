@@ -0,0 +1,273 @@
+from enum import Enum
+
+from app.mssql.models import Table
+from app.vectorstore.sparse import SPARSE_VECTOR_NAME
+from app.vectorstore.utils import dense_vector_params
+from pydantic import BaseModel, Field
+from qdrant_client import models
+from qdrant_client.models import PayloadSchemaType
+
+
+class Quantization(str, Enum):
+    none = "none"
+    scalar = "scalar"
+    binary = "binary"
+
+
+class IndexProfile(BaseModel):
+    """
+    How a collection is indexed and stored, and how it is searched.
+
+    `hnsw_m` and `hnsw_ef_construct` trade index size and build time for recall,
+    `search_ef` does the same at query time. Quantized vectors are kept in RAM
+    and searched first, then the best `oversampling * k` candidates are rescored
+    against the original vectors, which may live on disk.
+    """
+
+    hnsw_m: int = Field(16, ge=0)
+    hnsw_ef_construct: int = Field(100, ge=4)
+    search_ef: int | None = Field(None, ge=1)
+    quantization: Quantization = Quantization.none
+    rescore: bool = True
+    oversampling: float = Field(2.0, ge=1.0)
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+
+    @classmethod
+    def from_collection_info(cls, info: models.CollectionInfo) -> "IndexProfile":
+        """The profile an existing collection was actually created with."""
+        vectors = dense_vector_params(info)
+        quantization = Quantization.none
+        if isinstance(info.config.quantization_config, models.ScalarQuantization):
+            quantization = Quantization.scalar
+        elif isinstance(info.config.quantization_config, models.BinaryQuantization):
+            quantization = Quantization.binary
+        return cls(
+            hnsw_m=info.config.hnsw_config.m,
+            hnsw_ef_construct=info.config.hnsw_config.ef_construct,
+            quantization=quantization,
+            on_disk_vectors=bool(vectors.on_disk) if vectors else False,
+            on_disk_payload=bool(info.config.params.on_disk_payload),
+        )
+
+    def vectors_config(self, vector_size: int) -> models.VectorParams:
+        return models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk_vectors,
+        )
+
+    def hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self) -> models.QuantizationConfig | None:
+        if self.quantization == Quantization.scalar:
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == Quantization.binary:
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def sparse_vectors_config(self) -> dict[str, models.SparseVectorParams]:
+        return {
+            SPARSE_VECTOR_NAME: models.SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=self.on_disk_vectors),
+                modifier=models.Modifier.IDF,
+            )
+        }
+
+    def collection_config(self, vector_size: int) -> dict[str, any]:
+        """Keyword arguments for `create_collection`."""
+        return {
+            "vectors_config": self.vectors_config(vector_size),
+            "sparse_vectors_config": self.sparse_vectors_config(),
+            "hnsw_config": self.hnsw_config(),
+            "quantization_config": self.quantization_config(),
+            "on_disk_payload": self.on_disk_payload,
+        }
+
+    def search_params(self) -> models.SearchParams | None:
+        quantization = None
+        if self.quantization != Quantization.none:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        if self.search_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+    def estimate_memory(self, points: int, vector_size: int) -> dict[str, int]:
+        """
+        Rough RAM and disk footprint in bytes for `points` vectors.
+
+        Uses Qdrant's sizing rule of thumb: fp32 vectors plus 50% overhead, plus
+        the HNSW graph links at 8 bytes per link on the two densest levels.
+        """
+        vectors = int(points * vector_size * 4 * 1.5)
+        graph = points * self.hnsw_m * 2 * 8
+        quantized = 0
+        if self.quantization == Quantization.scalar:
+            quantized = points * vector_size
+        elif self.quantization == Quantization.binary:
+            quantized = points * vector_size // 8
+
+        ram = graph + quantized + (0 if self.on_disk_vectors else vectors)
+        disk = vectors + graph + quantized
+        return {"ram_bytes": ram, "disk_bytes": disk}
+
+
+INDEX_PROFILES: dict[str, IndexProfile] = {
+    "default": IndexProfile(),
+    "int8": IndexProfile(quantization=Quantization.scalar),
+    "int8-on-disk": IndexProfile(
+        quantization=Quantization.scalar,
+        on_disk_vectors=True,
+        on_disk_payload=True,
+    ),
+    "binary": IndexProfile(
+        quantization=Quantization.binary, oversampling=3.0, on_disk_vectors=True
+    ),
+    "high-recall": IndexProfile(hnsw_m=32, hnsw_ef_construct=200, search_ef=128),
+}
+
+# The order tables are by far the largest, keep their full vectors and payloads
+# on disk and search them through int8 copies held in RAM
+TABLE_INDEX_PROFILES: dict[str, IndexProfile] = {
+    Table.orders.value: INDEX_PROFILES["int8-on-disk"],
+    Table.order_details.value: INDEX_PROFILES["int8-on-disk"],
+}
+
+
+def get_index_profile(collection_name: str) -> IndexProfile:
+    return TABLE_INDEX_PROFILES.get(collection_name, INDEX_PROFILES["default"])
+
+
+class PayloadField(BaseModel):
+    """
+    A filterable metadata field, indexed in Qdrant as `metadata.<key>`.
+
+    `column` names the SQL column the value is copied from during sync, fields
+    without a column are written by the sync itself.
+    """
+
+    key: str
+    field_schema: PayloadSchemaType
+    column: str | None = None
+
+
+COMMON_PAYLOAD_FIELDS: list[PayloadField] = [
+    PayloadField(key="source", field_schema=PayloadSchemaType.KEYWORD),
+    PayloadField(key="created_at", field_schema=PayloadSchemaType.DATETIME),
+]
+
+TABLE_PAYLOAD_FIELDS: dict[str, list[PayloadField]] = {
+    Table.products.value: [
+        PayloadField(
+            key="category",
+            column="CategoryName",
+            field_schema=PayloadSchemaType.KEYWORD,
+        ),
+        PayloadField(
+            key="supplier_id",
+            column="SupplierID",
+            field_schema=PayloadSchemaType.INTEGER,
+        ),
+        PayloadField(
+            key="discontinued",
+            column="Discontinued",
+            field_schema=PayloadSchemaType.BOOL,
+        ),
+    ],
+    Table.employees.value: [
+        PayloadField(
+            key="title", column="Title", field_schema=PayloadSchemaType.KEYWORD
+        ),
+        PayloadField(key="city", column="City", field_schema=PayloadSchemaType.KEYWORD),
+        PayloadField(
+            key="country", column="Country", field_schema=PayloadSchemaType.KEYWORD
+        ),
+    ],
+    Table.customers.value: [
+        PayloadField(key="city", column="City", field_schema=PayloadSchemaType.KEYWORD),
+        PayloadField(
+            key="country", column="Country", field_schema=PayloadSchemaType.KEYWORD
+        ),
+    ],
+    Table.suppliers.value: [
+        PayloadField(
+            key="country", column="Country", field_schema=PayloadSchemaType.KEYWORD
+        ),
+    ],
+    Table.orders.value: [
+        PayloadField(
+            key="customer_id",
+            column="CustomerID",
+            field_schema=PayloadSchemaType.KEYWORD,
+        ),
+        PayloadField(
+            key="employee_id",
+            column="EmployeeID",
+            field_schema=PayloadSchemaType.INTEGER,
+        ),
+        PayloadField(
+            key="order_date",
+            column="OrderDate",
+            field_schema=PayloadSchemaType.DATETIME,
+        ),
+        PayloadField(
+            key="ship_country",
+            column="ShipCountry",
+            field_schema=PayloadSchemaType.KEYWORD,
+        ),
+    ],
+    Table.order_details.value: [
+        PayloadField(
+            key="order_id", column="OrderID", field_schema=PayloadSchemaType.INTEGER
+        ),
+        PayloadField(
+            key="product_id",
+            column="ProductID",
+            field_schema=PayloadSchemaType.INTEGER,
+        ),
+    ],
+}
+
+
+def get_payload_fields(collection_name: str) -> list[PayloadField]:
+    return COMMON_PAYLOAD_FIELDS + TABLE_PAYLOAD_FIELDS.get(collection_name, [])
+
+
+def coerce_payload_value(field: PayloadField, value: any) -> any:
+    """
+    Convert a filter value to the type of the field's index, e.g. "5" to 5 for an
+    INTEGER field, since a mismatched type silently matches nothing.
+
+    Raises:
+        ValueError: if the value cannot be converted.
+    """
+    if field.field_schema == PayloadSchemaType.INTEGER:
+        if isinstance(value, bool):
+            raise ValueError(f"{field.key} expects an integer, got {value}")
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        try:
+            return int(str(value).strip())
+        except ValueError:
+            raise ValueError(f"{field.key} expects an integer, got {value!r}")
+    if field.field_schema == PayloadSchemaType.BOOL:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in ("true", "1", "yes"):
+            return True
+        if text in ("false", "0", "no"):
+            return False
+        raise ValueError(f"{field.key} expects true or false, got {value!r}")
+    if field.field_schema == PayloadSchemaType.KEYWORD:
+        return str(value)
+    return value
@@ -1,49 +1,231 @@
+import asyncio
+import itertools
+import time
 import uuid
-from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
-from app.config import QDRANT_URL, backend_logger
+import httpx
+from app.config import (
+    HYBRID_PREFETCH_LIMIT,
+    QDRANT_GRPC_PORT,
+    QDRANT_MAX_CONNECTIONS,
+    QDRANT_MAX_KEEPALIVE,
+    QDRANT_PREFER_GRPC,
+    QDRANT_SCROLL_PAGE_SIZE,
+    QDRANT_TIMEOUT,
+    QDRANT_UPLOAD_BATCH_SIZE,
+    QDRANT_UPLOAD_MAX_RETRIES,
+    QDRANT_UPLOAD_WORKERS,
+    QDRANT_URL,
+    backend_logger,
+)
 from app.exceptions.errors import CollectionNotFoundError
-from app.vectorstore.utils import generate_uuid
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PayloadSchemaType, PointStruct, VectorParams
+from app.vectorstore.base import VectorStore
+from app.vectorstore.cache import CollectionMetadataCache, SearchResultCache
+from app.vectorstore.models import CollectionMetadata, UploadRecord
+from app.vectorstore.profiles import (
+    IndexProfile,
+    get_index_profile,
+    get_payload_fields,
+)
+from app.vectorstore.sparse import (
+    SPARSE_VECTOR_NAME,
+    document_sparse_vector,
+    query_sparse_vector,
+)
+from app.vectorstore.utils import abatched, dense_vector_params, generate_uuid
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    CollectionInfo,
+    CollectionsResponse,
+    Distance,
+    Filter,
+    Fusion,
+    FusionQuery,
+    PointIdsList,
+    Prefetch,
+    PointStruct,
+    QueryRequest,
+    Record,
+    ScoredPoint,
+    VectorParams,
+)
 
+# Staging copy of a collection while it is recreated with the sparse index
+_MIGRATION_SUFFIX = "__sparse_migration"
 
-class VectorStore(ABC):
-    @abstractmethod
-    def create_collection(self, collection_name: str, vector_size: int) -> bool:
-        pass
 
-    @abstractmethod
-    def get_collections(self) -> list[str]:
-        pass
+def create_qdrant_client(
+    url: str,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    grpc_port: int = QDRANT_GRPC_PORT,
+) -> QdrantClient:
+    """
+    Create a Qdrant client.
+
+    With `prefer_grpc` points and queries go over gRPC on `grpc_port`, where
+    vectors are sent as packed floats rather than JSON text.
+    """
+    return QdrantClient(url=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
+
+
+def create_async_qdrant_client(
+    url: str,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    grpc_port: int = QDRANT_GRPC_PORT,
+    max_connections: int = QDRANT_MAX_CONNECTIONS,
+    max_keepalive: int = QDRANT_MAX_KEEPALIVE,
+    timeout: int = QDRANT_TIMEOUT,
+) -> AsyncQdrantClient:
+    """
+    Create an async Qdrant client with a bounded keep-alive connection pool.
 
-    @abstractmethod
-    def get_collection_info(self) -> list[dict[str, dict[str, any]]]:
-        pass
+    qdrant-client disables keep-alive for localhost by default, which makes every
+    REST request open a new connection. `prefer_grpc` works as in
+    `create_qdrant_client`.
+    """
+    return AsyncQdrantClient(
+        url=url,
+        prefer_grpc=prefer_grpc,
+        grpc_port=grpc_port,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        ),
+    )
 
 
 class MyQdrantVectorStore(VectorStore):
-    def __init__(self, url: str):
+    supports_sparse_vectors = True
+
+    def __init__(
+        self,
+        url: str,
+        client: QdrantClient | None = None,
+        async_client: AsyncQdrantClient | None = None,
+        prefer_grpc: bool = QDRANT_PREFER_GRPC,
+        grpc_port: int = QDRANT_GRPC_PORT,
+        metadata_cache: CollectionMetadataCache | None = None,
+        search_cache: SearchResultCache | None = None,
+    ):
         self.url = url
-        self.client = QdrantClient(url=url)
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.client = (
+            client if client else create_qdrant_client(url, prefer_grpc, grpc_port)
+        )
+        self._async_client = async_client
+        self.metadata_cache = (
+            metadata_cache if metadata_cache else CollectionMetadataCache()
+        )
+        self.search_cache = search_cache if search_cache else SearchResultCache()
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        if self._async_client is None:
+            self._async_client = create_async_qdrant_client(
+                self.url, self.prefer_grpc, self.grpc_port
+            )
+        return self._async_client
+
+    def _invalidate(self, collection_name: str):
+        # Every write changes the point count and may change search results
+        self.metadata_cache.invalidate(collection_name)
+        self.search_cache.bump(collection_name)
+
+    def get_collection_metadata(self, collection_name: str) -> CollectionMetadata:
+        """Existence, vector size, distance and point count, cached for a short TTL."""
+        return self.metadata_cache.get(self.client, collection_name)
+
+    async def aget_collection_metadata(
+        self, collection_name: str
+    ) -> CollectionMetadata:
+        return await self.metadata_cache.aget(self.async_client, collection_name)
 
     def collection_exists(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name)
+        return self.get_collection_metadata(collection_name).exists
 
-    def create_payload_index(self, collection_name: str):
-        result = self.client.create_payload_index(
-            collection_name=collection_name,
-            field_name="myid",
-            field_schema=PayloadSchemaType.TEXT,
-        )
-        backend_logger.info(f"Payload index created: {result}")
+    async def acollection_exists(self, collection_name: str) -> bool:
+        return (await self.aget_collection_metadata(collection_name)).exists
 
-    def create_collection(self, collection_name: str, vector_size: int) -> bool:
+    def has_sparse_vectors(self, collection_name: str) -> bool:
+        metadata = self.get_collection_metadata(collection_name)
+        return SPARSE_VECTOR_NAME in metadata.sparse_vectors
+
+    async def ahas_sparse_vectors(self, collection_name: str) -> bool:
+        metadata = await self.aget_collection_metadata(collection_name)
+        return SPARSE_VECTOR_NAME in metadata.sparse_vectors
+
+    @staticmethod
+    def _point_vector(
+        vector: list[float], page_content: str, sparse: bool
+    ) -> list[float] | dict[str, any]:
+        # Collections created before the sparse index only take the dense vector
+        if not sparse:
+            return vector
+        return {"": vector, SPARSE_VECTOR_NAME: document_sparse_vector(page_content)}
+
+    @staticmethod
+    def dense_vector(vector: list[float] | dict[str, any]) -> list[float]:
+        """The dense vector of a retrieved point, with or without the sparse index."""
+        # Collections with the sparse index return the unnamed dense vector under ""
+        return vector[""] if isinstance(vector, dict) else vector
+
+    def create_payload_indexes(self, collection_name: str):
+        """Index the collection's declared metadata fields, existing indexes are kept."""
+        for field in get_payload_fields(collection_name):
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=f"metadata.{field.key}",
+                field_schema=field.field_schema,
+            )
+        backend_logger.info(f"Payload indexes created for '{collection_name}'")
+
+    async def acreate_payload_indexes(self, collection_name: str):
+        for field in get_payload_fields(collection_name):
+            await self.async_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=f"metadata.{field.key}",
+                field_schema=field.field_schema,
+            )
+        backend_logger.info(f"Payload indexes created for '{collection_name}'")
+
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        profile: IndexProfile | None = None,
+    ) -> bool:
+        """Create the collection with its index profile if it does not exist yet."""
         if not self.collection_exists(collection_name):
-            return self.client.create_collection(
+            profile = profile if profile else get_index_profile(collection_name)
+            result = self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+                **profile.collection_config(vector_size),
             )
+            self.metadata_cache.invalidate(collection_name)
+            self.create_payload_indexes(collection_name)
+            return result
+        else:
+            return True
+
+    async def acreate_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        profile: IndexProfile | None = None,
+    ) -> bool:
+        if not await self.acollection_exists(collection_name):
+            profile = profile if profile else get_index_profile(collection_name)
+            result = await self.async_client.create_collection(
+                collection_name=collection_name,
+                **profile.collection_config(vector_size),
+            )
+            self.metadata_cache.invalidate(collection_name)
+            await self.acreate_payload_indexes(collection_name)
+            return result
         else:
             return True
 
@@ -53,22 +235,81 @@ class MyQdrantVectorStore(VectorStore):
         Returns:
             List of the collections
         """
-        collections_response = self.client.get_collections()
-        collection_descriptions = collections_response.collections
-        collection_names = [collection.name for collection in collection_descriptions]
-        return collection_names
+        return self._collection_names(self.client.get_collections())
 
-    def get_collection_info(self) -> list[dict[str, dict[str, any]]]:
+    @staticmethod
+    def _collection_names(response: CollectionsResponse) -> list[str]:
+        # Staging copies of collections being migrated are not listed
+        return [
+            collection.name
+            for collection in response.collections
+            if not collection.name.endswith(_MIGRATION_SUFFIX)
+        ]
+
+    @staticmethod
+    def _collection_stats(
+        info: CollectionInfo, exact_count: int | None
+    ) -> dict[str, any]:
+        vectors = dense_vector_params(info)
+        points = exact_count if exact_count is not None else info.points_count or 0
+        # Qdrant does not report memory use per collection, estimate it from the
+        # collection's actual index configuration
+        memory = IndexProfile.from_collection_info(info).estimate_memory(
+            points, vectors.size if vectors else 0
+        )
+        return {
+            "points": points,
+            "exact": exact_count is not None,
+            "status": info.status.value,
+            "segments": info.segments_count,
+            "indexed_vectors": info.indexed_vectors_count,
+            "estimated_ram_bytes": memory["ram_bytes"],
+            "estimated_disk_bytes": memory["disk_bytes"],
+        }
+
+    def get_collection_info(
+        self, exact: bool = False
+    ) -> list[dict[str, dict[str, any]]]:
         """Get list information for all existing collections
 
+        Point counts come from the collection info and are approximate unless
+        `exact` is set, which costs a full count per collection.
+
         Returns:
-            List of the dictionaries with collection name and metadata
+            List of the dictionaries with collection name and statistics
         """
         return [
-            {collection: {"points": (self.client.count(collection)).count}}
+            {
+                collection: self._collection_stats(
+                    self.client.get_collection(collection),
+                    self.client.count(collection, exact=True).count if exact else None,
+                )
+            }
             for collection in self.get_collections()
         ]
 
+    async def aget_collection_info(
+        self, exact: bool = False
+    ) -> list[dict[str, dict[str, any]]]:
+        """Async `get_collection_info`, fetching every collection concurrently."""
+        collections = self._collection_names(await self.async_client.get_collections())
+
+        async def collection_stats(collection: str) -> dict[str, dict[str, any]]:
+            if exact:
+                info, count = await asyncio.gather(
+                    self.async_client.get_collection(collection),
+                    self.async_client.count(collection, exact=True),
+                )
+                return {collection: self._collection_stats(info, count.count)}
+            info = await self.async_client.get_collection(collection)
+            return {collection: self._collection_stats(info, None)}
+
+        return list(
+            await asyncio.gather(
+                *(collection_stats(collection) for collection in collections)
+            )
+        )
+
     def upload_collection(
         self,
         collection_name: str,
@@ -81,25 +322,302 @@ class MyQdrantVectorStore(VectorStore):
         This method will perform automatic batching of the data.
         If you need to perform a single update, use `upsert` method.
         """
+        if not vectors:
+            return []
         backend_logger.info(
             f"Uploading collection {collection_name} with {len(vectors)} vectors"
         )
 
-        if metadata is None:
-            metadata = [{} for _ in range(len(page_contents))]
-
-        payload = [
-            {
-                "id": m.get("source") if m else None,
-                "page_content": page_content,
-                "metadata": m,
-            }
-            for page_content, m in zip(page_contents, metadata)
-        ]
+        payload = self._build_payloads(page_contents, metadata)
         ids = ids if ids else [str(uuid.uuid4()) for _ in range(len(vectors))]
         self.create_collection(collection_name, len(vectors[0]))
+        sparse = self.has_sparse_vectors(collection_name)
         self.client.upload_collection(
-            collection_name=collection_name, vectors=vectors, payload=payload, ids=ids
+            collection_name=collection_name,
+            vectors=[
+                self._point_vector(vector, page_content, sparse)
+                for vector, page_content in zip(vectors, page_contents)
+            ],
+            payload=payload,
+            ids=ids,
+        )
+        self._invalidate(collection_name)
+        return ids
+
+    async def aupload_collection(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        page_contents: list[str],
+        metadata: list[dict[str, any]] | None = None,
+        ids: list[str] | None = None,
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+    ) -> list[str]:
+        """Async `upload_collection`.
+
+        The async client's own `upload_collection` blocks, so the points are sent
+        as concurrent `upsert` batches over the shared connection pool instead.
+        """
+        if not vectors:
+            return []
+        backend_logger.info(
+            f"Uploading collection {collection_name} with {len(vectors)} vectors"
+        )
+
+        payload = self._build_payloads(page_contents, metadata)
+        ids = ids if ids else [str(uuid.uuid4()) for _ in range(len(vectors))]
+        await self.acreate_collection(collection_name, len(vectors[0]))
+        sparse = await self.ahas_sparse_vectors(collection_name)
+
+        points = [
+            PointStruct(
+                id=id,
+                vector=self._point_vector(vector, p["page_content"], sparse),
+                payload=p,
+            )
+            for id, vector, p in zip(ids, vectors, payload)
+        ]
+        semaphore = asyncio.Semaphore(QDRANT_MAX_KEEPALIVE)
+
+        async def upsert_batch(batch: list[PointStruct]):
+            async with semaphore:
+                await self._aupsert_batch(collection_name, batch)
+
+        await asyncio.gather(
+            *(
+                upsert_batch(points[start : start + batch_size])
+                for start in range(0, len(points), batch_size)
+            )
+        )
+        self._invalidate(collection_name)
+        return ids
+
+    async def _aupsert_batch(
+        self,
+        collection_name: str,
+        points: list[PointStruct],
+        max_retries: int = QDRANT_UPLOAD_MAX_RETRIES,
+    ):
+        # Point IDs are fixed before the first attempt, so a retry after a
+        # partially applied upsert overwrites the same points
+        for attempt in range(max_retries + 1):
+            try:
+                await self.async_client.upsert(
+                    collection_name=collection_name, points=points
+                )
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = 0.5 * 2**attempt
+                backend_logger.warning(
+                    f"Upsert of {len(points)} points into {collection_name} failed: "
+                    f"{e}, retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+
+    def upload_points(
+        self,
+        collection_name: str,
+        points: Iterable[tuple[str | int, list[float], dict[str, any]]],
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        parallel: int = 1,
+    ):
+        """
+        Upload `(id, vector, payload)` points to an existing collection with the
+        client's `upload_points`, in batches of `batch_size` on `parallel`
+        processes. The sparse vectors are computed from each payload's page
+        content when the collection has the sparse index.
+        """
+        sparse = self.has_sparse_vectors(collection_name)
+        try:
+            self.client.upload_points(
+                collection_name=collection_name,
+                points=(
+                    PointStruct(
+                        id=id,
+                        vector=self._point_vector(
+                            vector, payload.get("page_content", ""), sparse
+                        ),
+                        payload=payload,
+                    )
+                    for id, vector, payload in points
+                ),
+                batch_size=batch_size,
+                parallel=parallel,
+                wait=True,
+            )
+        finally:
+            self._invalidate(collection_name)
+
+    def _stream_point(self, record: UploadRecord, sparse: bool) -> PointStruct:
+        return PointStruct(
+            id=record.id,
+            vector=self._point_vector(record.vector, record.page_content, sparse),
+            payload=self._build_payloads([record.page_content], [record.metadata])[0],
+        )
+
+    def _upsert_batch(
+        self,
+        collection_name: str,
+        points: list[PointStruct],
+        max_retries: int = QDRANT_UPLOAD_MAX_RETRIES,
+    ) -> int:
+        for attempt in range(max_retries + 1):
+            try:
+                self.client.upsert(collection_name=collection_name, points=points)
+                return len(points)
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = 0.5 * 2**attempt
+                backend_logger.warning(
+                    f"Upsert of {len(points)} points into {collection_name} failed: "
+                    f"{e}, retrying in {delay}s"
+                )
+                time.sleep(delay)
+
+    def upload_stream(
+        self,
+        collection_name: str,
+        records: Iterable[UploadRecord],
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        workers: int = QDRANT_UPLOAD_WORKERS,
+        progress: Callable[[int], None] | None = None,
+        max_retries: int = QDRANT_UPLOAD_MAX_RETRIES,
+    ) -> list[str]:
+        """
+        Upload points from an iterator on `workers` threads, with at most
+        `2 * workers` batches in flight, retrying failed batches with backoff up
+        to `max_retries` times. `progress` is called with the number of points
+        upserted so far whenever a batch completes.
+
+        Returns:
+            list[str]: IDs of the uploaded points.
+        """
+        records = iter(records)
+        first = next(records, None)
+        if first is None:
+            return []
+        self.create_collection(collection_name, len(first.vector))
+        sparse = self.has_sparse_vectors(collection_name)
+
+        ids: list[str] = []
+        uploaded = 0
+
+        def completed(futures: set[Future]):
+            nonlocal uploaded
+            for future in futures:
+                uploaded += future.result()
+                if progress:
+                    progress(uploaded)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending: set[Future] = set()
+            for batch in itertools.batched(
+                itertools.chain([first], records), batch_size
+            ):
+                ids.extend(record.id for record in batch)
+                pending.add(
+                    executor.submit(
+                        self._upsert_batch,
+                        collection_name,
+                        [self._stream_point(record, sparse) for record in batch],
+                        max_retries,
+                    )
+                )
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    completed(done)
+            completed(wait(pending).done)
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self._invalidate(collection_name)
+        return ids
+
+    async def aupload_stream(
+        self,
+        collection_name: str,
+        records: Iterable[UploadRecord] | AsyncIterable[UploadRecord],
+        batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        workers: int = QDRANT_UPLOAD_WORKERS,
+        progress: Callable[[int], None] | None = None,
+        max_retries: int = QDRANT_UPLOAD_MAX_RETRIES,
+    ) -> list[str]:
+        """
+        Upload points from a sync or async iterator with bounded memory.
+
+        Batches are handed to `workers` concurrent upserts through a queue of at
+        most `2 * workers` batches. Once it is full the iterator is not advanced
+        until a batch has been sent, so memory stays flat however long the
+        stream is, and a slow producer (e.g. document generation) overlaps with
+        the uploads. Failed batches are retried with exponential backoff.
+
+        Args:
+            collection_name (str): Collection to upload to, created from the
+                first record's vector size if needed.
+            records: Points to upload.
+            batch_size (int): Points per upsert request.
+            workers (int): Concurrent upsert requests.
+            progress (Callable[[int], None] | None): Called with the number of
+                points uploaded so far after every batch.
+            max_retries (int): Retries per batch before the upload fails.
+
+        Returns:
+            list[str]: IDs of the uploaded points.
+        """
+        queue: asyncio.Queue[list[PointStruct] | None] = asyncio.Queue(
+            maxsize=workers * 2
+        )
+        ids: list[str] = []
+        uploaded = 0
+        start = time.perf_counter()
+
+        async def worker():
+            nonlocal uploaded
+            while (batch := await queue.get()) is not None:
+                await self._aupsert_batch(collection_name, batch, max_retries)
+                uploaded += len(batch)
+                backend_logger.debug(
+                    f"Uploaded {uploaded} points to {collection_name} "
+                    f"({uploaded / (time.perf_counter() - start):.0f}/s)"
+                )
+                if progress:
+                    progress(uploaded)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+
+        async def put(item: list[PointStruct] | None):
+            # A worker only exits early by raising, don't wait on a full queue then
+            put_task = asyncio.create_task(queue.put(item))
+            await asyncio.wait([put_task, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            if not put_task.done():
+                put_task.cancel()
+                for task in tasks:
+                    if task.done():
+                        task.result()
+
+        try:
+            sparse = None
+            async for batch in abatched(records, batch_size):
+                if sparse is None:
+                    await self.acreate_collection(collection_name, len(batch[0].vector))
+                    sparse = await self.ahas_sparse_vectors(collection_name)
+                ids.extend(record.id for record in batch)
+                await put([self._stream_point(record, sparse) for record in batch])
+            for _ in tasks:
+                await put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if ids:
+                self._invalidate(collection_name)
+
+        backend_logger.info(
+            f"Uploaded {uploaded} points to {collection_name} "
+            f"in {time.perf_counter() - start:.2f}s"
         )
         return ids
 
@@ -118,33 +636,402 @@ class MyQdrantVectorStore(VectorStore):
         """
         self.create_collection(collection_name, len(vector))
         id = id if id else str(uuid.uuid4())
-        self.client.upsert(
-            collection_name=collection_name,
-            points=[
-                PointStruct(
-                    id=id,
-                    vector=vector,
-                    payload={
-                        "id": metadata.get("source") if metadata else id,
-                        "page_content": page_content,
-                        "metadata": metadata if metadata else {},
-                    },
-                )
-            ],
+        point = self._build_point(vector, page_content, metadata, id)
+        point.vector = self._point_vector(
+            vector, page_content, self.has_sparse_vectors(collection_name)
+        )
+        self.client.upsert(collection_name=collection_name, points=[point])
+        self._invalidate(collection_name)
+        return id
+
+    async def aupsert(
+        self,
+        collection_name: str,
+        vector: list[float],
+        page_content: str,
+        metadata: dict[str, any] | None = None,
+        id: str | None = None,
+    ) -> str:
+        """Async `upsert`."""
+        await self.acreate_collection(collection_name, len(vector))
+        id = id if id else str(uuid.uuid4())
+        point = self._build_point(vector, page_content, metadata, id)
+        point.vector = self._point_vector(
+            vector, page_content, await self.ahas_sparse_vectors(collection_name)
         )
+        await self.async_client.upsert(collection_name=collection_name, points=[point])
+        self._invalidate(collection_name)
         return id
 
-    def search(self, collection_name: str, vector: list[float], limit: int = 5):
+    def search(
+        self,
+        collection_name: str,
+        vector: list[float],
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ):
         if not self.collection_exists(collection_name):
             raise CollectionNotFoundError(collection_name)
         return self.client.search(
-            collection_name=collection_name, query_vector=vector, limit=limit
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=limit,
+            query_filter=query_filter,
+            search_params=get_index_profile(collection_name).search_params(),
+        )
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vector: list[float],
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ):
+        if not await self.acollection_exists(collection_name):
+            raise CollectionNotFoundError(collection_name)
+        return await self.async_client.search(
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=limit,
+            query_filter=query_filter,
+            search_params=get_index_profile(collection_name).search_params(),
+        )
+
+    @staticmethod
+    def _hybrid_query(
+        collection_name: str,
+        vector: list[float],
+        text: str,
+        limit: int,
+        query_filter: Filter | None,
+    ) -> dict[str, any]:
+        """
+        Arguments of a `query_points` request that retrieves candidates with the
+        dense and the sparse vector, then fuses both rankings with RRF.
+
+        The filter applies to both prefetches, so fused results all match it.
+        """
+        prefetch_limit = max(limit, HYBRID_PREFETCH_LIMIT)
+        return {
+            "prefetch": [
+                Prefetch(
+                    query=vector,
+                    limit=prefetch_limit,
+                    filter=query_filter,
+                    params=get_index_profile(collection_name).search_params(),
+                ),
+                Prefetch(
+                    query=query_sparse_vector(text),
+                    using=SPARSE_VECTOR_NAME,
+                    limit=prefetch_limit,
+                    filter=query_filter,
+                ),
+            ],
+            "query": FusionQuery(fusion=Fusion.RRF),
+            "limit": limit,
+        }
+
+    def search_hybrid(
+        self,
+        collection_name: str,
+        vector: list[float],
+        text: str,
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        if not self.has_sparse_vectors(collection_name):
+            return self.search(collection_name, vector, limit, query_filter)
+        return self.client.query_points(
+            collection_name=collection_name,
+            with_payload=True,
+            **self._hybrid_query(collection_name, vector, text, limit, query_filter),
+        ).points
+
+    async def asearch_hybrid(
+        self,
+        collection_name: str,
+        vector: list[float],
+        text: str,
+        limit: int = 5,
+        query_filter: Filter | None = None,
+    ) -> list[ScoredPoint]:
+        if not await self.ahas_sparse_vectors(collection_name):
+            return await self.asearch(collection_name, vector, limit, query_filter)
+        response = await self.async_client.query_points(
+            collection_name=collection_name,
+            with_payload=True,
+            **self._hybrid_query(collection_name, vector, text, limit, query_filter),
+        )
+        return response.points
+
+    def _batch_requests(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None,
+    ) -> list[QueryRequest]:
+        if texts is not None:
+            return [
+                QueryRequest(
+                    with_payload=True,
+                    **self._hybrid_query(
+                        collection_name, vector, text, limit, query_filter
+                    ),
+                )
+                for vector, text, limit, query_filter in zip(
+                    vectors, texts, limits, query_filters
+                )
+            ]
+
+        search_params = get_index_profile(collection_name).search_params()
+        return [
+            QueryRequest(
+                query=vector,
+                limit=limit,
+                filter=query_filter,
+                with_payload=True,
+                params=search_params,
+            )
+            for vector, limit, query_filter in zip(vectors, limits, query_filters)
+        ]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None = None,
+    ) -> list[list[ScoredPoint]]:
+        """Run several searches on one collection in a single request."""
+        if not self.collection_exists(collection_name):
+            raise CollectionNotFoundError(collection_name)
+        if not self.has_sparse_vectors(collection_name):
+            texts = None
+        responses = self.client.query_batch_points(
+            collection_name=collection_name,
+            requests=self._batch_requests(
+                collection_name, vectors, limits, query_filters, texts
+            ),
+        )
+        return [response.points for response in responses]
+
+    async def asearch_batch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limits: list[int],
+        query_filters: list[Filter | None],
+        texts: list[str] | None = None,
+    ) -> list[list[ScoredPoint]]:
+        if not await self.acollection_exists(collection_name):
+            raise CollectionNotFoundError(collection_name)
+        if not await self.ahas_sparse_vectors(collection_name):
+            texts = None
+        responses = await self.async_client.query_batch_points(
+            collection_name=collection_name,
+            requests=self._batch_requests(
+                collection_name, vectors, limits, query_filters, texts
+            ),
         )
+        return [response.points for response in responses]
 
     def delete_collection(self, collection_name: str) -> bool:
         if not self.collection_exists(collection_name):
             raise CollectionNotFoundError(collection_name)
-        return self.client.delete_collection(collection_name)
+        result = self.client.delete_collection(collection_name)
+        self._invalidate(collection_name)
+        return result
+
+    async def adelete_collection(self, collection_name: str) -> bool:
+        if not await self.acollection_exists(collection_name):
+            raise CollectionNotFoundError(collection_name)
+        result = await self.async_client.delete_collection(collection_name)
+        self._invalidate(collection_name)
+        return result
+
+    async def _acopy_points(
+        self,
+        source: str,
+        target: str,
+        sparse: bool,
+        page_size: int = QDRANT_SCROLL_PAGE_SIZE,
+    ) -> int:
+        count = 0
+        offset = None
+        while True:
+            points, offset = await self.async_client.scroll(
+                collection_name=source,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                await self._aupsert_batch(
+                    target,
+                    [
+                        PointStruct(
+                            id=point.id,
+                            vector=self._point_vector(
+                                self.dense_vector(point.vector),
+                                point.payload.get("page_content", ""),
+                                sparse,
+                            ),
+                            payload=point.payload,
+                        )
+                        for point in points
+                    ],
+                )
+                count += len(points)
+            if offset is None:
+                return count
+
+    async def amigrate_sparse_vectors(self, collection_name: str) -> int:
+        """
+        Add the sparse lexical index to a collection created before it.
+
+        Qdrant cannot add a sparse vector to an existing collection, so the
+        points are copied with their dense vectors to a staging collection,
+        and the collection is recreated from its index profile and refilled
+        from there, computing each sparse vector from the page content. No
+        document is regenerated or re-embedded. A migration interrupted after
+        the collection was deleted resumes from the staging collection.
+
+        Args:
+            collection_name (str): Collection to migrate.
+
+        Returns:
+            int: Number of points migrated, 0 if the collection already has the index.
+
+        Raises:
+            CollectionNotFoundError: if neither the collection nor its staging copy exists.
+        """
+        staging = f"{collection_name}{_MIGRATION_SUFFIX}"
+        if await self.acollection_exists(collection_name):
+            if await self.ahas_sparse_vectors(collection_name):
+                return 0
+            metadata = await self.aget_collection_metadata(collection_name)
+            if await self.acollection_exists(staging):
+                await self.adelete_collection(staging)
+            await self.async_client.create_collection(
+                collection_name=staging,
+                vectors_config=VectorParams(
+                    size=metadata.vector_size, distance=Distance(metadata.distance)
+                ),
+            )
+            self.metadata_cache.invalidate(staging)
+            await self._acopy_points(collection_name, staging, sparse=False)
+            await self.adelete_collection(collection_name)
+        elif not await self.acollection_exists(staging):
+            raise CollectionNotFoundError(collection_name)
+
+        backend_logger.info(f"Migrating {collection_name} to the sparse lexical index")
+        vector_size = (await self.aget_collection_metadata(staging)).vector_size
+        await self.acreate_collection(collection_name, vector_size)
+        count = await self._acopy_points(
+            staging,
+            collection_name,
+            sparse=await self.ahas_sparse_vectors(collection_name),
+        )
+        await self.adelete_collection(staging)
+        self._invalidate(collection_name)
+        backend_logger.info(f"Migrated {count} points in {collection_name}")
+        return count
+
+    def iter_points(
+        self,
+        collection_name: str,
+        with_payload: bool | list[str] = True,
+        page_size: int = QDRANT_SCROLL_PAGE_SIZE,
+        limit: int | None = None,
+    ) -> Iterator[Record]:
+        """Scroll the collection page by page, following `next_page_offset`."""
+        offset = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=page_size if remaining is None else min(page_size, remaining),
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False,
+            )
+            yield from points
+            if remaining is not None:
+                remaining -= len(points)
+            if offset is None:
+                break
+
+    @staticmethod
+    def _metadata_values(point: Record, keys: list[str]) -> dict[str, any]:
+        metadata = point.payload.get("metadata", {})
+        return {key: metadata.get(key) for key in keys}
+
+    def get_metadata_values(
+        self, collection_name: str, keys: list[str]
+    ) -> dict[str, dict[str, any]]:
+        """
+        Map every point ID to the values of `keys` in its metadata, fetched in
+        one scroll of only those payload keys.
+
+        Returns an empty dict if the collection does not exist. Keys missing
+        from a point map to None.
+        """
+        if not self.collection_exists(collection_name):
+            return {}
+        return {
+            str(point.id): self._metadata_values(point, keys)
+            for point in self.iter_points(
+                collection_name, with_payload=[f"metadata.{key}" for key in keys]
+            )
+        }
+
+    async def aget_metadata_values(
+        self,
+        collection_name: str,
+        keys: list[str],
+        page_size: int = QDRANT_SCROLL_PAGE_SIZE,
+    ) -> dict[str, dict[str, any]]:
+        if not await self.acollection_exists(collection_name):
+            return {}
+
+        values: dict[str, dict[str, any]] = {}
+        offset = None
+        while True:
+            points, offset = await self.async_client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=[f"metadata.{key}" for key in keys],
+                with_vectors=False,
+            )
+            for point in points:
+                values[str(point.id)] = self._metadata_values(point, keys)
+            if offset is None:
+                return values
+
+    def delete_points(self, collection_name: str, ids: list[str]):
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),
+        )
+        self._invalidate(collection_name)
+
+    async def adelete_points(self, collection_name: str, ids: list[str]):
+        await self.async_client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),
+        )
+        self._invalidate(collection_name)
+
+    async def aclose(self):
+        self.client.close()
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
 
 
 if __name__ == "__main__":
@@ -156,7 +1043,7 @@ if __name__ == "__main__":
              "dog", "cat", "bird", "fish", "horse", "rabbit", "snake", "tiger", "lion", "zebra",
              "sun", "moon", "star", "sky", "cloud", "rain", "snow", "wind", "fire", "water"]
     
-    embeddings = [NomicEmbedder().embed_text(t) for t in words]
+    embeddings = NomicEmbedder().embed_documents(words)
     ids = [generate_uuid(t) for t in words]
 
     vectorstore.upload_collection(
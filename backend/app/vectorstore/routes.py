@@ -1,10 +1,22 @@
-from app.config import QDRANT_URL, QDRANT_VECTOR_SIZE, backend_logger
-from app.embed.service import get_text_embeddings
+import json
+
+from app.config import QDRANT_SCROLL_PAGE_SIZE, QDRANT_VECTOR_SIZE, backend_logger
+from app.embed.service import aget_text_embeddings
 from app.exceptions.errors import CollectionNotFoundError
 from app.mssql.models import Table
-from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
-from app.vectorstore.service import get_all_records, get_vectorstore_info
+from app.vectorstore.models import SearchBatchRequest
+from app.vectorstore.service import (
+    aget_vectorstore_info,
+    get_all_records,
+    get_collection_cache_stats,
+    get_search_cache_stats,
+    get_vectorstore,
+    iter_records,
+    search_many,
+)
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from langchain_core.documents import Document
 
 router = APIRouter()
 
@@ -14,71 +26,143 @@ router = APIRouter()
     summary="Get vector store information",
     description="Retrieve comprehensive information about the vector store including collections, statistics, and configuration details.",
 )
-def get_info():
+async def get_info(
+    exact: bool = Query(
+        False, description="Count points exactly instead of approximately"
+    ),
+):
     """
     Get comprehensive information about the vector store.
 
     This endpoint provides detailed information about the current state of the vector store,
     including available collections, their sizes, configuration parameters, and health status.
+    Collections are queried concurrently and the result is cached for a few seconds.
+
+    Args:
+        exact (bool, optional): Count points exactly, slower on large collections.
+
+    Returns:
+        list: One entry per collection with:
+            - points: Point count, approximate unless `exact`
+            - status, segments and indexed_vectors
+            - estimated_ram_bytes and estimated_disk_bytes
+    """
+    return await aget_vectorstore_info(exact)
+
+
+@router.get("/cache-stats", summary="Get collection metadata cache statistics")
+def cache_stats() -> dict:
+    """
+    Report the size and hit/miss counters of the collection metadata cache.
+
+    Returns:
+        dict: Cached collections, hits, misses and hit rate
+    """
+    return get_collection_cache_stats()
+
+
+@router.get("/search-cache-stats", summary="Get search result cache statistics")
+def search_cache_stats() -> dict:
+    """
+    Report the size, hit/miss counters and collection generations of the search
+    result cache.
 
     Returns:
-        dict: A dictionary containing vector store information including:
-            - Available collections and their metadata
-            - Storage statistics and performance metrics
-            - Configuration details
-            - Connection status
+        dict: Cached searches, hits, misses, hit rate and generation per collection
     """
-    return get_vectorstore_info()
+    return get_search_cache_stats()
 
 
 @router.get(
     "/collection-ids",
-    response_model=list[dict],
-    summary="Get all document IDs from a vector collection",
-    description="Retrieve all document IDs and optionally their payload data from a specified vector store collection for inspection and debugging purposes.",
+    summary="Stream all document IDs from a vector collection",
+    description="Stream every document ID and optionally its payload data from a specified vector store collection as newline-delimited JSON, for inspection and export.",
+    responses={404: {"description": "Collection not found"}},
 )
-async def get_collection_ids(
+def get_collection_ids(
     table: Table = Query(..., description="Collection to retrieve IDs from"),
     with_payload: bool = Query(False, description="Include payload data for each ID"),
-) -> list[dict]:
+    payload_fields: list[str] | None = Query(
+        None, description="Only return these payload keys, e.g. metadata.source"
+    ),
+    page_size: int = Query(
+        QDRANT_SCROLL_PAGE_SIZE, ge=1, description="Points fetched per scroll request"
+    ),
+) -> StreamingResponse:
     """
-    Retrieve all document IDs (and optionally payloads) from a specified vector store collection.
+    Stream all document IDs (and optionally payloads) from a specified vector store collection.
 
-    This endpoint is primarily used for debugging, data inspection, and administrative tasks.
-    It allows you to examine what documents are stored in a collection and optionally
-    retrieve their content and metadata.
+    The collection is scrolled page by page and each record is written as one JSON
+    line (`application/x-ndjson`) as soon as its page arrives, so memory stays flat
+    regardless of collection size.
 
     Args:
-        collection (CollectionName): The name of the collection to query.
-            Must be one of the predefined collection names (products, employees, test, etc.)
+        table (Table): The collection to query.
         with_payload (bool, optional): Whether to include document content and metadata.
             - False (default): Returns only document IDs
-            - True: Returns IDs with full document content and metadata
+            - True: Returns IDs with document content and metadata
+        payload_fields (list[str], optional): Restrict the payload to these keys.
+        page_size (int, optional): Number of points fetched per scroll request.
 
     Returns:
-        list[dict]: A list of dictionaries.
+        StreamingResponse: One JSON object per line.
     """
-    backend_logger.info(f"Retrieving all IDs from collection: {table.value}")
+    backend_logger.info(f"Streaming all IDs from collection: {table.value}")
     try:
-        return get_all_records(
+        records = iter_records(
             collection_name=table.value,
             with_payload=with_payload,
+            payload_fields=payload_fields,
+            page_size=page_size,
         )
-    except Exception as e:
-        backend_logger.error(f"Error retrieving from collection '{table.value}':\n{e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    def lines():
+        count = 0
+        for record in records:
+            count += 1
+            yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        backend_logger.info(f"Streamed {count} records from '{table.value}'")
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/search-batch",
+    summary="Run many searches in one request",
+    description="Embed every query in a single batch and search each collection with one Qdrant request, returning the documents of each query in order.",
+)
+async def search_batch(request: SearchBatchRequest) -> list[list[Document]]:
+    """
+    Run several similarity searches, possibly against different collections.
+
+    Args:
+        request (SearchBatchRequest): The queries, each with its collection and k.
+
+    Returns:
+        list[list[Document]]: The documents found for each query, in request order.
+            A query against a missing collection returns an empty list.
+    """
+    backend_logger.info(f"Running batch of {len(request.queries)} searches")
+    return await search_many(
+        queries=[query.query for query in request.queries],
+        collections=[query.collection for query in request.queries],
+        k=[query.k for query in request.queries],
+        filters=[query.filters for query in request.queries],
+    )
 
 
 @router.get(
     "/delete-collection",
     responses={404: {"description": "Collection not found"}},
 )
-def delete_collection(
+async def delete_collection(
     collection: str = Query(..., description="The collection to delete"),
 ):
-    qdrant = MyQdrantVectorStore(url=QDRANT_URL)
+    qdrant = get_vectorstore()
     try:
-        result = qdrant.delete_collection(collection_name=collection)
+        result = await qdrant.adelete_collection(collection_name=collection)
         if result:
             return {"message": f"Collection '{collection}' deleted successfully"}
         else:
@@ -88,27 +172,31 @@ def delete_collection(
 
 
 @router.get("/test/inset")
-def test_inset(
+async def test_inset(
     text: str = Query(..., description="The text to insert"),
     collection: str = Query(
         default="test", description="The collection to insert into"
     ),
 ):
-    qdrant = MyQdrantVectorStore(url=QDRANT_URL)
-    qdrant.create_collection(collection_name=collection, vector_size=QDRANT_VECTOR_SIZE)
-    vector = get_text_embeddings(text)
-    return qdrant.upsert(collection_name=collection, vector=vector, page_content=text)
+    qdrant = get_vectorstore()
+    await qdrant.acreate_collection(
+        collection_name=collection, vector_size=QDRANT_VECTOR_SIZE
+    )
+    vector = await aget_text_embeddings(text)
+    return await qdrant.aupsert(
+        collection_name=collection, vector=vector, page_content=text
+    )
 
 
 @router.get("/test/search")
-def test_search(
+async def test_search(
     text: str = Query(..., description="The text to search for"),
     collection: str = Query(default="test", description="The collection to search in"),
 ):
-    qdrant = MyQdrantVectorStore(url=QDRANT_URL)
-    vector = get_text_embeddings(text)
+    qdrant = get_vectorstore()
+    vector = await aget_text_embeddings(text)
     try:
-        results = qdrant.search(collection_name=collection, vector=vector)
+        results = await qdrant.asearch(collection_name=collection, vector=vector)
         return results
     except CollectionNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
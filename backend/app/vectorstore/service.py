@@ -1,124 +1,533 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import Hashable, Iterator
 from functools import lru_cache
 
-from app.config import QDRANT_URL, QDRANT_VECTOR_SIZE, backend_logger
-from app.embed.clipembedder import get_clip_embedder
-from app.embed.service import get_image_uploadfile_embeddings
-from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
-from fastapi import HTTPException, UploadFile
+import numpy as np
+from app.config import (
+    QDRANT_INFO_TTL_SECONDS,
+    QDRANT_SCROLL_PAGE_SIZE,
+    QDRANT_URL,
+    QDRANT_VECTOR_SIZE,
+    VECTOR_RAG_K,
+    VECTOR_RAG_MIN_SCORE,
+    VECTOR_RAG_PER_COLLECTION,
+    VECTOR_SEARCH_HYBRID,
+    VECTORSTORE_BACKEND,
+    backend_logger,
+)
+from app.embed.cache import get_cached_clip_embedder
+from app.embed.service import (
+    aget_text_embeddings,
+    aget_texts_embeddings,
+    get_image_uploadfile_embeddings,
+)
+from app.exceptions.errors import CollectionNotFoundError
+from app.vectorstore.base import VectorStore
+from app.vectorstore.cache import get_collection_cache, get_search_cache
+from app.vectorstore.local_vectorstore import LocalVectorStore
+from app.vectorstore.models import MetadataFilter
+from app.vectorstore.qdrant_vectorstore import (
+    MyQdrantVectorStore,
+    create_async_qdrant_client,
+    create_qdrant_client,
+)
+from app.vectorstore.utils import build_filter
+from fastapi import UploadFile
 from langchain_core.documents import Document
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http.models import models
 
 
 @lru_cache(maxsize=1)
-def get_qdrant_client():
-    return QdrantClient(url=QDRANT_URL)
+def get_qdrant_client() -> QdrantClient:
+    return create_qdrant_client(QDRANT_URL)
 
 
-@lru_cache(maxsize=20)
-def get_qdrant_vector_store(collection_name: str):
-    try:
-        return QdrantVectorStore(
-            client=get_qdrant_client(),
-            collection_name=collection_name,
-            embedding=get_clip_embedder(),
-        )
-    except UnexpectedResponse as e:
-        raise HTTPException(status_code=e.status_code, detail=e.content.decode("utf-8"))
+@lru_cache(maxsize=1)
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    return create_async_qdrant_client(QDRANT_URL)
 
 
 @lru_cache(maxsize=1)
-def get_vectorstore():
-    return MyQdrantVectorStore(url=QDRANT_URL)
+def get_vectorstore() -> VectorStore:
+    if VECTORSTORE_BACKEND == "local":
+        return LocalVectorStore(search_cache=get_search_cache())
+    return MyQdrantVectorStore(
+        url=QDRANT_URL,
+        client=get_qdrant_client(),
+        async_client=get_async_qdrant_client(),
+        metadata_cache=get_collection_cache(),
+        search_cache=get_search_cache(),
+    )
 
 
-def get_vectorstore_info():
-    vectorstore = get_vectorstore()
-    return vectorstore.get_collection_info()
+async def close_qdrant_clients():
+    """Close the shared Qdrant clients, called when the app shuts down."""
+    if VECTORSTORE_BACKEND == "local" and get_vectorstore.cache_info().currsize:
+        await get_vectorstore().aclose()
+    if get_async_qdrant_client.cache_info().currsize:
+        await get_async_qdrant_client().close()
+    if get_qdrant_client.cache_info().currsize:
+        get_qdrant_client().close()
+    get_vectorstore.cache_clear()
+    get_async_qdrant_client.cache_clear()
+    get_qdrant_client.cache_clear()
+    get_collection_cache().invalidate()
+    get_search_cache().clear()
+    _info_cache.clear()
+
+
+def get_collection_cache_stats() -> dict[str, any]:
+    return get_collection_cache().stats()
+
+
+def get_search_cache_stats() -> dict[str, any]:
+    return get_search_cache().stats()
+
+
+def _filters_key(filters: list[MetadataFilter] | None) -> str | None:
+    if not filters:
+        return None
+    return json.dumps([f.model_dump() for f in filters], sort_keys=True, default=str)
+
+
+def _text_key(
+    query: str, k: int, filters: list[MetadataFilter] | None, hybrid: bool
+) -> Hashable:
+    # CLIP's tokenizer and the sparse index both lowercase and split on whitespace
+    return ("text", " ".join(query.lower().split()), k, _filters_key(filters), hybrid)
+
 
+def _vector_key(
+    embedding: list[float],
+    limit: int,
+    filters: list[MetadataFilter] | None,
+    text: str | None,
+) -> Hashable:
+    digest = hashlib.sha256(np.asarray(embedding, dtype=np.float32).tobytes())
+    return ("vector", digest.hexdigest(), limit, _filters_key(filters), text)
 
-def search(query: str, collection: str) -> list[Document]:
-    vector_store = get_qdrant_vector_store(collection)
-    return vector_store.similarity_search(query=query, k=4, filter=None)
+
+_info_cache: dict[bool, tuple[float, list[dict[str, dict[str, any]]]]] = {}
+_info_lock = asyncio.Lock()
+
+
+async def aget_vectorstore_info(
+    exact: bool = False,
+) -> list[dict[str, dict[str, any]]]:
+    """
+    Collection statistics, fetched concurrently and cached for
+    QDRANT_INFO_TTL_SECONDS since dashboards poll them. Concurrent requests
+    share a single refresh.
+    """
+    async with _info_lock:
+        entry = _info_cache.get(exact)
+        if entry is None or time.monotonic() - entry[0] >= QDRANT_INFO_TTL_SECONDS:
+            info = await get_vectorstore().aget_collection_info(exact)
+            entry = (time.monotonic(), info)
+            _info_cache[exact] = entry
+        return entry[1]
+
+
+def search(
+    query: str,
+    collection: str,
+    filters: list[MetadataFilter] | None = None,
+    hybrid: bool = VECTOR_SEARCH_HYBRID,
+) -> list[Document]:
+    """
+    Search a collection for the query text.
+
+    With `hybrid`, the CLIP vector and the sparse lexical index retrieve
+    candidates in one request and their rankings are fused with RRF, so exact
+    names and identifiers are found even where CLIP misses them. Collections
+    without the sparse index fall back to dense search.
+
+    Results are cached per normalized query text until the collection is next
+    written to, so repeated questions skip both CLIP and the vector store.
+    """
+    cache = get_search_cache()
+    key = _text_key(query, 4, filters, hybrid)
+    generation = cache.generation(collection)
+    documents = cache.get(collection, key)
+    if documents is not None:
+        return documents
+
+    embedding = get_cached_clip_embedder().embed_query(query)
+    documents = embedding_search(
+        embedding,
+        collection,
+        limit=4,
+        filters=filters,
+        text=query if hybrid else None,
+        use_cache=False,
+    )
+    cache.put(collection, key, documents, generation)
+    return documents
+
+
+async def asearch(
+    query: str,
+    collection: str,
+    k: int = 4,
+    filters: list[MetadataFilter] | None = None,
+    hybrid: bool = VECTOR_SEARCH_HYBRID,
+) -> list[Document]:
+    """
+    Like `search`, but the query embedding goes through the batching queue and
+    the Qdrant round-trip runs on the shared async client.
+    """
+    cache = get_search_cache()
+    key = _text_key(query, k, filters, hybrid)
+    generation = cache.generation(collection)
+    documents = cache.get(collection, key)
+    if documents is not None:
+        return documents
+
+    embedding = await aget_text_embeddings(query)
+    documents = await aembedding_search(
+        embedding,
+        collection,
+        limit=k,
+        filters=filters,
+        text=query if hybrid else None,
+        use_cache=False,
+    )
+    cache.put(collection, key, documents, generation)
+    return documents
 
 
 async def search_image(file: UploadFile, collection: str) -> list[Document]:
-    qdrant = get_qdrant_client()
-    if not qdrant.collection_exists(collection):
+    if not await get_vectorstore().acollection_exists(collection):
         backend_logger.error(f"Collection '{collection}' does not exist.")
         return []
     backend_logger.info(f"Searching for image in collection: '{collection}'")
 
     image_embedding = await get_image_uploadfile_embeddings(file)
-    results: list[Document] = embedding_search(image_embedding, collection)
+    results: list[Document] = await aembedding_search(image_embedding, collection)
     return results
 
 
+def _to_documents(points: list[models.ScoredPoint]) -> list[Document]:
+    return [
+        Document(
+            page_content=point.payload.get("page_content", ""),
+            metadata=point.payload.get("metadata", {}),
+        )
+        for point in points
+    ]
+
+
 def embedding_search(
-    embedding: list, collection: str, limit: int = 1
+    embedding: list,
+    collection: str,
+    limit: int = 1,
+    filters: list[MetadataFilter] | None = None,
+    text: str | None = None,
+    use_cache: bool = True,
 ) -> list[Document]:
+    """
+    Search with a query vector, hybrid with the query `text` when it is given.
+    Results are cached by a hash of the vector unless `use_cache` is off.
+    """
+    cache = get_search_cache()
+    key = _vector_key(embedding, limit, filters, text)
+    generation = cache.generation(collection)
+    if use_cache:
+        documents = cache.get(collection, key)
+        if documents is not None:
+            return documents
+
     backend_logger.trace(f"Searching for embedding in collection: '{collection}'")
-    qdrant = get_qdrant_client()
-    points = qdrant.search(
-        collection_name=collection,
-        query_vector=embedding,
-        limit=limit,
-        with_payload=True,
+    vectorstore = get_vectorstore()
+    if text:
+        points = vectorstore.search_hybrid(
+            collection_name=collection,
+            vector=embedding,
+            text=text,
+            limit=limit,
+            query_filter=build_filter(filters),
+        )
+    else:
+        points = vectorstore.search(
+            collection_name=collection,
+            vector=embedding,
+            limit=limit,
+            query_filter=build_filter(filters),
+        )
+    documents = _to_documents(points)
+    backend_logger.trace(f"Documents: {documents}")
+    if use_cache:
+        cache.put(collection, key, documents, generation)
+    return documents
+
+
+async def aembedding_search(
+    embedding: list,
+    collection: str,
+    limit: int = 1,
+    filters: list[MetadataFilter] | None = None,
+    text: str | None = None,
+    use_cache: bool = True,
+) -> list[Document]:
+    """Async `embedding_search`, on the shared async client for Qdrant."""
+    cache = get_search_cache()
+    key = _vector_key(embedding, limit, filters, text)
+    generation = cache.generation(collection)
+    if use_cache:
+        documents = cache.get(collection, key)
+        if documents is not None:
+            return documents
+
+    backend_logger.trace(f"Searching for embedding in collection: '{collection}'")
+    vectorstore = get_vectorstore()
+    if text:
+        points = await vectorstore.asearch_hybrid(
+            collection_name=collection,
+            vector=embedding,
+            text=text,
+            limit=limit,
+            query_filter=build_filter(filters),
+        )
+    else:
+        points = await vectorstore.asearch(
+            collection_name=collection,
+            vector=embedding,
+            limit=limit,
+            query_filter=build_filter(filters),
+        )
+    documents = _to_documents(points)
+    backend_logger.trace(f"Documents: {documents}")
+    if use_cache:
+        cache.put(collection, key, documents, generation)
+    return documents
+
+
+async def _search_points_many(
+    embeddings: list[list[float]],
+    collections: list[str],
+    limits: list[int],
+    filters: list[list[MetadataFilter] | None] | None = None,
+    texts: list[str] | None = None,
+) -> list[list[models.ScoredPoint]]:
+    groups: dict[str, list[int]] = {}
+    for index, collection in enumerate(collections):
+        groups.setdefault(collection, []).append(index)
+
+    vectorstore = get_vectorstore()
+    filters = filters if filters else [None] * len(embeddings)
+    results: list[list[models.ScoredPoint]] = [[] for _ in embeddings]
+
+    async def search_collection(collection: str, indices: list[int]):
+        if not await vectorstore.acollection_exists(collection):
+            backend_logger.error(f"Collection '{collection}' does not exist.")
+            return
+        responses = await vectorstore.asearch_batch(
+            collection_name=collection,
+            vectors=[embeddings[index] for index in indices],
+            limits=[limits[index] for index in indices],
+            query_filters=[build_filter(filters[index]) for index in indices],
+            texts=[texts[index] for index in indices] if texts else None,
+        )
+        for index, points in zip(indices, responses):
+            results[index] = points
+
+    backend_logger.trace(
+        f"Searching {len(embeddings)} queries in {len(groups)} collections"
     )
-    documents = []
-    for point in points:
+    await asyncio.gather(
+        *(
+            search_collection(collection, indices)
+            for collection, indices in groups.items()
+        )
+    )
+    return results
+
+
+async def embedding_search_many(
+    embeddings: list[list[float]],
+    collections: list[str],
+    limits: list[int],
+    filters: list[list[MetadataFilter] | None] | None = None,
+    texts: list[str] | None = None,
+) -> list[list[Document]]:
+    """
+    Run many vector searches with one vector store request per collection.
+
+    Queries are grouped by collection and each group is sent as a single
+    `asearch_batch` call (`query_batch_points` on Qdrant); the groups run
+    concurrently.
+
+    Args:
+        embeddings (list[list[float]]): One query vector per search.
+        collections (list[str]): Collection of each search.
+        limits (list[int]): Number of documents to return for each search.
+        filters (list[list[MetadataFilter] | None] | None): Metadata conditions
+            for each search.
+        texts (list[str] | None): Query text of each search, makes the searches
+            hybrid where the collection has the sparse lexical index.
+
+    Returns:
+        list[list[Document]]: Documents per search, in input order. Searches
+            against a collection that does not exist return an empty list.
+    """
+    results = await _search_points_many(embeddings, collections, limits, filters, texts)
+    return [_to_documents(points) for points in results]
+
+
+async def search_many(
+    queries: list[str],
+    collections: list[str],
+    k: int | list[int] = 4,
+    filters: list[list[MetadataFilter] | None] | None = None,
+    hybrid: bool = VECTOR_SEARCH_HYBRID,
+) -> list[list[Document]]:
+    """Embed all queries in one batch, then search them with `embedding_search_many`."""
+    limits = k if isinstance(k, list) else [k] * len(queries)
+    embeddings = await aget_texts_embeddings(queries)
+    return await embedding_search_many(
+        embeddings, collections, limits, filters, queries if hybrid else None
+    )
+
+
+async def asearch_fanout(
+    query: str,
+    collections: list[str],
+    k: int = VECTOR_RAG_K,
+    per_collection: int = VECTOR_RAG_PER_COLLECTION,
+    filters: list[MetadataFilter] | None = None,
+    min_score: float = VECTOR_RAG_MIN_SCORE,
+) -> list[Document]:
+    """
+    Search every collection with one query embedding and merge the results.
+
+    The query is embedded once and all collections are searched concurrently.
+    Every collection is scored against the same vector in the same embedding
+    space, so the best documents overall are taken by cosine similarity, at
+    most `per_collection` from any one collection.
+
+    Args:
+        query (str): The query text.
+        collections (list[str]): Collections to search, missing ones are skipped.
+        k (int): Total number of documents to return.
+        per_collection (int): Maximum number of documents from one collection.
+        filters (list[MetadataFilter] | None): Metadata conditions applied in
+            every collection.
+        min_score (float): Drop documents scoring below this similarity.
+
+    Returns:
+        list[Document]: Documents by descending score, with the collection and
+            score added to their metadata.
+    """
+    embedding = await aget_text_embeddings(query)
+    # Dense only: RRF scores depend on rank alone, so they cannot be compared
+    # across collections. No collection contributes more than its quota
+    candidates = min(k, per_collection)
+    results = await _search_points_many(
+        [embedding] * len(collections),
+        collections,
+        [candidates] * len(collections),
+        [filters] * len(collections),
+    )
+
+    ranked = [
+        (point.score, collection, point)
+        for collection, points in zip(collections, results)
+        for point in points
+        if point.score >= min_score
+    ]
+    ranked.sort(key=lambda entry: entry[0], reverse=True)
+
+    documents: list[Document] = []
+    taken: dict[str, int] = {}
+    for score, collection, point in ranked:
+        if len(documents) >= k:
+            break
+        if taken.get(collection, 0) >= per_collection:
+            continue
+        taken[collection] = taken.get(collection, 0) + 1
         documents.append(
             Document(
                 page_content=point.payload.get("page_content", ""),
-                metadata=point.payload.get("metadata", {}),
+                metadata={
+                    **point.payload.get("metadata", {}),
+                    "collection": collection,
+                    "score": score,
+                },
             )
         )
-    backend_logger.trace(f"Documents: {documents}")
+    backend_logger.trace(f"Fan-out documents per collection: {taken}")
     return documents
 
 
 def _create_collection(collection_name: str):
-    qdrant = get_qdrant_client()
-    if not qdrant.collection_exists(collection_name):
-        qdrant.create_collection(
-            collection_name=collection_name,
-            vectors_config=models.VectorParams(
-                size=QDRANT_VECTOR_SIZE, distance=models.Distance.COSINE
-            ),
-        )
+    vectorstore = get_vectorstore()
+    if not vectorstore.collection_exists(collection_name):
+        # Applies the collection's index profile and payload indexes
+        vectorstore.create_collection(collection_name, QDRANT_VECTOR_SIZE)
         backend_logger.info(f"Collection '{collection_name}' created successfully.")
     else:
         backend_logger.info(f"Collection '{collection_name}' already exists.")
 
 
+def iter_records(
+    collection_name: str,
+    with_payload: bool = True,
+    payload_fields: list[str] | None = None,
+    page_size: int = QDRANT_SCROLL_PAGE_SIZE,
+    limit: int | None = None,
+) -> Iterator[dict[str, any]]:
+    """
+    Iterate over the points of a collection page by page.
+
+    Follows the vector store's pagination until the collection is exhausted or
+    `limit` records have been produced, holding only one page in memory.
+
+    Args:
+        collection_name (str): Collection to read.
+        with_payload (bool): Include page content and metadata for each record.
+        payload_fields (list[str] | None): Only fetch these payload keys
+            (e.g. "metadata.source"). Implies `with_payload`.
+        page_size (int): Points fetched per scroll request.
+        limit (int | None): Stop after this many records.
+
+    Raises:
+        CollectionNotFoundError: if the collection does not exist. This is checked
+            eagerly, before the first record is requested.
+    """
+    vectorstore = get_vectorstore()
+    if not vectorstore.collection_exists(collection_name):
+        raise CollectionNotFoundError(collection_name)
+
+    if payload_fields:
+        with_payload = True
+    selector = payload_fields if payload_fields else with_payload
+
+    def records() -> Iterator[dict[str, any]]:
+        for point in vectorstore.iter_points(
+            collection_name, with_payload=selector, page_size=page_size, limit=limit
+        ):
+            entry = {"id": str(point.id)}
+            if with_payload:
+                entry["page_content"] = point.payload.get("page_content", "")
+                entry["metadata"] = point.payload.get("metadata", {})
+            yield entry
+
+    return records()
+
+
 def get_all_records(
     collection_name: str, with_payload: bool = True, limit: int = 10000
 ) -> list[dict[str, any]]:
-    all_records = []
-    qdrant = QdrantClient(url=QDRANT_URL)
-    if not qdrant.collection_exists(collection_name):
-        raise ValueError(f"Collection '{collection_name}' does not exist.")
-
-    scroll_result = qdrant.scroll(
-        collection_name=collection_name, with_payload=with_payload
+    all_records = list(
+        iter_records(collection_name, with_payload=with_payload, limit=limit)
     )
-
-    records = scroll_result[0]
-    if not records:
+    if not all_records:
         raise ValueError(f"No records found in collection '{collection_name}'.")
 
-    for record in records:
-        if with_payload:
-            entry = {
-                "page_content": record.payload.get("page_content", ""),
-                "metadata": record.payload.get("metadata", {}),
-            }
-        else:
-            entry = {"id": str(record.id)}
-        all_records.append(entry)
-
     backend_logger.info(f"#Records: {len(all_records)}.")
     return all_records
 
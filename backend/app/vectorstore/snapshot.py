@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import time
+from collections.abc import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.config import (
+    QDRANT_SCROLL_PAGE_SIZE,
+    QDRANT_URL,
+    SNAPSHOT_DIR,
+    SNAPSHOT_UPLOAD_BATCH_SIZE,
+    SNAPSHOT_UPLOAD_PARALLEL,
+    backend_logger,
+)
+from app.exceptions.errors import CollectionNotFoundError
+from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
+
+_MANIFEST = "manifest.json"
+_VECTORS = "vectors.npy"
+_PARQUET_PAYLOADS = "payloads.parquet"
+_PAYLOAD_SCHEMA = pa.schema([("id", pa.string()), ("payload", pa.string())])
+
+
+def export_collection(
+    store: MyQdrantVectorStore,
+    collection_name: str,
+    directory: str = SNAPSHOT_DIR,
+    page_size: int = QDRANT_SCROLL_PAGE_SIZE,
+) -> str:
+    """
+    Write a collection's IDs, dense vectors and payloads to local files.
+
+    The vectors go to one float32 `.npy` matrix, sized from an exact point count
+    and filled through a memory map, the IDs and payloads to a Parquet file with
+    JSON-encoded columns, one row group per scroll page. Only one page is held
+    in memory. Sparse vectors are not written, the restore recomputes them from
+    each point's page content.
+
+    Args:
+        store (MyQdrantVectorStore): Store to read from.
+        collection_name (str): Collection to export.
+        directory (str): Snapshots root, the collection gets a subdirectory.
+        page_size (int): Points fetched per scroll request.
+
+    Returns:
+        str: Directory the snapshot was written to.
+
+    Raises:
+        CollectionNotFoundError: if the collection does not exist.
+        RuntimeError: if points were added or deleted during the export.
+    """
+    metadata = store.get_collection_metadata(collection_name)
+    if not metadata.exists:
+        raise CollectionNotFoundError(collection_name)
+
+    path = os.path.join(directory, collection_name)
+    os.makedirs(path, exist_ok=True)
+    backend_logger.info(f"Exporting {collection_name} to {path}")
+
+    count = store.client.count(collection_name=collection_name, exact=True).count
+    vectors = np.lib.format.open_memmap(
+        os.path.join(path, _VECTORS),
+        mode="w+",
+        dtype=np.float32,
+        shape=(count, metadata.vector_size),
+    )
+    written = 0
+    with pq.ParquetWriter(
+        os.path.join(path, _PARQUET_PAYLOADS), _PAYLOAD_SCHEMA
+    ) as writer:
+        offset = None
+        while True:
+            points, offset = store.client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if written + len(points) > count:
+                raise RuntimeError(f"{collection_name} grew during the export")
+            if points:
+                vectors[written : written + len(points)] = [
+                    store.dense_vector(point.vector) for point in points
+                ]
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            [json.dumps(point.id) for point in points],
+                            [
+                                json.dumps(point.payload, default=str)
+                                for point in points
+                            ],
+                        ],
+                        schema=_PAYLOAD_SCHEMA,
+                    )
+                )
+                written += len(points)
+            if offset is None:
+                break
+    vectors.flush()
+    del vectors
+    if written != count:
+        raise RuntimeError(f"{collection_name} shrank during the export")
+
+    with open(os.path.join(path, _MANIFEST), "w") as f:
+        json.dump(
+            {
+                "collection": collection_name,
+                "vector_size": metadata.vector_size,
+                "distance": metadata.distance,
+                "points": count,
+                "payloads": _PARQUET_PAYLOADS,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            f,
+            indent=2,
+        )
+    backend_logger.info(f"Exported {count} points from {collection_name}")
+    return path
+
+
+def _read_payloads(path: str, batch_size: int) -> Iterator[tuple[any, dict]]:
+    for batch in pq.ParquetFile(os.path.join(path, _PARQUET_PAYLOADS)).iter_batches(
+        batch_size=batch_size
+    ):
+        for id, payload in zip(
+            batch.column("id").to_pylist(), batch.column("payload").to_pylist()
+        ):
+            yield json.loads(id), json.loads(payload)
+
+
+def import_collection(
+    store: MyQdrantVectorStore,
+    path: str,
+    collection_name: str | None = None,
+    batch_size: int = SNAPSHOT_UPLOAD_BATCH_SIZE,
+    parallel: int = SNAPSHOT_UPLOAD_PARALLEL,
+    recreate: bool = False,
+) -> int:
+    """
+    Bulk-load a snapshot written by `export_collection`.
+
+    The collection is created with its index profile and payload indexes as
+    usual. Points are streamed from the memory-mapped vector matrix and the
+    payload file a batch at a time, and sent in batches of `batch_size` by
+    `parallel` upload workers. Existing points with the same IDs are
+    overwritten, so an interrupted restore can be rerun.
+
+    Args:
+        store (MyQdrantVectorStore): Store to write to.
+        path (str): Snapshot directory of one collection.
+        collection_name (str | None): Target collection, defaults to the
+            exported collection's name.
+        batch_size (int): Points per upsert request.
+        parallel (int): Concurrent upload workers.
+        recreate (bool): Delete the target collection first.
+
+    Returns:
+        int: Number of points restored.
+
+    Raises:
+        ValueError: if the snapshot's vectors and payloads do not line up.
+    """
+    with open(os.path.join(path, _MANIFEST)) as f:
+        manifest = json.load(f)
+    collection_name = collection_name if collection_name else manifest["collection"]
+
+    vectors = np.load(os.path.join(path, _VECTORS), mmap_mode="r")
+    if len(vectors) != manifest["points"]:
+        raise ValueError(
+            f"Snapshot {path} has {len(vectors)} vectors but lists {manifest['points']} points"
+        )
+
+    if recreate and store.collection_exists(collection_name):
+        store.delete_collection(collection_name)
+    store.create_collection(collection_name, manifest["vector_size"])
+
+    restored = 0
+
+    def points() -> Iterator[tuple[any, list[float], dict]]:
+        nonlocal restored
+        for vector, (id, payload) in zip(
+            vectors, _read_payloads(path, batch_size), strict=True
+        ):
+            restored += 1
+            yield id, vector.tolist(), payload
+
+    backend_logger.info(f"Restoring {len(vectors)} points into {collection_name}")
+    try:
+        store.upload_points(collection_name, points(), batch_size, parallel)
+    except ValueError as e:
+        raise ValueError(f"Snapshot {path} vectors and payloads differ: {e}") from e
+    return restored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collection snapshots")
+    parser.add_argument("--url", default=QDRANT_URL)
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshots root")
+    parser.add_argument(
+        "--collections", nargs="+", help="Collections to process, default all"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("export", help="Write collections to local files")
+
+    import_parser = subparsers.add_parser(
+        "import", help="Restore collections from local files"
+    )
+    import_parser.add_argument(
+        "--batch-size", type=int, default=SNAPSHOT_UPLOAD_BATCH_SIZE
+    )
+    import_parser.add_argument("--parallel", type=int, default=SNAPSHOT_UPLOAD_PARALLEL)
+    import_parser.add_argument(
+        "--recreate", action="store_true", help="Delete the collections first"
+    )
+
+    args = parser.parse_args()
+    store = MyQdrantVectorStore(url=args.url)
+    try:
+        if args.command == "export":
+            collections = (
+                args.collections if args.collections else store.get_collections()
+            )
+            for collection in collections:
+                start = time.perf_counter()
+                export_collection(store, collection, args.dir)
+                print(f"{collection}: exported in {time.perf_counter() - start:.2f}s")
+        elif args.command == "import":
+            collections = (
+                args.collections
+                if args.collections
+                else sorted(
+                    name
+                    for name in os.listdir(args.dir)
+                    if os.path.isfile(os.path.join(args.dir, name, _MANIFEST))
+                )
+            )
+            for collection in collections:
+                start = time.perf_counter()
+                count = import_collection(
+                    store,
+                    os.path.join(args.dir, collection),
+                    batch_size=args.batch_size,
+                    parallel=args.parallel,
+                    recreate=args.recreate,
+                )
+                print(
+                    f"{collection}: restored {count} points in "
+                    f"{time.perf_counter() - start:.2f}s"
+                )
+    finally:
+        store.client.close()
+
+
+# uv run python -m app.vectorstore.snapshot export
+# uv run python -m app.vectorstore.snapshot import --parallel 4 --recreate
+if __name__ == "__main__":
+    main()
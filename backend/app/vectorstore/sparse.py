@@ -0,0 +1,45 @@
+import re
+import zlib
+from collections import Counter
+
+from qdrant_client import models
+
+# Name of the lexical sparse vector next to the unnamed CLIP vector
+SPARSE_VECTOR_NAME = "bm25"
+
+# Terms are hashed into 2^20 dimensions, collisions are rare at table vocabulary sizes
+_DIMENSIONS = 1 << 20
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# BM25 term frequency saturation and length normalization. The IDF half of BM25
+# is applied by Qdrant at query time (Modifier.IDF), so it follows the collection
+_K1 = 1.2
+_B = 0.75
+# Typical length in tokens of a generated row document
+_AVG_DOCUMENT_LENGTH = 64
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _term_index(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & (_DIMENSIONS - 1)
+
+
+def document_sparse_vector(text: str) -> models.SparseVector:
+    """BM25-weighted term frequencies of a document, keyed by hashed term."""
+    tokens = tokenize(text)
+    counts = Counter(_term_index(token) for token in tokens)
+    norm = _K1 * (1 - _B + _B * len(tokens) / _AVG_DOCUMENT_LENGTH)
+    indices = sorted(counts)
+    return models.SparseVector(
+        indices=indices,
+        values=[counts[i] * (_K1 + 1) / (counts[i] + norm) for i in indices],
+    )
+
+
+def query_sparse_vector(text: str) -> models.SparseVector:
+    """Each distinct query term once, Qdrant weighs them by IDF."""
+    indices = sorted({_term_index(token) for token in tokenize(text)})
+    return models.SparseVector(indices=indices, values=[1.0] * len(indices))
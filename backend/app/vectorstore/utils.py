@@ -1,5 +1,9 @@
 import re
 import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+
+from app.vectorstore.models import MetadataFilter
+from qdrant_client import models
 
 
 def generate_uuid(id: str) -> str:
@@ -18,3 +22,60 @@ def extract_file_info(filename: str) -> tuple[str, str, str] | None:
         collection_name, id_, date, time = match.groups()
         return f"{collection_name}_{id_}", date, time
     return None
+
+
+def dense_vector_params(info: models.CollectionInfo) -> models.VectorParams | None:
+    """Parameters of the collection's unnamed vector, or of its first named one."""
+    vectors = info.config.params.vectors
+    if isinstance(vectors, dict):
+        vectors = vectors.get("", next(iter(vectors.values()), None))
+    return vectors
+
+
+def _is_number(value: float | str | None) -> bool:
+    return value is None or isinstance(value, (int, float))
+
+
+def build_filter(filters: list[MetadataFilter] | None) -> models.Filter | None:
+    """Turn metadata conditions into a Qdrant filter that all of them must satisfy."""
+    if not filters:
+        return None
+
+    conditions = []
+    for condition in filters:
+        key = f"metadata.{condition.key}"
+        if condition.match is not None:
+            match = (
+                models.MatchAny(any=condition.match)
+                if isinstance(condition.match, list)
+                else models.MatchValue(value=condition.match)
+            )
+            conditions.append(models.FieldCondition(key=key, match=match))
+        if condition.gte is not None or condition.lte is not None:
+            if _is_number(condition.gte) and _is_number(condition.lte):
+                range = models.Range(gte=condition.gte, lte=condition.lte)
+            else:
+                range = models.DatetimeRange(gte=condition.gte, lte=condition.lte)
+            conditions.append(models.FieldCondition(key=key, range=range))
+    return models.Filter(must=conditions)
+
+
+async def abatched[T](
+    items: Iterable[T] | AsyncIterable[T], size: int
+) -> AsyncIterator[list[T]]:
+    """Group a sync or async iterable into lists of `size`, the last may be shorter."""
+    batch: list[T] = []
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    else:
+        for item in items:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
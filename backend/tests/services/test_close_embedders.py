@@ -0,0 +1,36 @@
+import pytest
+
+from app.embed import executor as executor_module
+from app.embed import service
+from app.embed.batcher import get_text_batcher
+from app.embed.executor import InferenceExecutor, get_inference_executor
+from app.embed.nomic_embedder import get_nomic_embedder
+
+
+@pytest.mark.asyncio
+async def test_close_embedders_closes_the_nomic_client(monkeypatch):
+    monkeypatch.setattr(
+        executor_module,
+        "InferenceExecutor",
+        lambda: InferenceExecutor(torch_threads=0, torch_interop_threads=0),
+    )
+    embedder = get_nomic_embedder()
+    client = embedder._get_async_client()
+    executor = get_inference_executor()
+    get_text_batcher()
+
+    await service.close_embedders()
+
+    assert client.is_closed
+    assert embedder._async_client is None
+    assert executor._pool._shutdown
+    assert get_nomic_embedder.cache_info().currsize == 0
+    assert get_inference_executor.cache_info().currsize == 0
+    assert get_text_batcher.cache_info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_close_embedders_without_any_created():
+    await service.close_embedders()
+
+    assert get_nomic_embedder.cache_info().currsize == 0
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.embed.utils import decode_image, sniff_image_format
+from app.exceptions.errors import InvalidImageError
+
+
+def _encode(format: str, size: tuple[int, int] = (640, 480)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("format", ["JPEG", "PNG", "GIF", "BMP", "WEBP"])
+def test_sniff_image_format(format):
+    assert sniff_image_format(_encode(format)) == format
+
+
+def test_decode_jpeg_reduces_to_target_size():
+    image = decode_image(_encode("JPEG"), target_size=224)
+
+    assert image.mode == "RGB"
+    assert min(image.size) >= 224
+    assert min(image.size) < 480
+
+
+def test_decode_small_image_keeps_size():
+    image = decode_image(_encode("PNG", (100, 80)), target_size=224)
+
+    assert image.size == (100, 80)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"not an image",
+        _encode("JPEG")[:200],
+        _encode("PNG")[:60],
+        b"\xff\xd8\xff" + b"\x00" * 64,
+    ],
+    ids=["unknown", "truncated-jpeg", "truncated-png", "bad-header"],
+)
+def test_decode_invalid_image(data):
+    with pytest.raises(InvalidImageError):
+        decode_image(data)
+
+
+def test_decode_too_many_pixels():
+    with pytest.raises(InvalidImageError):
+        decode_image(_encode("PNG", (300, 300)), max_pixels=300 * 299)
+
+
+def test_decode_decompression_bomb(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    with pytest.raises(InvalidImageError):
+        decode_image(_encode("PNG", (300, 300)), max_pixels=10**9)
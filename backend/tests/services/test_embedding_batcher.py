@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.embed import batcher as batcher_module
+from app.embed.batcher import EmbeddingBatcher
+
+
+class FakeExecutor:
+    async def run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+
+class Encoder:
+    def __init__(self, error: Exception | None = None):
+        self.batches: list[list[str]] = []
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, items: list[str]) -> list[list[float]]:
+        self.batches.append(items)
+        self.release.wait()
+        if self.error:
+            raise self.error
+        return [[float(len(item))] for item in items]
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    monkeypatch.setattr(batcher_module, "get_inference_executor", FakeExecutor)
+
+
+async def _submit_all(batcher: EmbeddingBatcher, items: list[str]) -> list:
+    return await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(item) for item in items)), timeout=5
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_without_waiting():
+    encoder = Encoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=3, max_wait_ms=60_000)
+
+    results = await _submit_all(batcher, ["a", "bb", "ccc"])
+
+    assert results == [[1.0], [2.0], [3.0]]
+    assert encoder.batches == [["a", "bb", "ccc"]]
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_runs_after_max_wait():
+    encoder = Encoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=100, max_wait_ms=50)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    results = await _submit_all(batcher, ["a", "bb"])
+
+    assert results == [[1.0], [2.0]]
+    assert encoder.batches == [["a", "bb"]]
+    assert loop.time() - start >= 0.04
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_split_by_max_batch_size():
+    encoder = Encoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=2, max_wait_ms=20)
+
+    results = await _submit_all(batcher, ["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert results == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert [len(batch) for batch in encoder.batches] == [2, 2, 1]
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_waiter():
+    encoder = Encoder(error=RuntimeError("CUDA out of memory"))
+    batcher = EmbeddingBatcher(encoder, max_batch_size=3, max_wait_ms=20)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *(batcher.submit(item) for item in ["a", "bb", "ccc"]),
+            return_exceptions=True,
+        ),
+        timeout=5,
+    )
+
+    assert [str(result) for result in results] == ["CUDA out of memory"] * 3
+    # The worker survives a failed batch
+    encoder.error = None
+    assert await _submit_all(batcher, ["a"]) == [[1.0]]
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_running_and_queued_requests():
+    encoder = Encoder()
+    encoder.release.clear()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=2, max_wait_ms=0)
+    requests = [
+        asyncio.create_task(batcher.submit(item)) for item in ["a", "bb", "ccc"]
+    ]
+    while not encoder.batches:
+        await asyncio.sleep(0.01)
+
+    await batcher.aclose()
+    encoder.release.set()
+
+    results = await asyncio.gather(*requests, return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    # A request after closing starts a new worker
+    assert await _submit_all(batcher, ["a"]) == [[1.0]]
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_close_without_requests():
+    await EmbeddingBatcher(Encoder()).aclose()
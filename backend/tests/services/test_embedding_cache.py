@@ -0,0 +1,64 @@
+from app.embed import cache as cache_module
+from app.embed.cache import EmbeddingCache
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = EmbeddingCache("model", max_entries=2, path=None)
+    cache.put_many(["a", "b"], [[1.0], [2.0]])
+    # Touching "a" makes "b" the least recently used entry
+    cache.get_many(["a"])
+    cache.put_many(["c"], [[3.0]])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_keys_depend_on_model():
+    assert EmbeddingCache("a", path=None).key("text") != EmbeddingCache(
+        "b", path=None
+    ).key("text")
+
+
+def test_hit_and_miss_counters():
+    cache = EmbeddingCache("model", max_entries=10, path=None)
+    cache.put_many(["a"], [[1.0]])
+
+    cache.get_many(["a", "b"])
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingCache("model", max_entries=10, path=path).put_many(["a"], [[1.0, 2.0]])
+
+    cache = EmbeddingCache("model", max_entries=10, path=path)
+
+    assert cache.get_many(["a"]) == [[1.0, 2.0]]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_evicts_least_recently_accessed(tmp_path, monkeypatch):
+    clock = iter(range(1000))
+    monkeypatch.setattr(cache_module.time, "time", lambda: next(clock))
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache("model", max_entries=1, path=path, max_disk_entries=10)
+
+    for i in range(10):
+        cache.put_many([f"text-{i}"], [[float(i)]])
+    # Reading text-0 from disk refreshes its access time
+    cache.get_many(["text-0"])
+    cache.put_many(["text-10"], [[10.0]])
+
+    # 11 entries exceed the limit of 10, so the 2 oldest are evicted
+    assert cache.stats()["disk_entries"] == 9
+    reopened = EmbeddingCache("model", max_entries=20, path=path)
+    assert reopened.get_many(["text-0", "text-1", "text-2", "text-3"]) == [
+        [0.0],
+        None,
+        None,
+        [3.0],
+    ]
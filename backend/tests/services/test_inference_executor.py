@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.embed.executor import InferenceExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(
+        max_workers=1, torch_threads=0, torch_interop_threads=0
+    )
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_the_result_off_the_event_loop(executor):
+    result = await executor.run(lambda x: (x * 2, threading.current_thread().name), 21)
+
+    assert result[0] == 42
+    assert result[1].startswith("clip-inference")
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 0
+    assert stats["queued"] == stats["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_errors(executor):
+    def fail():
+        raise RuntimeError("CUDA out of memory")
+
+    with pytest.raises(RuntimeError, match="CUDA out of memory"):
+        await executor.run(fail)
+
+    assert executor.stats()["failed"] == 1
+    assert await executor.run(lambda: "ok") == "ok"
+
+
+@pytest.mark.asyncio
+async def test_calls_queue_behind_the_workers(executor):
+    release = threading.Event()
+    first = asyncio.create_task(executor.run(release.wait))
+    second = asyncio.create_task(executor.run(lambda: "second"))
+    try:
+        while executor.stats()["running"] == 0:
+            await asyncio.sleep(0.01)
+
+        assert executor.stats()["queued"] == 1
+    finally:
+        release.set()
+    assert await asyncio.gather(first, second) == [True, "second"]
+    assert executor.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_queued_calls(executor):
+    release = threading.Event()
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(lambda: "never"))
+    while executor.stats()["running"] == 0:
+        await asyncio.sleep(0.01)
+
+    executor.shutdown(wait=False)
+    release.set()
+
+    assert await running is True
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    with pytest.raises(RuntimeError):
+        await executor.run(lambda: "after shutdown")
@@ -0,0 +1,154 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.vectorstore.local_vectorstore import LocalVectorStore
+from app.vectorstore.models import MetadataFilter
+from app.vectorstore.utils import build_filter
+
+
+def _vectors(count: int, size: int = 16, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(count, size)).astype(np.float32)
+
+
+@pytest.fixture
+def store(tmp_path) -> LocalVectorStore:
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=0)
+    yield store
+    for collection in store._collections.values():
+        collection.close()
+
+
+def test_upload_and_search(store):
+    vectors = _vectors(20)
+    ids = [f"id-{i}" for i in range(20)]
+    store.upload_collection(
+        "Test", vectors.tolist(), [f"doc {i}" for i in range(20)], None, ids
+    )
+
+    results = store.search("Test", vectors[3].tolist(), limit=3)
+
+    assert results[0].id == "id-3"
+    assert results[0].score == pytest.approx(1.0, abs=1e-5)
+    assert results[0].payload["page_content"] == "doc 3"
+    assert store.get_collection_metadata("Test").points_count == 20
+
+
+def test_upload_existing_id_overwrites(store):
+    vectors = _vectors(2)
+    store.upload_collection("Test", [vectors[0].tolist()], ["old"], None, ["a"])
+    store.upload_collection("Test", [vectors[1].tolist()], ["new"], None, ["a"])
+
+    results = store.search("Test", vectors[1].tolist(), limit=5)
+
+    assert [point.id for point in results] == ["a"]
+    assert results[0].payload["page_content"] == "new"
+    assert store.get_collection_metadata("Test").points_count == 1
+
+
+def test_delete_points(store):
+    vectors = _vectors(5)
+    ids = [f"id-{i}" for i in range(5)]
+    store.upload_collection("Test", vectors.tolist(), ids, None, ids)
+
+    store.delete_points("Test", ["id-1", "id-3"])
+
+    results = store.search("Test", vectors[1].tolist(), limit=10)
+    assert sorted(point.id for point in results) == ["id-0", "id-2", "id-4"]
+    assert store.get_collection_metadata("Test").points_count == 3
+
+
+def test_search_filters(store):
+    vectors = _vectors(6)
+    metadata = [{"city": "London" if i % 2 else "Seattle", "n": i} for i in range(6)]
+    ids = [f"id-{i}" for i in range(6)]
+    store.upload_collection("Test", vectors.tolist(), ids, metadata, ids)
+
+    match = build_filter([MetadataFilter(key="city", match="London")])
+    ranged = build_filter([MetadataFilter(key="n", gte=2, lte=4)])
+
+    assert {p.id for p in store.search("Test", vectors[0].tolist(), 10, match)} == {
+        "id-1",
+        "id-3",
+        "id-5",
+    }
+    assert {p.id for p in store.search("Test", vectors[0].tolist(), 10, ranged)} == {
+        "id-2",
+        "id-3",
+        "id-4",
+    }
+
+
+def test_reopen_keeps_points(tmp_path):
+    vectors = _vectors(3)
+    ids = ["a", "b", "c"]
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=0)
+    store.upload_collection("Test", vectors.tolist(), ids, None, ids)
+    store.delete_points("Test", ["b"])
+    store._get("Test").close()
+
+    reopened = LocalVectorStore(path=str(tmp_path), ivf_min_points=0)
+
+    results = reopened.search("Test", vectors[2].tolist(), limit=5)
+    assert results[0].id == "c"
+    assert sorted(point.id for point in results) == ["a", "c"]
+
+
+def test_ivf_rewrite_does_not_duplicate(tmp_path):
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=100, nprobe=4)
+    vectors = _vectors(390)
+    ids = [f"{i:03d}" for i in range(390)]
+    store.upload_collection("Test", vectors.tolist(), ids, None, ids)
+    # The first search builds the IVF index
+    store.search("Test", vectors[5].tolist(), limit=5)
+
+    store.upload_collection("Test", vectors[:50].tolist(), ids[:50], None, ids[:50])
+    results = store.search("Test", vectors[5].tolist(), limit=5)
+
+    result_ids = [point.id for point in results]
+    assert result_ids[0] == "005"
+    assert len(result_ids) == len(set(result_ids))
+    assert store._get("Test").ivf.size == 390
+
+    store.delete_points("Test", ids[:10])
+    assert store._get("Test").ivf.size == 380
+    assert "005" not in [
+        point.id for point in store.search("Test", vectors[5].tolist(), limit=5)
+    ]
+
+
+@pytest.mark.parametrize("ivf_min_points", [0, 100])
+def test_concurrent_search_and_writes(tmp_path, ivf_min_points):
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=ivf_min_points)
+    vectors = _vectors(400)
+    ids = [f"{i:03d}" for i in range(400)]
+    store.upload_collection("Test", vectors.tolist(), ids, None, ids)
+    done = threading.Event()
+
+    def write():
+        try:
+            for round in range(30):
+                batch = ids[round * 10 : round * 10 + 50]
+                store.delete_points("Test", batch[:10])
+                store.upload_collection(
+                    "Test", _vectors(50, seed=round).tolist(), batch, None, batch
+                )
+        finally:
+            done.set()
+
+    def read(seed: int):
+        query = _vectors(1, seed=seed)[0].tolist()
+        while not done.is_set():
+            for point in store.search("Test", query, limit=10):
+                assert point.id is not None
+            list(store.iter_points("Test"))
+
+    # Any exception in a reader or the writer is raised again by result()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(write)] + [
+            executor.submit(read, seed) for seed in range(4)
+        ]
+        for future in futures:
+            future.result()
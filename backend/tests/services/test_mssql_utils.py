@@ -0,0 +1,65 @@
+from app.mssql.utils import extract_row_fields, hash_row, row_point_ids
+
+
+def test_extract_row_fields():
+    row = (
+        "{'OrderID': 10248, 'CustomerID': 'VINET', 'Freight': Decimal('32.3800'), "
+        "'OrderDate': datetime.datetime(1996, 7, 4, 0, 0), 'ShipRegion': None, "
+        "'Discontinued': True, 'ShipName': \"Vins et alcools Chevalier\"}"
+    )
+
+    fields = extract_row_fields(
+        row,
+        [
+            "OrderID",
+            "CustomerID",
+            "Freight",
+            "OrderDate",
+            "ShipRegion",
+            "Discontinued",
+            "ShipName",
+            "Missing",
+        ],
+    )
+
+    assert fields == {
+        "OrderID": 10248,
+        "CustomerID": "VINET",
+        "Freight": 32.38,
+        "OrderDate": "1996-07-04T00:00:00",
+        "Discontinued": True,
+        "ShipName": "Vins et alcools Chevalier",
+    }
+
+
+def test_extract_row_fields_matches_whole_column_name():
+    row = "{'CategoryID': 1, 'ID': 7}"
+
+    assert extract_row_fields(row, ["ID"]) == {"ID": 7}
+
+
+def test_hash_row():
+    row = "{'EmployeeID': 1, 'LastName': 'Davolio'}"
+
+    assert hash_row(row) == hash_row(row)
+    assert hash_row(row) != hash_row("{'EmployeeID': 1, 'LastName': 'Fuller'}")
+
+
+def test_row_point_ids_skips_image_and_unhashed_points():
+    metadata = {
+        "row-1": {"row_hash": "abc", "source": "Employees_1"},
+        "row-2": {"row_hash": "def", "source": "Employees_2"},
+        "image-1": {"row_hash": None, "source": "Employees_image_1"},
+        "legacy": {"row_hash": None, "source": "Employees_3"},
+    }
+
+    assert row_point_ids("Employees", metadata) == {"row-1", "row-2"}
+
+
+def test_row_point_ids_skips_hashed_image_points():
+    metadata = {
+        "row-1": {"row_hash": "abc", "source": "Employees_1"},
+        "image-1": {"row_hash": "ghi", "source": "Employees_image_1"},
+    }
+
+    assert row_point_ids("Employees", metadata) == {"row-1"}
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.vectorstore.models import UploadRecord
+from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
+from app.vectorstore.utils import generate_uuid
+
+
+def _records(count: int) -> list[UploadRecord]:
+    return [
+        UploadRecord(
+            id=generate_uuid(f"Test_{i}"),
+            vector=[1.0, float(i), 0.0, 0.5],
+            page_content=f"row {i}",
+            metadata={"source": f"Test_{i}"},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store() -> MyQdrantVectorStore:
+    return MyQdrantVectorStore(
+        url=":memory:",
+        client=QdrantClient(":memory:"),
+        async_client=AsyncQdrantClient(":memory:"),
+    )
+
+
+async def _count(store: MyQdrantVectorStore, collection_name: str) -> int:
+    return (await store.async_client.count(collection_name, exact=True)).count
+
+
+@pytest.mark.asyncio
+async def test_aupload_stream_uploads_everything(store):
+    progress: list[int] = []
+
+    ids = await store.aupload_stream(
+        "Test", _records(25), batch_size=4, workers=2, progress=progress.append
+    )
+
+    assert len(ids) == 25
+    assert await _count(store, "Test") == 25
+    assert progress == sorted(progress)
+    assert progress[-1] == 25
+    assert (await store.aget_collection_metadata("Test")).points_count == 25
+
+
+@pytest.mark.asyncio
+async def test_aupload_stream_empty(store):
+    assert await store.aupload_stream("Test", []) == []
+    assert not await store.acollection_exists("Test")
+
+
+@pytest.mark.asyncio
+async def test_aupload_stream_retries_failed_batches(store, monkeypatch):
+    upsert = store.async_client.upsert
+    failures = {"left": 2}
+
+    async def flaky_upsert(**kwargs):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionError("connection reset")
+        return await upsert(**kwargs)
+
+    monkeypatch.setattr(store.async_client, "upsert", flaky_upsert)
+
+    await store.aupload_stream("Test", _records(8), batch_size=4, workers=2)
+
+    assert failures["left"] == 0
+    assert await _count(store, "Test") == 8
+
+
+@pytest.mark.asyncio
+async def test_aupload_stream_worker_failure_stops_the_stream(store, monkeypatch):
+    consumed = 0
+
+    async def records():
+        nonlocal consumed
+        for record in _records(200):
+            consumed += 1
+            yield record
+
+    async def failing_upsert(**kwargs):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(store.async_client, "upsert", failing_upsert)
+
+    with pytest.raises(ConnectionError):
+        await store.aupload_stream(
+            "Test", records(), batch_size=4, workers=2, max_retries=0
+        )
+    # The producer stops once the queue is full and the workers have failed
+    assert consumed < 200
+
+
+@pytest.mark.asyncio
+async def test_aupload_stream_applies_backpressure(store, monkeypatch):
+    upsert = store.async_client.upsert
+    release = asyncio.Event()
+    produced = 0
+
+    async def records():
+        nonlocal produced
+        for record in _records(100):
+            produced += 1
+            yield record
+
+    async def slow_upsert(**kwargs):
+        await release.wait()
+        return await upsert(**kwargs)
+
+    monkeypatch.setattr(store.async_client, "upsert", slow_upsert)
+
+    upload = asyncio.create_task(
+        store.aupload_stream("Test", records(), batch_size=4, workers=2)
+    )
+    await asyncio.sleep(0.2)
+    # 2 batches held by the workers, 4 queued and 1 waiting to be queued
+    assert produced <= (2 + 4 + 1) * 4
+
+    release.set()
+    assert len(await upload) == 100
+    assert await _count(store, "Test") == 100
+
+
+def test_upload_stream_reports_upserted_points(store, monkeypatch):
+    upsert = store.client.upsert
+    upserted = 0
+    progress: list[tuple[int, int]] = []
+
+    def counting_upsert(**kwargs):
+        nonlocal upserted
+        result = upsert(**kwargs)
+        upserted += len(kwargs["points"])
+        return result
+
+    monkeypatch.setattr(store.client, "upsert", counting_upsert)
+
+    ids = store.upload_stream(
+        "Test",
+        _records(10),
+        batch_size=3,
+        workers=1,
+        progress=lambda count: progress.append((count, upserted)),
+    )
+
+    assert len(ids) == 10
+    assert store.client.count("Test", exact=True).count == 10
+    # Progress never runs ahead of the points actually upserted
+    assert all(count <= done for count, done in progress)
+    assert progress[-1][0] == 10
+
+
+def test_upload_stream_raises_after_retries(store, monkeypatch):
+    def failing_upsert(**kwargs):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(store.client, "upsert", failing_upsert)
+
+    with pytest.raises(ConnectionError):
+        store.upload_stream("Test", _records(10), batch_size=3, max_retries=0)
+
+
+@pytest.mark.asyncio
+async def test_aupload_collection_empty(store):
+    assert await store.aupload_collection("Test", [], []) == []
+    assert store.upload_collection("Test", [], []) == []
@@ -0,0 +1,102 @@
+import pytest
+
+from app.vectorstore import cache as cache_module
+from app.vectorstore.cache import SearchResultCache
+from app.vectorstore.models import MetadataFilter
+from app.vectorstore.service import _text_key, _vector_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_text_key_normalizes_case_and_whitespace():
+    assert _text_key("  Nancy\tDAVOLIO ", 4, None, True) == _text_key(
+        "nancy davolio", 4, None, True
+    )
+    assert _text_key("nancy", 4, None, True) != _text_key("nancy", 5, None, True)
+    assert _text_key("nancy", 4, None, True) != _text_key("nancy", 4, None, False)
+
+
+def test_filters_key_ignores_field_order():
+    filters = [MetadataFilter(key="category", match="Beverages")]
+    same = [MetadataFilter.model_validate({"match": "Beverages", "key": "category"})]
+    other = [MetadataFilter(key="category", match="Seafood")]
+
+    assert _text_key("tea", 4, filters, True) == _text_key("tea", 4, same, True)
+    assert _text_key("tea", 4, filters, True) != _text_key("tea", 4, other, True)
+    assert _text_key("tea", 4, [], True) == _text_key("tea", 4, None, True)
+
+
+def test_vector_key_hashes_float32_values():
+    assert _vector_key([0.1, 0.2], 1, None, None) == _vector_key(
+        (0.1, 0.2), 1, None, None
+    )
+    assert _vector_key([0.1, 0.2], 1, None, None) != _vector_key(
+        [0.1, 0.3], 1, None, None
+    )
+    assert _vector_key([0.1, 0.2], 1, None, None) != _vector_key(
+        [0.1, 0.2], 1, None, "tea"
+    )
+
+
+def test_bump_invalidates_only_that_collection(clock):
+    cache = SearchResultCache()
+    cache.put("Products", "tea", ["chai"], cache.generation("Products"))
+    cache.put("Orders", "tea", ["10248"], cache.generation("Orders"))
+
+    cache.bump("Products")
+
+    assert cache.get("Products", "tea") is None
+    assert cache.get("Orders", "tea") == ["10248"]
+
+
+def test_put_drops_results_that_raced_with_a_write(clock):
+    cache = SearchResultCache()
+    generation = cache.generation("Products")
+
+    cache.bump("Products")
+    cache.put("Products", "tea", ["chai"], generation)
+
+    assert cache.get("Products", "tea") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SearchResultCache(ttl_seconds=10)
+    cache.put("Products", "tea", ["chai"], 0)
+
+    clock.now += 9.9
+    assert cache.get("Products", "tea") == ["chai"]
+    clock.now += 0.1
+    assert cache.get("Products", "tea") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SearchResultCache(max_entries=2)
+    cache.put("Products", "tea", ["chai"], 0)
+    cache.put("Products", "coffee", ["ipoh"], 0)
+    cache.get("Products", "tea")
+
+    cache.put("Products", "beer", ["sasquatch"], 0)
+
+    assert cache.get("Products", "coffee") is None
+    assert cache.get("Products", "tea") == ["chai"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_zero_entries_disables_the_cache(clock):
+    cache = SearchResultCache(max_entries=0)
+    cache.put("Products", "tea", ["chai"], 0)
+
+    assert cache.get("Products", "tea") is None
@@ -0,0 +1,93 @@
+import math
+
+import pytest
+
+from app.vectorstore import service
+from app.vectorstore.local_vectorstore import LocalVectorStore
+
+# Cosine similarity of every point to the query vector [1, 0]
+SCORES = {
+    "Products": [0.95, 0.9, 0.85, 0.8],
+    "Orders": [0.92, 0.5],
+    "Employees": [0.88, 0.1],
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> LocalVectorStore:
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=0)
+    for collection, scores in SCORES.items():
+        store.upload_collection(
+            collection,
+            [[score, math.sqrt(1 - score**2)] for score in scores],
+            [f"{collection} {score}" for score in scores],
+            [{"source": f"{collection}_{i}"} for i in range(len(scores))],
+        )
+    embedded: list[str] = []
+
+    async def aget_text_embeddings(query: str) -> list[float]:
+        embedded.append(query)
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(service, "get_vectorstore", lambda: store)
+    monkeypatch.setattr(service, "aget_text_embeddings", aget_text_embeddings)
+    store.embedded = embedded
+    yield store
+    for collection in store._collections.values():
+        collection.close()
+
+
+def _sources(documents) -> list[str]:
+    return [document.metadata["source"] for document in documents]
+
+
+@pytest.mark.asyncio
+async def test_fanout_merges_by_score(store):
+    documents = await service.asearch_fanout(
+        "tea",
+        ["Products", "Orders", "Missing", "Employees"],
+        k=5,
+        per_collection=2,
+        min_score=0.3,
+    )
+
+    assert store.embedded == ["tea"]
+    assert _sources(documents) == [
+        "Products_0",
+        "Orders_0",
+        "Products_1",
+        "Employees_0",
+        "Orders_1",
+    ]
+    assert [document.metadata["collection"] for document in documents] == [
+        "Products",
+        "Orders",
+        "Products",
+        "Employees",
+        "Orders",
+    ]
+    scores = [document.metadata["score"] for document in documents]
+    assert scores == pytest.approx([0.95, 0.92, 0.9, 0.88, 0.5], abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_fanout_limits_each_collection(store):
+    documents = await service.asearch_fanout(
+        "tea", list(SCORES), k=10, per_collection=1, min_score=0.0
+    )
+
+    assert _sources(documents) == ["Products_0", "Orders_0", "Employees_0"]
+
+
+@pytest.mark.asyncio
+async def test_fanout_stops_at_k(store):
+    documents = await service.asearch_fanout(
+        "tea", list(SCORES), k=3, per_collection=4, min_score=0.0
+    )
+
+    assert _sources(documents) == ["Products_0", "Orders_0", "Products_1"]
+
+
+@pytest.mark.asyncio
+async def test_fanout_skips_missing_collections(store):
+    assert await service.asearch_fanout("tea", ["Missing", "Suppliers"]) == []
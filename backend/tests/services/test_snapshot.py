@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.exceptions.errors import CollectionNotFoundError
+from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
+from app.vectorstore.snapshot import export_collection, import_collection
+from app.vectorstore.sparse import SPARSE_VECTOR_NAME
+
+
+def _store() -> MyQdrantVectorStore:
+    return MyQdrantVectorStore(
+        url=":memory:",
+        client=QdrantClient(":memory:"),
+        async_client=AsyncQdrantClient(":memory:"),
+    )
+
+
+@pytest.fixture
+def store() -> MyQdrantVectorStore:
+    store = _store()
+    store.upload_collection(
+        "Employees",
+        [[1.0, float(i), 0.0, 0.5] for i in range(7)],
+        [f"Employee Nancy {i}" for i in range(7)],
+        [{"source": f"Employees_{i}"} for i in range(7)],
+        [f"00000000-0000-0000-0000-00000000000{i}" for i in range(7)],
+    )
+    return store
+
+
+def test_export_and_import_round_trip(store, tmp_path):
+    path = export_collection(store, "Employees", str(tmp_path), page_size=3)
+    with open(os.path.join(path, "manifest.json")) as f:
+        assert json.load(f)["points"] == 7
+
+    target = _store()
+    restored = import_collection(target, path, "Restored", batch_size=2, parallel=1)
+
+    assert restored == 7
+    assert target.get_collection_metadata("Restored").points_count == 7
+    assert target.has_sparse_vectors("Restored")
+    original = store.client.retrieve(
+        "Employees", ["00000000-0000-0000-0000-000000000003"], with_vectors=True
+    )[0]
+    copy = target.client.retrieve(
+        "Restored", ["00000000-0000-0000-0000-000000000003"], with_vectors=True
+    )[0]
+    assert copy.payload == original.payload
+    assert target.dense_vector(copy.vector) == pytest.approx(
+        store.dense_vector(original.vector)
+    )
+    assert copy.vector[SPARSE_VECTOR_NAME] == original.vector[SPARSE_VECTOR_NAME]
+
+
+def test_export_missing_collection(tmp_path):
+    with pytest.raises(CollectionNotFoundError):
+        export_collection(_store(), "Employees", str(tmp_path))
+
+
+def test_import_rejects_mismatched_snapshot(store, tmp_path):
+    path = export_collection(store, "Employees", str(tmp_path))
+    manifest_path = os.path.join(path, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["points"] = 8
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError):
+        import_collection(_store(), path, parallel=1)
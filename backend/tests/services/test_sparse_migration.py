@@ -0,0 +1,124 @@
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from app.exceptions.errors import CollectionNotFoundError
+from app.vectorstore.qdrant_vectorstore import MyQdrantVectorStore
+
+STAGING = "Employees__sparse_migration"
+
+
+@pytest.fixture
+def store() -> MyQdrantVectorStore:
+    return MyQdrantVectorStore(
+        url=":memory:",
+        client=QdrantClient(":memory:"),
+        async_client=AsyncQdrantClient(":memory:"),
+    )
+
+
+async def _create_dense_collection(client: AsyncQdrantClient, name: str):
+    await client.create_collection(
+        name,
+        vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE),
+    )
+    await client.upsert(
+        name,
+        points=[
+            models.PointStruct(
+                id=i,
+                vector=[1.0, float(i), 0.0, 0.5],
+                payload={
+                    "page_content": f"Employee Nancy {i}",
+                    "metadata": {"source": f"Employees_{i}"},
+                },
+            )
+            for i in range(1, 6)
+        ]
+        + [
+            models.PointStruct(
+                id=100,
+                vector=[0.0, 1.0, 1.0, 0.0],
+                payload={
+                    "page_content": "Photo of Nancy",
+                    "metadata": {"source": "Employees_image_1"},
+                },
+            )
+        ],
+    )
+
+
+async def _collection_names(client: AsyncQdrantClient) -> list[str]:
+    return [c.name for c in (await client.get_collections()).collections]
+
+
+@pytest.mark.asyncio
+async def test_migration_keeps_points_and_adds_sparse_index(store):
+    await _create_dense_collection(store.async_client, "Employees")
+    before = await store.async_client.retrieve("Employees", [3], with_vectors=True)
+
+    migrated = await store.amigrate_sparse_vectors("Employees")
+
+    assert migrated == 6
+    assert await store.ahas_sparse_vectors("Employees")
+    assert await _collection_names(store.async_client) == ["Employees"]
+    after = await store.async_client.retrieve("Employees", [3], with_vectors=True)
+    assert after[0].payload == before[0].payload
+    assert after[0].vector[""] == pytest.approx(before[0].vector)
+    image = await store.async_client.retrieve("Employees", [100])
+    assert image[0].payload["metadata"]["source"] == "Employees_image_1"
+    results = await store.asearch_hybrid("Employees", [1.0, 3.0, 0.0, 0.5], "Nancy 3")
+    assert results[0].id == 3
+
+
+@pytest.mark.asyncio
+async def test_migration_of_migrated_collection_is_a_no_op(store):
+    await _create_dense_collection(store.async_client, "Employees")
+    await store.amigrate_sparse_vectors("Employees")
+
+    assert await store.amigrate_sparse_vectors("Employees") == 0
+
+
+@pytest.mark.asyncio
+async def test_migration_resumes_from_staging(store):
+    # Interrupted after the collection was deleted, only the staging copy is left
+    await _create_dense_collection(store.async_client, STAGING)
+
+    migrated = await store.amigrate_sparse_vectors("Employees")
+
+    assert migrated == 6
+    assert await store.ahas_sparse_vectors("Employees")
+    assert await _collection_names(store.async_client) == ["Employees"]
+
+
+@pytest.mark.asyncio
+async def test_migration_replaces_stale_staging(store):
+    await _create_dense_collection(store.async_client, "Employees")
+    await store.async_client.create_collection(
+        STAGING,
+        vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE),
+    )
+
+    assert await store.amigrate_sparse_vectors("Employees") == 6
+    assert await _collection_names(store.async_client) == ["Employees"]
+
+
+@pytest.mark.asyncio
+async def test_migration_of_missing_collection(store):
+    with pytest.raises(CollectionNotFoundError):
+        await store.amigrate_sparse_vectors("Employees")
+
+
+@pytest.mark.asyncio
+async def test_staging_collections_are_not_listed(store):
+    await _create_dense_collection(store.async_client, "Employees")
+    await _create_dense_collection(store.async_client, STAGING)
+    for name in ("Employees", STAGING):
+        store.client.create_collection(
+            name,
+            vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE),
+        )
+
+    info = await store.aget_collection_info()
+
+    assert [next(iter(entry)) for entry in info] == ["Employees"]
+    assert store.get_collections() == ["Employees"]
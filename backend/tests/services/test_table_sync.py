@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+
+from app.mssql import services
+from app.mssql.models import ImageTable, Table
+from app.vectorstore.local_vectorstore import LocalVectorStore
+from app.vectorstore.utils import generate_uuid
+
+
+class FakeDatabase:
+    def __init__(self, rows: list[str]):
+        self.rows = rows
+
+    def get_table_info(self, table_names: list[str]) -> str:
+        return "CREATE TABLE ..."
+
+    def run_no_throw(self, sql: str, fetch: str, include_columns: bool) -> str:
+        return "[" + ", ".join(self.rows) + "]"
+
+
+class FakeConnection:
+    def __init__(self, images: list[tuple[int, bytes]]):
+        self.images = images
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql: str):
+        pass
+
+    def fetchall(self) -> list[tuple[int, bytes]]:
+        return self.images
+
+
+def _employee(id: int, last_name: str) -> str:
+    return f"{{'EmployeeID': {id}, 'LastName': '{last_name}'}}"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> LocalVectorStore:
+    store = LocalVectorStore(path=str(tmp_path), ivf_min_points=0)
+    failing: set[str] = set()
+
+    async def generate_text_and_id(table_name: str, row: str, table_info: str):
+        id = row.split("'EmployeeID': ")[1].split(",")[0]
+        if id in failing:
+            return None, None
+        return id, f"Employee {row}"
+
+    async def aget_texts_embeddings(texts: list[str]) -> list[list[float]]:
+        rng = np.random.default_rng(len(texts))
+        return rng.normal(size=(len(texts), 8)).tolist()
+
+    monkeypatch.setattr(services, "get_vectorstore", lambda: store)
+    monkeypatch.setattr(services, "generate_text_and_id", generate_text_and_id)
+    monkeypatch.setattr(services, "aget_texts_embeddings", aget_texts_embeddings)
+    store.failing = failing
+    yield store
+    for collection in store._collections.values():
+        collection.close()
+
+
+def _sources(store: LocalVectorStore) -> list[str]:
+    values = store.get_metadata_values("Employees", ["source"]).values()
+    return sorted(value["source"] for value in values)
+
+
+@pytest.mark.asyncio
+async def test_full_sync_deletes_removed_rows(store):
+    db = FakeDatabase([_employee(1, "Davolio"), _employee(2, "Fuller")])
+    await services.sync_table_ai(db, Table.employees)
+
+    db.rows = [_employee(2, "Fuller")]
+    ids = await services.sync_table_ai(db, Table.employees)
+
+    assert ids == [generate_uuid("Employees_2")]
+    assert _sources(store) == ["Employees_2"]
+
+
+@pytest.mark.asyncio
+async def test_full_sync_keeps_image_points(store):
+    db = FakeDatabase([_employee(1, "Davolio")])
+    await services.sync_table_ai(db, Table.employees)
+    store.upload_collection(
+        "Employees",
+        [[0.1] * 8],
+        ["photo"],
+        [{"source": "Employees_image_1"}],
+        [generate_uuid("Employees_image_1")],
+    )
+
+    await services.sync_table_ai(db, Table.employees)
+
+    assert _sources(store) == ["Employees_1", "Employees_image_1"]
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_keeps_old_point(store):
+    db = FakeDatabase([_employee(1, "Davolio"), _employee(2, "Fuller")])
+    await services.sync_table_ai(db, Table.employees)
+
+    db.rows = [_employee(1, "Davolio"), _employee(2, "Leverling")]
+    store.failing.add("2")
+    await services.sync_table_ai(db, Table.employees)
+
+    assert _sources(store) == ["Employees_1", "Employees_2"]
+
+
+@pytest.mark.asyncio
+async def test_limited_sync_keeps_other_rows(store):
+    db = FakeDatabase([_employee(1, "Davolio"), _employee(2, "Fuller")])
+    await services.sync_table_ai(db, Table.employees)
+
+    db.rows = [_employee(1, "Davolio")]
+    await services.sync_table_ai(db, Table.employees, limit=1)
+
+    assert _sources(store) == ["Employees_1", "Employees_2"]
+
+
+def test_capped_tables_are_not_full_syncs():
+    assert Table.orders.default_limit == 50
+    assert Table.order_details.default_limit == 50
+    assert Table.employees.default_limit is None
+    assert "TOP 50" in Table.orders.sql()
+
+
+@pytest.mark.asyncio
+async def test_existing_points_are_read_once(store, monkeypatch):
+    db = FakeDatabase([_employee(1, "Davolio"), _employee(2, "Fuller")])
+    await services.sync_table_ai(db, Table.employees)
+    get_metadata_values = store.get_metadata_values
+    calls: list[list[str]] = []
+
+    def counting_get_metadata_values(collection_name: str, keys: list[str]):
+        calls.append(keys)
+        return get_metadata_values(collection_name, keys)
+
+    monkeypatch.setattr(store, "get_metadata_values", counting_get_metadata_values)
+
+    ids = await services.sync_table_ai(db, Table.employees)
+
+    assert calls == [["row_hash", "source"]]
+    assert sorted(ids) == sorted(
+        [generate_uuid("Employees_1"), generate_uuid("Employees_2")]
+    )
+
+
+@pytest.mark.asyncio
+async def test_image_sync_skips_rows_whose_image_failed(store, monkeypatch):
+    async def aget_image_bytes_embeddings(blobs: list[bytes]):
+        # Image i embeds to the i-th unit vector, the second one fails to decode
+        decoded = [i for i, blob in enumerate(blobs) if blob != b"broken"]
+        return np.eye(8)[decoded].tolist(), decoded
+
+    monkeypatch.setattr(
+        services, "aget_image_bytes_embeddings", aget_image_bytes_embeddings
+    )
+    ole_header = b"\0" * 78
+    connection = FakeConnection(
+        [(1, ole_header + b"photo"), (2, ole_header + b"broken"), (3, ole_header)]
+    )
+    db = FakeDatabase(
+        [_employee(1, "Davolio"), _employee(2, "Fuller"), _employee(3, "Leverling")]
+    )
+
+    await services.sync_table_images(connection, db, ImageTable.employees)
+
+    assert _sources(store) == ["Employees_image_1", "Employees_image_3"]
+    for index, source in [(0, "Employees_image_1"), (2, "Employees_image_3")]:
+        best = store.search("Employees", np.eye(8)[index].tolist(), limit=1)[0]
+        assert best.payload["metadata"]["source"] == source
+        assert best.score == pytest.approx(1.0)
@@ -0,0 +1,73 @@
+import pytest
+from qdrant_client import models
+
+from app.agent.tools import vector_search
+from app.vectorstore.models import MetadataFilter
+from app.vectorstore.profiles import coerce_payload_value, get_payload_fields
+from app.vectorstore.utils import build_filter
+
+
+def test_build_filter_empty():
+    assert build_filter(None) is None
+    assert build_filter([]) is None
+
+
+def test_build_filter_match_value_and_any():
+    query_filter = build_filter(
+        [
+            MetadataFilter(key="category", match="Beverages"),
+            MetadataFilter(key="supplier_id", match=[1, 2]),
+        ]
+    )
+
+    assert query_filter.must == [
+        models.FieldCondition(
+            key="metadata.category", match=models.MatchValue(value="Beverages")
+        ),
+        models.FieldCondition(
+            key="metadata.supplier_id", match=models.MatchAny(any=[1, 2])
+        ),
+    ]
+
+
+def test_build_filter_ranges():
+    query_filter = build_filter(
+        [
+            MetadataFilter(key="unit_price", gte=10, lte=20.5),
+            MetadataFilter(key="order_date", gte="1996-07-01", lte="1996-07-31"),
+        ]
+    )
+
+    number, date = query_filter.must
+    assert number.range == models.Range(gte=10, lte=20.5)
+    assert isinstance(date.range, models.DatetimeRange)
+    assert date.key == "metadata.order_date"
+
+
+def test_coerce_payload_value():
+    fields = {field.key: field for field in get_payload_fields("Orders")}
+    products = {field.key: field for field in get_payload_fields("Products")}
+
+    assert coerce_payload_value(fields["employee_id"], "5") == 5
+    assert coerce_payload_value(fields["employee_id"], 5.0) == 5
+    assert coerce_payload_value(fields["customer_id"], "VINET") == "VINET"
+    assert coerce_payload_value(products["discontinued"], "true") is True
+    assert coerce_payload_value(products["discontinued"], False) is False
+
+
+@pytest.mark.parametrize("value", ["five", True, "1.5"])
+def test_coerce_payload_value_rejects_invalid_integers(value):
+    field = next(f for f in get_payload_fields("Orders") if f.key == "employee_id")
+
+    with pytest.raises(ValueError):
+        coerce_payload_value(field, value)
+
+
+def test_vector_search_lists_filterable_fields():
+    for table, keys in [
+        ("Products", "category, supplier_id, discontinued"),
+        ("Orders", "customer_id, employee_id, ship_country"),
+        ("Order Details", "order_id, product_id"),
+    ]:
+        assert f"{table}: {keys}" in vector_search.description
+    assert "created_at" not in vector_search.description